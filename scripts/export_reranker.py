@@ -0,0 +1,29 @@
+"""Export the reranker cross-encoder to ONNX plus a dynamic INT8 variant.
+
+Requires the ONNX extras for sentence-transformers, e.g.
+`uv pip install "sentence-transformers[onnx]"`.
+"""
+import argparse
+
+from sentence_transformers import CrossEncoder, export_dynamic_quantized_onnx_model
+
+
+def main() -> None:
+    """Save ONNX and INT8-quantized ONNX copies of a cross-encoder locally."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", default="cross-encoder/ms-marco-MiniLM-L-6-v2")
+    parser.add_argument("--output-dir", default="artifacts/reranker-onnx")
+    parser.add_argument("--config", default="avx512_vnni", choices=["arm64", "avx2", "avx512", "avx512_vnni"])
+    args = parser.parse_args()
+
+    model = CrossEncoder(args.model, backend="onnx")
+    model.save_pretrained(args.output_dir)
+    export_dynamic_quantized_onnx_model(model, args.config, args.output_dir)
+    print(
+        f"Saved ONNX reranker to {args.output_dir}; load it with "
+        f'LocalCrossEncoderReranker("{args.output_dir}", onnx_file="onnx/model_qint8_{args.config}.onnx")'
+    )
+
+
+if __name__ == "__main__":
+    main()
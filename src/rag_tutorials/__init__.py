@@ -1,5 +1,5 @@
 """Shared components for the all-things-rag tutorial series."""
 
-from .schema import Chunk, Document, QueryExample, RetrievalResult
+from .schema import Chunk, ChunkBatch, Document, QueryExample, RetrievalBatch, RetrievalResult
 
-__all__ = ["Document", "Chunk", "QueryExample", "RetrievalResult"]
+__all__ = ["Document", "Chunk", "ChunkBatch", "QueryExample", "RetrievalResult", "RetrievalBatch"]
@@ -7,16 +7,27 @@ The agent is connected to an arbitrary set of named tools. Each tool is a
 callable that accepts a plain-string input and returns a plain-string output.
 The RAG retrieval functions from earlier tutorials are the canonical example of
 a tool, but any callable with that signature works.
+
+For evaluating many questions at once, `run_react_loop_many` runs several
+loops concurrently on one `AsyncOpenAI` client so the network round-trips of
+different questions overlap instead of queueing one after another.
+`run_react_batch` targets offline evaluation instead: every ReAct step for
+all pending questions is submitted as one OpenAI Batch API job, trading
+interactive latency for lower cost and higher rate limits.
 """
 from __future__ import annotations
 
+import asyncio
+import functools
 import json
+import re
+import time
 from dataclasses import dataclass, field
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AgentStep:
     """Single Thought-Action-Observation cycle inside a ReAct loop."""
 
@@ -26,7 +37,7 @@ class AgentStep:
     observation: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AgentResult:
     """Final result produced by a completed ReAct loop run."""
 
@@ -35,7 +46,19 @@ class AgentResult:
     steps: list[AgentStep] = field(default_factory=list)
 
 
-def _build_system_prompt(tool_names: list[str]) -> str:
+# Opening ``` line (with optional language tag), body, optional closing ```.
+_FENCE_RE = re.compile(r"```[^\n]*\n?(.*?)(?:\n[ \t]*```)?", re.DOTALL)
+
+
+@functools.lru_cache(maxsize=32)
+def _build_system_prompt(tool_names: tuple[str, ...]) -> str:
+    """Build the ReAct system prompt; cached per tool set so it is built once.
+
+    Callers pass the tool names sorted, so the prompt bytes do not depend on
+    the insertion order of the tools dict. The system message and question
+    form a stable prefix across every step of a run, which lets the server
+    reuse its prompt cache; keep the tool set fixed within a session.
+    """
     tool_list = ", ".join(tool_names)
     return (
         "You are a helpful assistant that solves problems step by step.\n"
@@ -56,18 +79,146 @@ def _build_system_prompt(tool_names: list[str]) -> str:
 def _parse_agent_response(text: str) -> dict:
     """Extract the JSON object from an LLM response string."""
     text = text.strip()
-    # Strip markdown code fences if present
-    if text.startswith("```"):
-        lines = text.splitlines()
-        text = "\n".join(lines[1:-1] if lines[-1].strip() == "```" else lines[1:])
+    # Strip markdown code fences (opening line plus optional closing fence)
+    fenced = _FENCE_RE.fullmatch(text)
+    if fenced:
+        text = fenced.group(1)
     return json.loads(text)
 
 
+def _apply_agent_turn(
+    raw: str,
+    question: str,
+    tools: dict[str, object],
+    messages: list[dict],
+    steps: list[AgentStep],
+) -> AgentResult | None:
+    """Process one LLM turn: finish, or run the chosen tool and record the step.
+
+    Args:
+        raw: Raw LLM response text for this turn.
+        question: The user question being answered.
+        tools: Mapping of tool name to callable (str -> str).
+        messages: Conversation so far; extended in place with this turn.
+        steps: Step trace so far; extended in place with this turn.
+
+    Returns:
+        AgentResult when the loop should stop, otherwise None.
+    """
+    try:
+        parsed = _parse_agent_response(raw)
+    except (json.JSONDecodeError, ValueError):
+        # Treat malformed output as a finish with the raw text as answer
+        return AgentResult(question=question, answer=raw.strip(), steps=steps)
+
+    thought = parsed.get("thought", "")
+    action = parsed.get("action", "finish")
+    action_input = parsed.get("action_input", "")
+
+    if action == "finish":
+        return AgentResult(question=question, answer=action_input, steps=steps)
+
+    # Execute the chosen tool
+    tool_fn = tools.get(action)
+    if tool_fn is None:
+        observation = f"Unknown tool '{action}'. Available: {list(tools.keys())}"
+    else:
+        try:
+            observation = str(tool_fn(action_input))
+        except Exception as exc:  # noqa: BLE001
+            observation = f"Tool error: {exc}"
+
+    step = AgentStep(
+        thought=thought,
+        action=action,
+        action_input=action_input,
+        observation=observation,
+    )
+    steps.append(step)
+
+    # Add the agent turn and tool result to the conversation
+    messages.append({"role": "assistant", "content": raw})
+    messages.append(
+        {"role": "user", "content": f"Observation: {observation}\nContinue."}
+    )
+    return None
+
+
+def _initial_messages(question: str, tools: dict[str, object]) -> list[dict]:
+    """Build the system + question messages that open every ReAct run."""
+    return [
+        {"role": "system", "content": _build_system_prompt(tuple(sorted(tools)))},
+        {"role": "user", "content": f"Question: {question}"},
+    ]
+
+
+# Per-field character budget and step count for the summary of elided steps.
+_SUMMARY_FIELD_CHARS = 80
+_SUMMARY_MAX_STEPS = 8
+
+
+def _clip(text: str) -> str:
+    """Shorten `text` to the summary field budget, marking any cut."""
+    if len(text) <= _SUMMARY_FIELD_CHARS:
+        return text
+    return text[: _SUMMARY_FIELD_CHARS - 3] + "..."
+
+
+def _check_history_window(history_window: int | None) -> None:
+    """Raise ValueError unless `history_window` is None or a positive step count."""
+    if history_window is not None and history_window < 1:
+        raise ValueError(f"history_window must be None or at least 1, got {history_window}")
+
+
+def _windowed_messages(
+    messages: list[dict], steps: list[AgentStep], history_window: int | None
+) -> list[dict]:
+    """Return the messages to send, keeping only the last `history_window` steps.
+
+    The system prompt and question are always kept. Older steps are collapsed
+    into one summary message listing the last `_SUMMARY_MAX_STEPS` of them,
+    with each action input and observation clipped to `_SUMMARY_FIELD_CHARS`
+    characters, so the prompt size per call stays bounded instead of growing
+    with every step.
+
+    Args:
+        messages: Full conversation (system, question, then one assistant/user
+            pair per recorded step).
+        steps: Step trace aligned with the assistant/user pairs in `messages`.
+        history_window: Number of most recent steps to send verbatim, or None
+            to send the full history.
+
+    Returns:
+        `messages` itself when no compaction is needed, otherwise a new list.
+    """
+    if history_window is None or len(steps) <= history_window:
+        return messages
+    evicted = steps[: len(steps) - history_window]
+    summary = "; ".join(
+        f"{step.action}({_clip(step.action_input)}) -> {_clip(step.observation)}"
+        for step in evicted[-_SUMMARY_MAX_STEPS:]
+    )
+    if len(evicted) > _SUMMARY_MAX_STEPS:
+        summary = f"({len(evicted) - _SUMMARY_MAX_STEPS} earlier steps omitted); {summary}"
+    return [
+        *messages[:2],
+        {"role": "user", "content": f"[Prior observations summary]: {summary}"},
+        *messages[len(messages) - 2 * history_window :],
+    ]
+
+
+def _max_steps_result(question: str, steps: list[AgentStep]) -> AgentResult:
+    """Return the last observation as answer when max_steps is exhausted."""
+    last_obs = steps[-1].observation if steps else "No answer produced."
+    return AgentResult(question=question, answer=last_obs, steps=steps)
+
+
 def run_react_loop(
     question: str,
     tools: dict[str, object],
     model: str = "gpt-4.1-mini",
     max_steps: int = 5,
+    history_window: int | None = None,
 ) -> AgentResult:
     """Run the ReAct agent loop for a given question.
 
@@ -76,60 +227,268 @@ def run_react_loop(
         tools: Mapping of tool name to callable (str -> str).
         model: OpenAI chat model used for the agent.
         max_steps: Maximum number of Thought-Action-Observation cycles.
+        history_window: If set, only the last N steps are sent verbatim and
+            older ones are collapsed into a summary message.
 
     Returns:
         AgentResult with the final answer and full step trace.
+
+    Raises:
+        ValueError: If `history_window` is set to less than 1.
     """
+    _check_history_window(history_window)
     client = OpenAI()
-    tool_names = list(tools.keys())
-    messages = [
-        {"role": "system", "content": _build_system_prompt(tool_names)},
-        {"role": "user", "content": f"Question: {question}"},
-    ]
-
+    messages = _initial_messages(question, tools)
     steps: list[AgentStep] = []
 
     for _ in range(max_steps):
-        response = client.chat.completions.create(model=model, messages=messages)
-        raw = response.choices[0].message.content or ""
-
-        try:
-            parsed = _parse_agent_response(raw)
-        except (json.JSONDecodeError, ValueError):
-            # Treat malformed output as a finish with the raw text as answer
-            return AgentResult(question=question, answer=raw.strip(), steps=steps)
-
-        thought = parsed.get("thought", "")
-        action = parsed.get("action", "finish")
-        action_input = parsed.get("action_input", "")
-
-        if action == "finish":
-            return AgentResult(question=question, answer=action_input, steps=steps)
-
-        # Execute the chosen tool
-        tool_fn = tools.get(action)
-        if tool_fn is None:
-            observation = f"Unknown tool '{action}'. Available: {tool_names}"
-        else:
-            try:
-                observation = str(tool_fn(action_input))
-            except Exception as exc:  # noqa: BLE001
-                observation = f"Tool error: {exc}"
-
-        step = AgentStep(
-            thought=thought,
-            action=action,
-            action_input=action_input,
-            observation=observation,
+        response = client.chat.completions.create(
+            model=model, messages=_windowed_messages(messages, steps, history_window)
         )
-        steps.append(step)
+        raw = response.choices[0].message.content or ""
 
-        # Add the agent turn and tool result to the conversation
-        messages.append({"role": "assistant", "content": raw})
-        messages.append(
-            {"role": "user", "content": f"Observation: {observation}\nContinue."}
-        )
+        result = _apply_agent_turn(raw, question, tools, messages, steps)
+        if result is not None:
+            return result
 
     # If max_steps reached without a finish, return last observation as answer
-    last_obs = steps[-1].observation if steps else "No answer produced."
-    return AgentResult(question=question, answer=last_obs, steps=steps)
+    return _max_steps_result(question, steps)
+
+
+async def arun_react_loop(
+    question: str,
+    tools: dict[str, object],
+    model: str = "gpt-4.1-mini",
+    max_steps: int = 5,
+    client: AsyncOpenAI | None = None,
+    history_window: int | None = None,
+) -> AgentResult:
+    """Async variant of `run_react_loop` that awaits each chat completion.
+
+    Tool calls run in a worker thread so blocking retrievers do not stall
+    the event loop while other questions are waiting on the network.
+
+    Args:
+        question: The user question to answer.
+        tools: Mapping of tool name to callable (str -> str).
+        model: OpenAI chat model used for the agent.
+        max_steps: Maximum number of Thought-Action-Observation cycles.
+        client: Optional shared async client; a new one is created if omitted
+            and closed before returning. A passed-in client is left open.
+        history_window: If set, only the last N steps are sent verbatim and
+            older ones are collapsed into a summary message.
+
+    Returns:
+        AgentResult with the final answer and full step trace.
+
+    Raises:
+        ValueError: If `history_window` is set to less than 1.
+    """
+    _check_history_window(history_window)
+    owns_client = client is None
+    client = client or AsyncOpenAI()
+    messages = _initial_messages(question, tools)
+    steps: list[AgentStep] = []
+
+    try:
+        for _ in range(max_steps):
+            response = await client.chat.completions.create(
+                model=model, messages=_windowed_messages(messages, steps, history_window)
+            )
+            raw = response.choices[0].message.content or ""
+
+            result = await asyncio.to_thread(_apply_agent_turn, raw, question, tools, messages, steps)
+            if result is not None:
+                return result
+    finally:
+        if owns_client:
+            await client.close()
+
+    return _max_steps_result(question, steps)
+
+
+async def run_react_loop_many(
+    questions: list[str],
+    tools: dict[str, object],
+    model: str = "gpt-4.1-mini",
+    max_steps: int = 5,
+    concurrency: int = 16,
+    history_window: int | None = None,
+) -> list[AgentResult]:
+    """Run one ReAct loop per question concurrently and keep input order.
+
+    Args:
+        questions: User questions to answer.
+        tools: Mapping of tool name to callable (str -> str), shared by all runs.
+        model: OpenAI chat model used for the agent.
+        max_steps: Maximum number of Thought-Action-Observation cycles per run.
+        concurrency: Maximum number of loops in flight at the same time.
+        history_window: If set, only the last N steps are sent verbatim and
+            older ones are collapsed into a summary message.
+
+    Returns:
+        One AgentResult per question, aligned with `questions`.
+
+    Raises:
+        ValueError: If `history_window` is set to less than 1.
+    """
+    _check_history_window(history_window)
+    client = AsyncOpenAI()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _bounded(question: str) -> AgentResult:
+        async with semaphore:
+            return await arun_react_loop(
+                question,
+                tools,
+                model=model,
+                max_steps=max_steps,
+                client=client,
+                history_window=history_window,
+            )
+
+    try:
+        return list(await asyncio.gather(*(_bounded(question) for question in questions)))
+    finally:
+        await client.close()
+
+
+_BATCH_TERMINAL_FAILURES = {"failed", "expired", "cancelled"}
+
+
+def _batch_error(record: dict) -> str | None:
+    """Return the error message of one batch result line, or None on success."""
+    if record.get("error"):
+        return (record["error"] or {}).get("message") or str(record["error"])
+    response = record.get("response") or {}
+    if response.get("status_code") != 200:
+        body = response.get("body") or {}
+        return (body.get("error") or {}).get("message") or f"HTTP {response.get('status_code')}"
+    return None
+
+
+def _submit_chat_batch(client: OpenAI, requests: list[dict], poll_interval: float) -> dict[str, str]:
+    """Submit chat-completion requests as one Batch API job and wait for output.
+
+    Args:
+        client: OpenAI client used for file upload and batch calls.
+        requests: Batch request lines (`custom_id`, `method`, `url`, `body`).
+        poll_interval: Seconds to wait between batch status checks.
+
+    Returns:
+        Mapping of `custom_id` to the assistant message content, with one
+        entry for every request.
+
+    Raises:
+        RuntimeError: If the batch ends in a failed, expired, or cancelled
+            state, or if any request failed or returned no result.
+    """
+    payload = "".join(json.dumps(request) + "\n" for request in requests).encode("utf-8")
+    input_file = client.files.create(file=("batch.jsonl", payload), purpose="batch")
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+
+    while batch.status != "completed":
+        if batch.status in _BATCH_TERMINAL_FAILURES:
+            raise RuntimeError(f"Batch {batch.id} ended with status '{batch.status}'.")
+        time.sleep(poll_interval)
+        batch = client.batches.retrieve(batch.id)
+
+    contents: dict[str, str] = {}
+    errors: dict[str, str] = {}
+    # A batch whose requests all failed has no output file, only an error file.
+    for file_id in (batch.output_file_id, batch.error_file_id):
+        if file_id is None:
+            continue
+        for line in client.files.content(file_id).text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            error = _batch_error(record)
+            if error is not None:
+                errors[record["custom_id"]] = error
+                continue
+            choices = record["response"]["body"].get("choices") or [{}]
+            contents[record["custom_id"]] = choices[0].get("message", {}).get("content") or ""
+
+    for request in requests:
+        if request["custom_id"] not in contents:
+            errors.setdefault(request["custom_id"], "no result in batch output")
+    if errors:
+        details = "; ".join(f"{custom_id}: {error}" for custom_id, error in sorted(errors.items())[:5])
+        raise RuntimeError(f"Batch {batch.id} had {len(errors)} failed request(s): {details}")
+    return contents
+
+
+def run_react_batch(
+    questions: list[str],
+    tools: dict[str, object],
+    model: str = "gpt-4.1-mini",
+    max_steps: int = 5,
+    poll_interval: float = 10.0,
+    history_window: int | None = None,
+) -> list[AgentResult]:
+    """Run ReAct loops for many questions through the OpenAI Batch API.
+
+    Each iteration submits the next LLM turn of every unfinished question as a
+    single batch job, runs the chosen tools locally, and feeds observations into
+    the following iteration. Use this for offline evaluation where cost matters
+    more than latency; use `run_react_loop` for interactive runs.
+
+    Args:
+        questions: User questions to answer.
+        tools: Mapping of tool name to callable (str -> str), shared by all runs.
+        model: OpenAI chat model used for the agent.
+        max_steps: Maximum number of Thought-Action-Observation cycles per run.
+        poll_interval: Seconds to wait between batch status checks.
+        history_window: If set, only the last N steps are sent verbatim and
+            older ones are collapsed into a summary message.
+
+    Returns:
+        One AgentResult per question, aligned with `questions`.
+
+    Raises:
+        ValueError: If `history_window` is set to less than 1.
+        RuntimeError: If a batch job fails, or any request in it fails or is
+            missing from the output; the message names the failing custom ids.
+    """
+    _check_history_window(history_window)
+    client = OpenAI()
+    conversations = [_initial_messages(question, tools) for question in questions]
+    traces: list[list[AgentStep]] = [[] for _ in questions]
+    results: list[AgentResult | None] = [None] * len(questions)
+
+    for step_num in range(max_steps):
+        pending = [idx for idx, result in enumerate(results) if result is None]
+        if not pending:
+            break
+
+        requests = [
+            {
+                "custom_id": f"{idx}:step{step_num}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": model,
+                    "messages": _windowed_messages(
+                        conversations[idx], traces[idx], history_window
+                    ),
+                },
+            }
+            for idx in pending
+        ]
+        contents = _submit_chat_batch(client, requests, poll_interval)
+
+        for idx in pending:
+            raw = contents[f"{idx}:step{step_num}"]
+            results[idx] = _apply_agent_turn(
+                raw, questions[idx], tools, conversations[idx], traces[idx]
+            )
+
+    return [
+        result if result is not None else _max_steps_result(question, trace)
+        for question, trace, result in zip(questions, traces, results, strict=True)
+    ]
@@ -10,15 +10,29 @@ Key operations:
   load_checkpoint  - retrieve a snapshot by id
   list_checkpoints - enumerate all stored snapshots
   rewind_to        - restore a previous snapshot for inspection or replay
+
+Snapshots use structural sharing: when a checkpoint is saved, each new step
+is stored as a deep read-only copy (mappings become MappingProxyType, lists
+become tuples). Stored steps never change, so a checkpoint only records a
+delta (the steps added since its parent checkpoint plus the scalar fields),
+and load_checkpoint folds the delta chain back into a full AgentState whose
+steps are thawed into fresh plain dicts and lists.
+Saving copies only the new steps, but it still compares every earlier step
+against the parent's stored copy, because the caller may have edited one in
+place; that check is linear in the history length and allocates nothing.
+Total memory stays proportional to the number of checkpoints plus the
+number of steps. The caller's own step dicts are never modified.
 """
 from __future__ import annotations
 
 import copy
 import uuid
+from collections.abc import Mapping
 from dataclasses import dataclass, field
+from types import MappingProxyType
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentState:
     """Full snapshot of an agent's execution state at a single point in time."""
 
@@ -28,14 +42,103 @@ class AgentState:
     current_answer: str = ""
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Checkpoint:
-    """Immutable snapshot of an AgentState with metadata for time travel."""
+    """Immutable snapshot of an AgentState with metadata for time travel.
+
+    The snapshot itself is stored as a delta inside `StateManager`;
+    `delta_index` points at it and `state` rebuilds the full `AgentState`.
+    """
 
     checkpoint_id: str
     step_number: int
     label: str
-    state: AgentState
+    delta_index: int
+    _manager: StateManager | None = field(default=None, repr=False, compare=False)
+
+    @property
+    def state(self) -> AgentState:
+        """A fresh copy of the snapshotted AgentState.
+
+        Raises:
+            ValueError: If the checkpoint was not created by a `StateManager`.
+        """
+        if self._manager is None:
+            raise ValueError(
+                f"Checkpoint '{self.checkpoint_id}' is not attached to a StateManager."
+            )
+        return self._manager._materialize(self.delta_index)
+
+
+@dataclass(slots=True, frozen=True)
+class _Delta:
+    """Changes recorded by one checkpoint relative to its parent checkpoint."""
+
+    parent: int | None
+    new_steps: tuple[Mapping, ...]
+    step_number: int
+    question: str
+    status: str
+    current_answer: str
+
+
+class _FrozenList(tuple):
+    """Read-only stand-in for a list inside a stored step."""
+
+    __slots__ = ()
+
+
+class _FrozenSet(frozenset):
+    """Read-only stand-in for a set inside a stored step."""
+
+    __slots__ = ()
+
+
+def _freeze(value: object) -> object:
+    """Return a deep read-only copy of a step value."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return _FrozenList(_freeze(item) for item in value)
+    if isinstance(value, tuple):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, set):
+        return _FrozenSet(value)
+    if isinstance(value, frozenset):
+        return value
+    return copy.deepcopy(value)
+
+
+def _thaw(value: object) -> object:
+    """Return a fresh mutable copy of a value stored by `_freeze`."""
+    if isinstance(value, MappingProxyType):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, _FrozenList):
+        return [_thaw(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(_thaw(item) for item in value)
+    if isinstance(value, _FrozenSet):
+        return set(value)
+    return copy.deepcopy(value)
+
+
+def _matches(current: object, saved: object) -> bool:
+    """Return True if `current` has the same content as the frozen `saved` value."""
+    if current is saved:
+        return True
+    if isinstance(saved, MappingProxyType):
+        return (
+            isinstance(current, Mapping)
+            and len(current) == len(saved)
+            and all(key in current and _matches(current[key], item) for key, item in saved.items())
+        )
+    if isinstance(saved, tuple):
+        return (
+            isinstance(current, (list, tuple))
+            and len(current) == len(saved)
+            and all(map(_matches, current, saved))
+        )
+    return current == saved
 
 
 class StateManager:
@@ -59,6 +162,42 @@ class StateManager:
 
     def __init__(self) -> None:
         self._checkpoints: dict[str, Checkpoint] = {}
+        self._deltas: list[_Delta] = []
+        # Delta most recently saved or loaded; the usual parent for the next save.
+        self._head: int | None = None
+        # Full stored step history of the head delta, kept so a save can check
+        # the shared prefix without walking the delta chain.
+        self._head_steps: list[Mapping] = []
+
+    def _chain_steps(self, index: int) -> list[Mapping]:
+        """Return the full step history stored by the delta chain ending at `index`."""
+        chain: list[tuple[Mapping, ...]] = []
+        cursor: int | None = index
+        while cursor is not None:
+            chain.append(self._deltas[cursor].new_steps)
+            cursor = self._deltas[cursor].parent
+        return [step for new_steps in reversed(chain) for step in new_steps]
+
+    def _extends_head(self, state: AgentState) -> bool:
+        """Return True if `state` continues the history stored at the head delta."""
+        if self._head is None:
+            return False
+        delta = self._deltas[self._head]
+        if state.question != delta.question or len(state.steps) < delta.step_number:
+            return False
+        # Any earlier step may have been replaced or edited since the parent
+        # was saved, so every step of the shared prefix must still match.
+        return all(map(_matches, state.steps, self._head_steps))
+
+    def _materialize(self, index: int) -> AgentState:
+        """Fold the delta chain ending at `index` into a fresh AgentState with plain steps."""
+        delta = self._deltas[index]
+        return AgentState(
+            question=delta.question,
+            steps=[_thaw(step) for step in self._chain_steps(index)],
+            status=delta.status,
+            current_answer=delta.current_answer,
+        )
 
     # ------------------------------------------------------------------
     # Saving
@@ -68,19 +207,37 @@ class StateManager:
         """Snapshot current state and store it.
 
         Args:
-            state: AgentState to snapshot (deep-copied for immutability).
+            state: AgentState to snapshot. It is not modified; steps added
+                since the parent checkpoint are stored as read-only copies.
             label: Human-readable label, e.g. 'after_step_2'.
 
         Returns:
             checkpoint_id string that can be passed to load_checkpoint/rewind_to.
         """
         checkpoint_id = uuid.uuid4().hex[:8]
-        snapshot = copy.deepcopy(state)
+        parent = self._head if self._extends_head(state) else None
+        if parent is None:
+            self._head_steps = []
+        new_steps = tuple(_freeze(step) for step in state.steps[len(self._head_steps):])
+        self._head_steps.extend(new_steps)
+
+        self._deltas.append(
+            _Delta(
+                parent=parent,
+                new_steps=new_steps,
+                step_number=len(state.steps),
+                question=state.question,
+                status=state.status,
+                current_answer=state.current_answer,
+            )
+        )
+        self._head = len(self._deltas) - 1
         self._checkpoints[checkpoint_id] = Checkpoint(
             checkpoint_id=checkpoint_id,
             step_number=len(state.steps),
             label=label or f"step_{len(state.steps)}",
-            state=snapshot,
+            delta_index=self._head,
+            _manager=self,
         )
         return checkpoint_id
 
@@ -89,20 +246,22 @@ class StateManager:
     # ------------------------------------------------------------------
 
     def load_checkpoint(self, checkpoint_id: str) -> AgentState:
-        """Return a deep copy of the stored state for the given checkpoint id.
+        """Return a fresh copy of the stored state for the given checkpoint id.
 
         Args:
             checkpoint_id: Id returned by save_checkpoint.
 
         Returns:
-            A fresh deep copy of the snapshotted AgentState.
+            A fresh copy of the snapshotted AgentState.
 
         Raises:
             KeyError: If checkpoint_id is not found.
         """
         if checkpoint_id not in self._checkpoints:
             raise KeyError(f"Checkpoint '{checkpoint_id}' not found.")
-        return copy.deepcopy(self._checkpoints[checkpoint_id].state)
+        self._head = self._checkpoints[checkpoint_id].delta_index
+        self._head_steps = self._chain_steps(self._head)
+        return self._materialize(self._head)
 
     # ------------------------------------------------------------------
     # Listing
@@ -130,7 +289,7 @@ class StateManager:
             checkpoint_id: Id of the checkpoint to rewind to.
 
         Returns:
-            A fresh deep copy of the snapshotted AgentState.
+            A fresh copy of the snapshotted AgentState.
 
         Raises:
             KeyError: If checkpoint_id is not found.
@@ -1,6 +1,58 @@
 from __future__ import annotations
 
-from .schema import Chunk, Document
+import re
+
+from .schema import Chunk, ChunkBatch, Document
+
+# Zero-padded part suffixes ("00", "01", ...) built once instead of per chunk.
+_PART_SUFFIXES = [f"{part:02d}" for part in range(256)]
+
+
+# A period followed by whitespace ends a sentence (covers ". " and ".\n").
+_SENTENCE_BREAK_RE = re.compile(r"\.\s+")
+
+
+def _part_suffix(part: int) -> str:
+    """Return the zero-padded chunk part suffix, using the prebuilt table."""
+    return _PART_SUFFIXES[part] if part < len(_PART_SUFFIXES) else f"{part:02d}"
+
+
+def _sentence_spans(text: str) -> list[tuple[int, int]]:
+    """Return `(start, end)` offsets of the non-empty sentences in `text`."""
+    spans: list[tuple[int, int]] = []
+    start = 0
+    for match in _SENTENCE_BREAK_RE.finditer(text):
+        if match.start() > start:
+            spans.append((start, match.start()))
+        start = match.end()
+    if start < len(text):
+        spans.append((start, len(text)))
+    return spans
+
+
+def fixed_chunk_documents_batch(documents: list[Document], chunk_size: int = 260) -> ChunkBatch:
+    """Split each document into fixed-width character chunks, column by column.
+
+    Same chunking as `fixed_chunk_documents`, but fills the parallel lists of a
+    `ChunkBatch` directly instead of allocating one `Chunk` per segment.
+
+    Args:
+        documents: Parsed documents to chunk.
+        chunk_size: Maximum number of characters per chunk.
+
+    Returns:
+        A `ChunkBatch` with ids, doc ids, sections, and texts aligned by row.
+    """
+    batch = ChunkBatch()
+    for document in documents:
+        text = document.text
+        id_prefix = f"{document.doc_id}-FIX-"
+        starts = range(0, len(text), chunk_size)
+        batch.ids.extend(id_prefix + _part_suffix(part) for part in range(len(starts)))
+        batch.doc_ids.extend([document.doc_id] * len(starts))
+        batch.sections.extend([document.section] * len(starts))
+        batch.texts.extend(text[start : start + chunk_size] for start in starts)
+    return batch
 
 
 def fixed_chunk_documents(documents: list[Document], chunk_size: int = 260) -> list[Chunk]:
@@ -13,25 +65,7 @@ def fixed_chunk_documents(documents: list[Document], chunk_size: int = 260) -> l
     Returns:
         Chunk records preserving source document/section metadata.
     """
-    chunks: list[Chunk] = []
-    for document in documents:
-        text = document.text
-        start = 0
-        part = 0
-        while start < len(text):
-            segment = text[start : start + chunk_size]
-            chunk_id = f"{document.doc_id}-FIX-{part:02d}"
-            chunks.append(
-                Chunk(
-                    chunk_id=chunk_id,
-                    doc_id=document.doc_id,
-                    section=document.section,
-                    text=segment,
-                )
-            )
-            start += chunk_size
-            part += 1
-    return chunks
+    return list(fixed_chunk_documents_batch(documents, chunk_size=chunk_size))
 
 
 def semantic_chunk_documents(documents: list[Document]) -> list[Chunk]:
@@ -48,17 +82,22 @@ def semantic_chunk_documents(documents: list[Document]) -> list[Chunk]:
     """
     chunks: list[Chunk] = []
     for document in documents:
-        sentence_like_parts = [piece.strip() for piece in document.text.split(". ") if piece.strip()]
-        if len(sentence_like_parts) <= 2:
-            merged_groups = [". ".join(sentence_like_parts)]
+        text = document.text.strip()
+        spans = _sentence_spans(text)
+        # Groups are sliced straight from the text instead of re-joined.
+        if not spans:
+            merged_groups = [""]
+        elif len(spans) <= 2:
+            merged_groups = [text[spans[0][0] : spans[-1][1]]]
         else:
             merged_groups = [
-                ". ".join(sentence_like_parts[:2]),
-                ". ".join(sentence_like_parts[2:]),
+                text[spans[0][0] : spans[1][1]],
+                text[spans[2][0] : spans[-1][1]],
             ]
 
+        id_prefix = f"{document.doc_id}-SEM-"
         for idx, group in enumerate(merged_groups):
-            chunk_id = f"{document.doc_id}-SEM-{idx:02d}"
+            chunk_id = id_prefix + _part_suffix(idx)
             chunks.append(
                 Chunk(
                     chunk_id=chunk_id,
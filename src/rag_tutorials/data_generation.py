@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-from dataclasses import asdict
+import copy
 import json
 import random
+import re
+from collections.abc import Iterable, Iterator
 from pathlib import Path
 
 from .schema import Document, QueryExample
@@ -66,6 +68,10 @@ SECTION_RATIONALES = {
     "Security": "Requires VPN/MFA/encryption requirements from security section.",
 }
 
+# `## Heading` lines start a section; `# Title` lines are not section content.
+_SECTION_HEADING_RE = re.compile(r"^[ \t]*## [ \t]*(\S.*?)[ \t\r]*$", re.MULTILINE)
+_TITLE_LINE_RE = re.compile(r"^[ \t]*# [ \t]*\S.*$", re.MULTILINE)
+
 HANDBOOK_TEXT = """# Z-Tech Global Work Handbook
 
 ## Remote Work
@@ -215,7 +221,9 @@ def parse_handbook_to_documents(handbook_text: str) -> list[Document]:
     """Parse handbook markdown text into section-level document records.
 
     The parser treats `##` headings as section boundaries and groups subsequent
-    lines into one `Document` per section.
+    lines into one `Document` per section. Section bodies are sliced directly
+    from the input between heading matches, `#` title lines are dropped, and
+    the remaining lines are stripped and joined with single spaces.
 
     Args:
         handbook_text: Raw handbook markdown/plain-text content.
@@ -224,44 +232,37 @@ def parse_handbook_to_documents(handbook_text: str) -> list[Document]:
         A list of section-level `Document` objects used for chunking.
     """
     documents: list[Document] = []
-    current_section = ""
-    section_lines: list[str] = []
-
-    def _commit_section(section: str, lines: list[str]) -> None:
-        """Commit buffered lines into a section document when a boundary is hit."""
-        if not section:
-            return
-        text = " ".join(line.strip() for line in lines if line.strip())
+    headings = list(_SECTION_HEADING_RE.finditer(handbook_text))
+
+    for heading, next_heading in zip(headings, [*headings[1:], None]):
+        section = heading.group(1)
+        end = next_heading.start() if next_heading else len(handbook_text)
+        body = _TITLE_LINE_RE.sub("", handbook_text[heading.end() : end])
+        text = " ".join(line.strip() for line in body.splitlines() if line.strip())
         if not text:
-            return
-        doc_id = f"DOC-HB-{section.replace(' ', '').upper()}"
+            continue
         documents.append(
             Document(
-                doc_id=doc_id,
+                doc_id=f"DOC-HB-{section.replace(' ', '').upper()}",
                 title=f"Z-Tech Handbook - {section}",
                 section=section,
                 text=text,
             )
         )
 
-    for raw_line in handbook_text.splitlines():
-        line = raw_line.strip()
-        if line.startswith("## "):
-            _commit_section(current_section, section_lines)
-            current_section = line[3:].strip()
-            section_lines = []
-            continue
-        if line.startswith("# "):
-            continue
-        section_lines.append(line)
-
-    _commit_section(current_section, section_lines)
     return documents
 
 
+# Parsed once at import; `generate_documents` hands out copies.
+_HANDBOOK_DOCS: tuple[Document, ...] = tuple(parse_handbook_to_documents(HANDBOOK_TEXT))
+
+
 def generate_documents(doc_count: int = 500, seed: int = 42) -> list[Document]:
     """Generate canonical tutorial documents from the shared handbook text.
 
+    The handbook is parsed once at import time; each call returns fresh
+    shallow copies of those documents so callers cannot alter the cache.
+
     Args:
         doc_count: Unused compatibility parameter kept for stable API.
         seed: Unused compatibility parameter kept for stable API.
@@ -270,7 +271,55 @@ def generate_documents(doc_count: int = 500, seed: int = 42) -> list[Document]:
         Section-level `Document` objects parsed from `HANDBOOK_TEXT`.
     """
     del doc_count, seed
-    return parse_handbook_to_documents(HANDBOOK_TEXT)
+    return [copy.copy(document) for document in _HANDBOOK_DOCS]
+
+
+def _group_by_section(documents: list[Document]) -> dict[str, list[Document]]:
+    """Group documents by section name, keeping every known section as a key."""
+    grouped: dict[str, list[Document]] = {section: [] for section in SECTIONS}
+    for document in documents:
+        grouped[document.section].append(document)
+    return grouped
+
+
+def _form_code(document: Document) -> str:
+    """Return the form identifier following the first "Form " in `document.text`."""
+    _, marker, after = document.text.partition("Form ")
+    if not marker:
+        raise ValueError(f"Document {document.doc_id} has no 'Form ' marker to build a query from")
+    return after.partition(" ")[0]
+
+
+def _iter_queries(documents: list[Document], query_count: int, seed: int) -> Iterator[QueryExample]:
+    """Yield evaluation queries one at a time; see `generate_queries`."""
+    rng = random.Random(seed)
+    grouped = _group_by_section(documents)
+    # Per-section lookups resolved once, in the same rotation order as SECTIONS.
+    section_plans = [
+        (section, grouped[section], QUERY_TEMPLATES[section], SECTION_RATIONALES[section])
+        for section in SECTIONS
+    ]
+    section_count = len(section_plans)
+    form_codes = {document.doc_id: _form_code(document) for document in grouped["International Tax"]}
+
+    for query_idx in range(query_count):
+        section, candidates, templates, rationale = section_plans[query_idx % section_count]
+        target_document = rng.choice(candidates)
+
+        template = templates[query_idx % len(templates)]
+        if section == "International Tax":
+            question = template.format(form_code=form_codes[target_document.doc_id])
+        else:
+            question = template
+
+        yield QueryExample(
+            query_id=f"Q-{query_idx:04d}",
+            question=question,
+            relevant_chunk_ids=[],
+            target_doc_id=target_document.doc_id,
+            target_section=target_document.section,
+            rationale=rationale,
+        )
 
 
 def generate_queries(documents: list[Document], query_count: int = 200, seed: int = 42) -> list[QueryExample]:
@@ -282,46 +331,34 @@ def generate_queries(documents: list[Document], query_count: int = 200, seed: in
     Args:
         documents: Parsed handbook documents used as relevance targets.
         query_count: Number of query examples to create.
-        seed: Random seed for deterministic target-document sampling.
+        seed: Random seed for deterministic target-document sampling. A private
+            `random.Random` instance is used, so the global RNG is untouched.
 
     Returns:
         A list of `QueryExample` records for benchmarking and analysis.
+
+    Raises:
+        ValueError: If an International Tax document has no "Form " marker.
     """
-    random.seed(seed)
-    grouped: dict[str, list[Document]] = {section: [] for section in SECTIONS}
-    for document in documents:
-        grouped[document.section].append(document)
+    return list(_iter_queries(documents, query_count, seed))
 
-    queries: list[QueryExample] = []
-    for query_idx in range(query_count):
-        section = SECTIONS[query_idx % len(SECTIONS)]
-        target_document = random.choice(grouped[section])
 
-        template = QUERY_TEMPLATES[section][query_idx % len(QUERY_TEMPLATES[section])]
-        if section == "International Tax":
-            form_code = target_document.text.split("Form ")[1].split(" ")[0]
-            question = template.format(form_code=form_code)
-        else:
-            question = template
-
-        rationale = SECTION_RATIONALES[section]
+def _write_jsonl(path: Path, records: Iterable[Document] | Iterable[QueryExample]) -> None:
+    """Write one JSON line per record, via each record's explicit `to_dict`."""
+    with path.open("w", encoding="utf-8") as file_handle:
+        for record in records:
+            file_handle.write(json.dumps(record.to_dict()) + "\n")
 
-        queries.append(
-            QueryExample(
-                query_id=f"Q-{query_idx:04d}",
-                question=question,
-                relevant_chunk_ids=[],
-                target_doc_id=target_document.doc_id,
-                target_section=target_document.section,
-                rationale=rationale,
-            )
-        )
 
-    return queries
+def save_dataset_stream(
+    documents: Iterable[Document],
+    queries: Iterable[QueryExample],
+    output_dir: str = "data",
+) -> None:
+    """Persist documents and queries as JSONL, writing records as they arrive.
 
-
-def save_dataset(documents: list[Document], queries: list[QueryExample], output_dir: str = "data") -> None:
-    """Persist generated documents and queries as JSONL files.
+    Accepts any iterables, including generators, so records are written as
+    they are produced without first building a list.
 
     Args:
         documents: Section-level document records to write.
@@ -331,15 +368,19 @@ def save_dataset(documents: list[Document], queries: list[QueryExample], output_
     root = Path(output_dir)
     root.mkdir(parents=True, exist_ok=True)
 
-    docs_path = root / "documents.jsonl"
-    with docs_path.open("w", encoding="utf-8") as file_handle:
-        for document in documents:
-            file_handle.write(json.dumps(asdict(document)) + "\n")
+    _write_jsonl(root / "documents.jsonl", documents)
+    _write_jsonl(root / "queries.jsonl", queries)
+
+
+def save_dataset(documents: list[Document], queries: list[QueryExample], output_dir: str = "data") -> None:
+    """Persist generated documents and queries as JSONL files.
 
-    query_path = root / "queries.jsonl"
-    with query_path.open("w", encoding="utf-8") as file_handle:
-        for query in queries:
-            file_handle.write(json.dumps(asdict(query)) + "\n")
+    Args:
+        documents: Section-level document records to write.
+        queries: Query/evaluation records to write.
+        output_dir: Directory where dataset files should be stored.
+    """
+    save_dataset_stream(documents, queries, output_dir=output_dir)
 
 
 def build_and_save_dataset(output_dir: str = "data", doc_count: int = 500, query_count: int = 200) -> None:
@@ -358,5 +399,8 @@ def build_and_save_dataset(output_dir: str = "data", doc_count: int = 500, query
     (root / "handbook_manual.txt").write_text(HANDBOOK_TEXT, encoding="utf-8")
 
     documents = generate_documents(doc_count=doc_count)
-    queries = generate_queries(documents=documents, query_count=query_count)
-    save_dataset(documents=documents, queries=queries, output_dir=output_dir)
+    save_dataset_stream(
+        documents=documents,
+        queries=_iter_queries(documents, query_count=query_count, seed=42),
+        output_dir=output_dir,
+    )
@@ -1,36 +1,367 @@
 from __future__ import annotations
 
+import asyncio
+import base64
+import functools
+import hashlib
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+
 import numpy as np
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+
+from .io_utils import load_chunks, save_chunks
+from .schema import Chunk, RetrievalResult
+
+EMBEDDING_BATCH_SIZE = 96
+EMBEDDING_MAX_INPUTS = 2048  # OpenAI rejects embedding requests with more inputs
+_SQLITE_LOOKUP_BATCH = 500
+
+
+@functools.cache
+def _get_client() -> OpenAI:
+    """Return the process-wide OpenAI client, created on first use.
+
+    Reusing one client keeps its HTTP connection pool warm instead of paying
+    client construction and a TLS handshake on every embedding call.
+    """
+    return OpenAI()
+
+
+def _batched(texts: list[str], batch_size: int) -> list[list[str]]:
+    """Split `texts` into consecutive sublists of at most `batch_size` items."""
+    return [texts[start : start + batch_size] for start in range(0, len(texts), batch_size)]
+
+
+def _row_vector(embedding: str | list[float]) -> np.ndarray:
+    """Decode one API embedding into a float32 vector.
+
+    Base64 payloads are decoded straight into a buffer; plain float lists
+    are still accepted for OpenAI-compatible servers that ignore
+    `encoding_format`.
+    """
+    if isinstance(embedding, str):
+        return np.frombuffer(base64.b64decode(embedding), dtype=np.float32)
+    return np.asarray(embedding, dtype=np.float32)
+
+
+def _fill_matrix(responses: list, row_count: int) -> np.ndarray:
+    """Copy embedding rows from API responses into one preallocated matrix."""
+    first_rows = responses[0].data if responses else []
+    dim = len(_row_vector(first_rows[0].embedding)) if first_rows else 0
+    matrix = np.empty((row_count, dim), dtype=np.float32)
+    row = 0
+    for response in responses:
+        for item in response.data:
+            matrix[row] = _row_vector(item.embedding)
+            row += 1
+    return matrix
+
+
+def _dedupe(texts: list[str]) -> tuple[list[str], np.ndarray | None]:
+    """Return unique texts in first-seen order plus the row map back to `texts`.
+
+    The row map is None when `texts` has no duplicates.
+    """
+    positions: dict[str, int] = {}
+    inverse = [positions.setdefault(text, len(positions)) for text in texts]
+    if len(positions) == len(texts):
+        return texts, None
+    return list(positions), np.asarray(inverse, dtype=np.intp)
+
+
+def _embed_uncached(texts: list[str], model: str, batch_size: int) -> np.ndarray:
+    """Embed each distinct text once through the API, in batches of `batch_size`."""
+    unique_texts, inverse = _dedupe(texts)
+    client = _get_client()
+    responses = [
+        client.embeddings.create(model=model, input=batch, encoding_format="base64")
+        for batch in _batched(unique_texts, min(batch_size, EMBEDDING_MAX_INPUTS))
+    ]
+    matrix = _fill_matrix(responses, len(unique_texts))
+    return matrix if inverse is None else matrix[inverse]
 
 
-def embed_texts(texts: list[str], model: str = "text-embedding-3-small") -> np.ndarray:
+def _cache_key(model: str, text: str) -> bytes:
+    """Return the content address of one `(model, text)` embedding."""
+    return hashlib.sha256(f"{model}\0{text}".encode()).digest()
+
+
+def _embed_with_cache(texts: list[str], model: str, batch_size: int, cache_path: str) -> np.ndarray:
+    """Embed `texts`, serving repeats from a SQLite cache and storing new vectors."""
+    Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+    keys = [_cache_key(model, text) for text in texts]
+
+    with closing(sqlite3.connect(cache_path)) as connection, connection:
+        connection.execute("CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)")
+        cached: dict[bytes, np.ndarray] = {}
+        unique_keys = list(dict.fromkeys(keys))
+        for batch in _batched(unique_keys, _SQLITE_LOOKUP_BATCH):
+            placeholders = ",".join("?" * len(batch))
+            rows = connection.execute(f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch)
+            cached.update((key, np.frombuffer(vector, dtype=np.float32)) for key, vector in rows)
+
+        missing = {key: text for key, text in zip(keys, texts) if key not in cached}
+        if missing:
+            fresh = _embed_uncached(list(missing.values()), model, batch_size)
+            connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, vector.tobytes()) for key, vector in zip(missing, fresh)],
+            )
+            cached.update(zip(missing, fresh))
+
+    dim = len(cached[keys[0]]) if keys else 0
+    matrix = np.empty((len(texts), dim), dtype=np.float32)
+    for row, key in enumerate(keys):
+        matrix[row] = cached[key]
+    return matrix
+
+
+def embed_texts(
+    texts: list[str],
+    model: str = "text-embedding-3-small",
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+    cache_path: str | None = None,
+) -> np.ndarray:
     """Generate embedding vectors for input texts using OpenAI embeddings API.
 
+    Duplicate texts are embedded once, and the remaining inputs are sent in
+    batches of `batch_size` per request over a shared client, so large
+    corpora need only a handful of round-trips.
+
+    Args:
+        texts: Input strings to embed.
+        model: Embedding model name.
+        batch_size: Maximum number of texts per API request, capped at
+            `EMBEDDING_MAX_INPUTS`.
+        cache_path: Optional SQLite file caching vectors by SHA-256 of model
+            and text. Only texts missing from the cache are sent to the API.
+
+    Returns:
+        A `float32` NumPy matrix shaped `(len(texts), embedding_dim)`.
+    """
+    if cache_path is None:
+        return _embed_uncached(texts, model, batch_size)
+    return _embed_with_cache(texts, model, batch_size, cache_path)
+
+
+async def embed_texts_async(
+    texts: list[str],
+    model: str = "text-embedding-3-small",
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+    client: AsyncOpenAI | None = None,
+    max_concurrency: int = 8,
+) -> np.ndarray:
+    """Async variant of `embed_texts` that sends batches concurrently.
+
     Args:
         texts: Input strings to embed.
         model: Embedding model name.
+        batch_size: Maximum number of texts per API request, capped at
+            `EMBEDDING_MAX_INPUTS`.
+        client: Optional shared async client; a new one is created if omitted
+            and closed before returning. A passed-in client is left open.
+        max_concurrency: Maximum number of batch requests in flight at once,
+            so large corpora do not trip the API rate limit.
 
     Returns:
         A `float32` NumPy matrix shaped `(len(texts), embedding_dim)`.
     """
-    client = OpenAI()
-    response = client.embeddings.create(model=model, input=texts)
-    vectors = [row.embedding for row in response.data]
-    return np.array(vectors, dtype=np.float32)
+    unique_texts, inverse = _dedupe(texts)
+    owns_client = client is None
+    client = client or AsyncOpenAI()
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _bounded(batch: list[str]):
+        async with semaphore:
+            return await client.embeddings.create(model=model, input=batch, encoding_format="base64")
+
+    try:
+        responses = await asyncio.gather(
+            *(_bounded(batch) for batch in _batched(unique_texts, min(batch_size, EMBEDDING_MAX_INPUTS)))
+        )
+    finally:
+        if owns_client:
+            await client.close()
+    matrix = _fill_matrix(list(responses), len(unique_texts))
+    return matrix if inverse is None else matrix[inverse]
 
 
-def cosine_similarity(query_vector: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+def cosine_similarity(
+    query_vector: np.ndarray,
+    matrix: np.ndarray,
+    normalized: bool = False,
+) -> np.ndarray:
     """Compute cosine similarity between one query vector and many vectors.
 
+    When `matrix` already has unit-length rows (see `normalize_rows`), pass
+    `normalized=True` to skip the per-row norm pass: scoring is then a single
+    matrix-vector product.
+
     Args:
         query_vector: Query embedding vector.
         matrix: Candidate embedding matrix where each row is one vector.
+        normalized: Whether the rows of `matrix` are already unit length.
 
     Returns:
         A 1D array of cosine similarity scores aligned to matrix rows.
     """
+    if normalized:
+        query_vector = np.asarray(query_vector, dtype=matrix.dtype)
+        return matrix @ (query_vector / max(float(np.linalg.norm(query_vector)), 1e-12))
     query_norm = np.linalg.norm(query_vector)
     matrix_norm = np.linalg.norm(matrix, axis=1)
     denominator = np.maximum(query_norm * matrix_norm, 1e-12)
     return (matrix @ query_vector) / denominator
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Scale each row of `matrix` to unit L2 norm.
+
+    Normalize a corpus matrix once and reuse it, so cosine scoring needs no
+    norm pass over the corpus per query.
+
+    Args:
+        matrix: Embedding matrix where each row is one vector.
+
+    Returns:
+        A new matrix of the same shape with unit-length rows (zero rows stay zero).
+    """
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def cosine_similarity_batch(query_matrix: np.ndarray, normalized_matrix: np.ndarray) -> np.ndarray:
+    """Compute cosine similarity between many queries and many vectors at once.
+
+    Args:
+        query_matrix: Query embeddings, one row per query.
+        normalized_matrix: Candidate matrix already passed through `normalize_rows`.
+
+    Returns:
+        A 2D array shaped `(num_queries, num_candidates)` of similarity scores.
+    """
+    return normalize_rows(query_matrix) @ normalized_matrix.T
+
+
+def top_k_cosine(
+    query_matrix: np.ndarray,
+    normalized_matrix: np.ndarray,
+    top_k: int,
+    block_size: int = 256,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return the `top_k` most similar candidates for every query.
+
+    Queries are scored in blocks of `block_size`, and each block is reduced
+    to its top-k right away. Peak memory is one `(block_size, N)` score block
+    rather than the full `(num_queries, N)` matrix.
+
+    Args:
+        query_matrix: Query embeddings, one row per query.
+        normalized_matrix: Candidate matrix already passed through `normalize_rows`.
+        top_k: Number of candidates to keep per query.
+        block_size: Number of queries scored per matrix product.
+
+    Returns:
+        Tuple of `(indices, scores)`, each shaped `(num_queries, min(top_k, N))`
+        and ordered best first within each row.
+    """
+    num_queries = len(query_matrix)
+    k = max(0, min(top_k, len(normalized_matrix)))
+    indices = np.empty((num_queries, k), dtype=np.intp)
+    score_dtype = np.result_type(query_matrix, normalized_matrix, np.float32)
+    scores = np.empty((num_queries, k), dtype=score_dtype)
+    if k == 0:
+        return indices, scores
+
+    for start in range(0, num_queries, block_size):
+        block = cosine_similarity_batch(query_matrix[start : start + block_size], normalized_matrix)
+        if k < block.shape[1]:
+            candidates = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        else:
+            candidates = np.broadcast_to(np.arange(block.shape[1]), block.shape)
+        candidate_scores = np.take_along_axis(block, candidates, axis=1)
+        order = np.argsort(-candidate_scores, axis=1, kind="stable")
+        indices[start : start + len(block)] = np.take_along_axis(candidates, order, axis=1)
+        scores[start : start + len(block)] = np.take_along_axis(candidate_scores, order, axis=1)
+    return indices, scores
+
+
+@dataclass(slots=True)
+class ChunkStore:
+    """Chunks paired with a contiguous matrix of their normalized embeddings.
+
+    Row `i` of `embeddings` belongs to `chunks[i]`. Dense search is one
+    matrix-vector product over the whole corpus, and `save`/`load` keep the
+    matrix as a single `.npy` file that can be memory-mapped on reload.
+    """
+
+    chunks: list[Chunk]
+    embeddings: np.ndarray
+
+    @classmethod
+    def from_chunks(
+        cls,
+        chunks: list[Chunk],
+        model: str = "text-embedding-3-small",
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+        cache_path: str | None = None,
+    ) -> ChunkStore:
+        """Embed chunk texts and build a store with L2-normalized rows.
+
+        Args:
+            chunks: Chunk records to embed.
+            model: Embedding model name.
+            batch_size: Maximum number of texts per API request.
+            cache_path: Optional SQLite embedding cache, as in `embed_texts`.
+
+        Returns:
+            A `ChunkStore` aligned with `chunks`.
+        """
+        vectors = embed_texts([chunk.text for chunk in chunks], model, batch_size, cache_path=cache_path)
+        return cls(chunks=chunks, embeddings=normalize_rows(vectors).astype(np.float32, copy=False))
+
+    def top_k(self, query_vector: np.ndarray, top_k: int = 5) -> list[RetrievalResult]:
+        """Return the chunks most cosine-similar to `query_vector`, best first.
+
+        Args:
+            query_vector: Query embedding; it need not be normalized.
+            top_k: Number of results to return.
+
+        Returns:
+            Dense retrieval results scored by cosine similarity.
+        """
+        indices, scores = top_k_cosine(np.atleast_2d(query_vector), self.embeddings, top_k)
+        return [
+            RetrievalResult(
+                chunk_id=self.chunks[idx].chunk_id,
+                score=score,
+                source="dense",
+                text=self.chunks[idx].text,
+            )
+            for idx, score in zip(indices[0].tolist(), scores[0].tolist())
+        ]
+
+    def save(self, directory: str | Path) -> None:
+        """Write `chunks.jsonl` and `embeddings.npy` into `directory`."""
+        destination = Path(directory)
+        destination.mkdir(parents=True, exist_ok=True)
+        save_chunks(self.chunks, destination / "chunks.jsonl")
+        np.save(destination / "embeddings.npy", self.embeddings)
+
+    @classmethod
+    def load(cls, directory: str | Path, mmap: bool = True) -> ChunkStore:
+        """Load a store written by `save`, memory-mapping the matrix by default.
+
+        Args:
+            directory: Directory containing `chunks.jsonl` and `embeddings.npy`.
+            mmap: Map the embedding file read-only instead of reading it into memory.
+
+        Returns:
+            The reloaded `ChunkStore`.
+        """
+        source = Path(directory)
+        embeddings = np.load(source / "embeddings.npy", mmap_mode="r" if mmap else None)
+        return cls(chunks=load_chunks(source / "chunks.jsonl"), embeddings=embeddings)
@@ -1,9 +1,15 @@
 from __future__ import annotations
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+import functools
+import inspect
 import re
 import time
 
+import numpy as np
+
 from .schema import QueryExample, RetrievalResult
 
 
@@ -18,24 +24,101 @@ class EvalRow:
     groundedness: float
 
 
+_METRIC_COLUMNS = ("recall_at_k", "mrr", "latency_ms", "groundedness")
+
+
+@dataclass(slots=True)
+class EvalRowTable:
+    """Column-oriented (struct-of-arrays) view of many `EvalRow` results.
+
+    Each metric is one float64 array aligned with `query_ids`, so aggregates
+    reduce a whole column in one NumPy call instead of walking row objects.
+    """
+
+    query_ids: list[str]
+    recall_at_k: np.ndarray
+    mrr: np.ndarray
+    latency_ms: np.ndarray
+    groundedness: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.query_ids)
+
+    @classmethod
+    def from_rows(cls, rows: list[EvalRow]) -> EvalRowTable:
+        """Transpose row records into metric columns in a single pass."""
+        values = np.array(
+            [(row.recall_at_k, row.mrr, row.latency_ms, row.groundedness) for row in rows],
+            dtype=np.float64,
+        ).reshape(len(rows), len(_METRIC_COLUMNS))
+        return cls([row.query_id for row in rows], *values.T)
+
+
+_TOKEN_BYTES = frozenset(b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-")
+# Byte table that keeps token characters and turns everything else into a space.
+_TOKEN_TABLE = bytes(byte if byte in _TOKEN_BYTES else 0x20 for byte in range(256))
+
+
+def _tokens(text: str) -> list[str]:
+    """Split lowercased text into `[a-z0-9-]+` tokens.
+
+    Equivalent to `re.findall(r"[a-zA-Z0-9-]+", text.lower())`. Non-ASCII
+    characters become `?` and all separators become spaces through one
+    `bytes.translate`, so the scan runs in C with no regex engine involved.
+    """
+    return text.lower().encode("ascii", "replace").translate(_TOKEN_TABLE).decode("ascii").split()
+
+
 def _normalize(text: str) -> set[str]:
     """Normalize text to comparable lowercase token set for overlap checks."""
-    return set(re.findall(r"[a-zA-Z0-9-]+", text.lower()))
+    return set(_tokens(text))
+
+
+@functools.lru_cache(maxsize=4096)
+def _context_tokens(text: str) -> frozenset[str]:
+    """Token set for one retrieved context, cached since chunk text is reused across queries."""
+    return frozenset(_tokens(text))
+
+
+@functools.lru_cache(maxsize=1024)
+def _context_vocabulary(contexts: tuple[str, ...]) -> frozenset[str]:
+    """Union of context token sets, cached per retrieved context list."""
+    return frozenset().union(*map(_context_tokens, contexts))
+
+
+_CHUNK_SUFFIX_RE = re.compile(r"-(?:FIX|SEM)-\d+$")
+
+
+@functools.lru_cache(maxsize=65536)
+def _chunk_doc_id(chunk_id: str) -> str:
+    """Return the source document id encoded in a `-FIX-NN`/`-SEM-NN` chunk id.
+
+    A chunk id without one of those suffixes is returned unchanged, so it
+    only matches a document id that is identical to it.
+    """
+    return _CHUNK_SUFFIX_RE.sub("", chunk_id)
 
 
 def recall_at_k(results: list[RetrievalResult], query: QueryExample, k: int = 5) -> float:
-    """Compute binary Recall@k using query's target document label."""
+    """Compute binary Recall@k using query's target document label.
+
+    A result is a hit when its chunk's source document id equals
+    `query.target_doc_id` exactly; see `_chunk_doc_id`.
+    """
     window = results[:k]
     for result in window:
-        if query.target_doc_id in result.chunk_id:
+        if _chunk_doc_id(result.chunk_id) == query.target_doc_id:
             return 1.0
     return 0.0
 
 
 def reciprocal_rank(results: list[RetrievalResult], query: QueryExample) -> float:
-    """Compute reciprocal rank for the first correctly targeted retrieval hit."""
+    """Compute reciprocal rank for the first correctly targeted retrieval hit.
+
+    Hits are matched as in `recall_at_k`.
+    """
     for rank, result in enumerate(results, start=1):
-        if query.target_doc_id in result.chunk_id:
+        if _chunk_doc_id(result.chunk_id) == query.target_doc_id:
             return 1.0 / rank
     return 0.0
 
@@ -46,11 +129,8 @@ def groundedness_score(answer: str, contexts: list[str]) -> float:
     if not answer_tokens:
         return 0.0
 
-    context_tokens: set[str] = set()
-    for context in contexts:
-        context_tokens.update(_normalize(context))
-
-    overlap = len(answer_tokens.intersection(context_tokens))
+    context_tokens = _context_vocabulary(tuple(contexts))
+    overlap = len(answer_tokens & context_tokens)
     return overlap / max(len(answer_tokens), 1)
 
 
@@ -80,6 +160,51 @@ def evaluate_single(
     answer = answer_fn(query.question, contexts)
     elapsed_ms = (time.perf_counter() - started) * 1000
 
+    return _eval_row(query, retrieved, contexts, answer, elapsed_ms, top_k)
+
+
+def evaluate_many(
+    queries: list[QueryExample],
+    retrieval_fn,
+    answer_fn,
+    top_k: int = 5,
+    workers: int = 16,
+) -> list[EvalRow]:
+    """Evaluate many queries on a thread pool and keep input order.
+
+    Synchronous counterpart of `evaluate_many_async` for callers that cannot
+    run an event loop (for example inside a notebook cell). `retrieval_fn`
+    and `answer_fn` must be thread-safe; network-bound calls release the GIL,
+    so throughput scales with `workers` up to the backend's rate limit.
+
+    Args:
+        queries: Query examples to evaluate.
+        retrieval_fn: Callable that returns ranked retrieval results.
+        answer_fn: Callable that generates answer text from question + contexts.
+        top_k: Number of contexts considered for metrics and answer grounding.
+        workers: Maximum number of queries evaluated at the same time.
+
+    Returns:
+        One `EvalRow` per query, aligned with `queries`.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(
+            executor.map(
+                lambda query: evaluate_single(query, retrieval_fn, answer_fn, top_k=top_k),
+                queries,
+            )
+        )
+
+
+def _eval_row(
+    query: QueryExample,
+    retrieved: list[RetrievalResult],
+    contexts: list[str],
+    answer: str,
+    elapsed_ms: float,
+    top_k: int,
+) -> EvalRow:
+    """Score one completed retrieval + generation run."""
     return EvalRow(
         query_id=query.query_id,
         recall_at_k=recall_at_k(retrieved, query, k=top_k),
@@ -89,14 +214,81 @@ def evaluate_single(
     )
 
 
-def summarize(rows: list[EvalRow]) -> dict[str, float]:
+async def _call(fn, *args, **kwargs):
+    """Await `fn` if it is a coroutine function, otherwise run it in a worker thread."""
+    if inspect.iscoroutinefunction(fn):
+        return await fn(*args, **kwargs)
+    return await asyncio.to_thread(fn, *args, **kwargs)
+
+
+async def evaluate_single_async(
+    query: QueryExample,
+    retrieval_fn,
+    answer_fn,
+    top_k: int = 5,
+) -> EvalRow:
+    """Async counterpart of `evaluate_single`.
+
+    `retrieval_fn` and `answer_fn` may be coroutine functions or plain
+    callables; plain callables run in a worker thread so they do not block
+    the event loop.
+
+    Args:
+        query: Query example containing expected relevance targets.
+        retrieval_fn: Callable that returns ranked retrieval results.
+        answer_fn: Callable that generates answer text from question + contexts.
+        top_k: Number of contexts considered for metrics and answer grounding.
+
+    Returns:
+        `EvalRow` with recall, MRR, latency, and groundedness values.
+    """
+    started = time.perf_counter()
+    try:
+        retrieved: list[RetrievalResult] = await _call(retrieval_fn, query.question, top_k=top_k)
+    except TypeError:
+        retrieved = await _call(retrieval_fn, query.question)
+    contexts = [result.text for result in retrieved[:top_k]]
+    answer = await _call(answer_fn, query.question, contexts)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    return _eval_row(query, retrieved, contexts, answer, elapsed_ms, top_k)
+
+
+async def evaluate_many_async(
+    queries: list[QueryExample],
+    retrieval_fn,
+    answer_fn,
+    top_k: int = 5,
+    concurrency: int = 32,
+) -> list[EvalRow]:
+    """Evaluate many queries concurrently and keep input order.
+
+    Latency for each row is measured from when its query gets a concurrency
+    slot, so time spent waiting for a slot is not counted.
+
+    Args:
+        queries: Query examples to evaluate.
+        retrieval_fn: Callable (sync or async) that returns ranked retrieval results.
+        answer_fn: Callable (sync or async) that generates answer text.
+        top_k: Number of contexts considered for metrics and answer grounding.
+        concurrency: Maximum number of queries in flight at the same time.
+
+    Returns:
+        One `EvalRow` per query, aligned with `queries`.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _bounded(query: QueryExample) -> EvalRow:
+        async with semaphore:
+            return await evaluate_single_async(query, retrieval_fn, answer_fn, top_k=top_k)
+
+    return list(await asyncio.gather(*(_bounded(query) for query in queries)))
+
+
+def summarize(rows: list[EvalRow] | EvalRowTable) -> dict[str, float]:
     """Aggregate per-query metrics into simple mean summary values."""
-    if not rows:
-        return {"recall_at_k": 0.0, "mrr": 0.0, "latency_ms": 0.0, "groundedness": 0.0}
-
-    return {
-        "recall_at_k": sum(row.recall_at_k for row in rows) / len(rows),
-        "mrr": sum(row.mrr for row in rows) / len(rows),
-        "latency_ms": sum(row.latency_ms for row in rows) / len(rows),
-        "groundedness": sum(row.groundedness for row in rows) / len(rows),
-    }
+    table = rows if isinstance(rows, EvalRowTable) else EvalRowTable.from_rows(rows)
+    if not len(table):
+        return dict.fromkeys(_METRIC_COLUMNS, 0.0)
+
+    return {name: float(getattr(table, name).mean()) for name in _METRIC_COLUMNS}
@@ -1,32 +1,88 @@
 from __future__ import annotations
 
-from dataclasses import asdict
+from collections.abc import Iterator
+from dataclasses import fields
+import functools
 import json
+import mmap
+import os
+from operator import itemgetter
 from pathlib import Path
+from typing import TypeVar
 
 from .data_generation import parse_handbook_to_documents
 from .schema import Chunk, Document, QueryExample
 
+_Record = TypeVar("_Record", Document, Chunk, QueryExample)
 
-def _load_jsonl(path: str | Path) -> list[dict]:
-    """Load newline-delimited JSON records from disk.
+
+def _iter_jsonl(path: str | Path) -> Iterator[tuple[int, dict]]:
+    """Yield newline-delimited JSON records from disk one at a time.
+
+    The file is memory-mapped and scanned for newlines, and each raw byte
+    slice goes straight to `json.loads`, avoiding per-line text decoding in
+    the file object. Blank lines are skipped.
 
     Args:
         path: File path to a JSONL file.
 
-    Returns:
-        A list of decoded JSON objects in file order.
+    Yields:
+        `(line_number, record)` pairs in file order, with 1-based line numbers.
+    """
+    with Path(path).open("rb") as file_handle:
+        size = os.fstat(file_handle.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            start = 0
+            line_number = 0
+            while start < size:
+                line_number += 1
+                end = mapped.find(b"\n", start)
+                if end == -1:
+                    end = size
+                line = mapped[start:end]
+                if line.strip():
+                    yield line_number, json.loads(line)
+                start = end + 1
+
+
+@functools.cache
+def _field_getter(record_type: type) -> tuple[itemgetter, frozenset[str]]:
+    """Return an itemgetter pulling `record_type`'s fields in declaration order, plus the field names."""
+    names = [record_field.name for record_field in fields(record_type)]
+    return itemgetter(*names), frozenset(names)
+
+
+def _load_records(path: str | Path, record_type: type[_Record]) -> list[_Record]:
+    """Stream a JSONL file into dataclass records built positionally.
+
+    Raises:
+        TypeError: If a line is not a JSON object or its keys differ from the
+            dataclass fields; the message names the file and line.
     """
-    records: list[dict] = []
-    with Path(path).open("r", encoding="utf-8") as file_handle:
-        for line in file_handle:
-            records.append(json.loads(line))
+    getter, names = _field_getter(record_type)
+    records: list[_Record] = []
+    for line_number, record in _iter_jsonl(path):
+        if not isinstance(record, dict):
+            raise TypeError(
+                f"{path}:{line_number}: expected a JSON object for {record_type.__name__}, "
+                f"got {type(record).__name__}"
+            )
+        if record.keys() != names:
+            unexpected = sorted(record.keys() - names)
+            missing = sorted(names - record.keys())
+            raise TypeError(
+                f"{path}:{line_number}: {record_type.__name__} record has "
+                f"unexpected keys {unexpected} and missing keys {missing}"
+            )
+        records.append(record_type(*getter(record)))
     return records
 
 
 def load_documents(path: str | Path = "data/documents.jsonl") -> list[Document]:
     """Load section-level `Document` records from JSONL."""
-    return [Document(**record) for record in _load_jsonl(path)]
+    return _load_records(path, Document)
 
 
 def load_handbook_documents(path: str | Path = "data/handbook_manual.txt") -> list[Document]:
@@ -44,7 +100,7 @@ def load_handbook_documents(path: str | Path = "data/handbook_manual.txt") -> li
 
 def load_queries(path: str | Path = "data/queries.jsonl") -> list[QueryExample]:
     """Load benchmark `QueryExample` records from JSONL."""
-    return [QueryExample(**record) for record in _load_jsonl(path)]
+    return _load_records(path, QueryExample)
 
 
 def save_chunks(chunks: list[Chunk], path: str | Path) -> None:
@@ -57,11 +113,10 @@ def save_chunks(chunks: list[Chunk], path: str | Path) -> None:
     destination = Path(path)
     destination.parent.mkdir(parents=True, exist_ok=True)
 
-    with destination.open("w", encoding="utf-8") as file_handle:
-        for chunk in chunks:
-            file_handle.write(json.dumps(asdict(chunk)) + "\n")
+    payload = "".join([json.dumps(chunk.to_dict()) + "\n" for chunk in chunks]).encode("utf-8")
+    destination.write_bytes(payload)
 
 
 def load_chunks(path: str | Path) -> list[Chunk]:
     """Load chunk records from a JSONL file."""
-    return [Chunk(**record) for record in _load_jsonl(path)]
+    return _load_records(path, Chunk)
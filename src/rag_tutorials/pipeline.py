@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+import functools
+
 import numpy as np
 
 from .chunking import fixed_chunk_documents, semantic_chunk_documents
-from .embeddings import cosine_similarity, embed_texts
+from .embeddings import embed_texts, normalize_rows, top_k_cosine
 from .io_utils import load_handbook_documents
-from .retrieval import bm25_search, build_bm25, reciprocal_rank_fusion
+from .retrieval import bm25_search, build_bm25, reciprocal_rank_fusion, top_k_indices
 from .schema import Chunk, RetrievalResult
 from .vector_store import build_chroma_collection, dense_search
 
@@ -26,27 +28,65 @@ def prepare_chunks(mode: str, handbook_path: str = "data/handbook_manual.txt") -
     return fixed_chunk_documents(documents)
 
 
-def build_dense_retriever(chunks: list[Chunk], collection_name: str, embedding_model: str):
+def build_dense_retriever(
+    chunks: list[Chunk],
+    collection_name: str,
+    embedding_model: str,
+    in_memory_max_chunks: int = 0,
+):
     """Build a dense retriever callable backed by a Chroma collection.
 
+    Opt-in fast path: corpora of fewer than `in_memory_max_chunks` chunks
+    skip Chroma and are searched directly in NumPy, where one matrix-vector
+    product is far cheaper than a collection insert and query. It is off by
+    default so the tutorials exercise the vector store. Both paths rank by
+    squared L2 distance and report `1 - distance`, matching Chroma's default
+    space.
+
     Args:
         chunks: Chunk records to index.
         collection_name: Name for persisted Chroma collection.
         embedding_model: OpenAI embedding model name.
+        in_memory_max_chunks: Corpus size below which Chroma is bypassed;
+            0 (the default) always uses Chroma.
 
     Returns:
-        Tuple of `(retrieve_callable, embedding_matrix)`.
+        Tuple of `(retrieve_callable, embedding_matrix)`. The callable caches
+        query embeddings per question, so repeated questions skip the API.
     """
     vectors = embed_texts([chunk.text for chunk in chunks], model=embedding_model)
+
+    @functools.lru_cache(maxsize=4096)
+    def embed_query(question: str) -> np.ndarray:
+        return embed_texts([question], model=embedding_model)[0]
+
+    if len(chunks) < in_memory_max_chunks:
+        squared_norms = np.einsum("ij,ij->i", vectors, vectors)
+
+        def retrieve(question: str, top_k: int = 5) -> list[RetrievalResult]:
+            query_vector = embed_query(question)
+            distances = squared_norms - 2.0 * (vectors @ query_vector) + query_vector @ query_vector
+            return [
+                RetrievalResult(
+                    chunk_id=chunks[idx].chunk_id,
+                    score=float(1.0 - distances[idx]),
+                    source="dense",
+                    text=chunks[idx].text,
+                )
+                for idx in top_k_indices(-distances, top_k)
+            ]
+
+        return retrieve, vectors
+
     collection = build_chroma_collection(
         chunks=chunks,
-        embeddings=vectors.tolist(),
+        embeddings=vectors,
         collection_name=collection_name,
     )
 
     def retrieve(question: str, top_k: int = 5) -> list[RetrievalResult]:
-        query_vector = embed_texts([question], model=embedding_model)[0]
-        return dense_search(collection=collection, query_embedding=query_vector.tolist(), top_k=top_k)
+        query_vector = embed_query(question)
+        return dense_search(collection=collection, query_embedding=query_vector, top_k=top_k)
 
     return retrieve, vectors
 
@@ -66,7 +106,7 @@ def build_hybrid_retriever(chunks: list[Chunk], dense_retriever):
     def retrieve(question: str, top_k: int = 5) -> list[RetrievalResult]:
         dense_results = dense_retriever(question, top_k=top_k)
         keyword_results = bm25_search(bm25_index, question, corpus, chunk_ids, top_k=top_k)
-        return reciprocal_rank_fusion(dense_results, keyword_results, k=60)[:top_k]
+        return reciprocal_rank_fusion(dense_results, keyword_results, k=60, top_k=top_k)
 
     return retrieve
 
@@ -84,15 +124,42 @@ def top_scores_preview(question: str, chunks: list[Chunk], vectors: np.ndarray,
     Returns:
         Ranked dictionaries with chunk ids, scores, and text snippets.
     """
-    query_vector = embed_texts([question], model=embedding_model)[0]
-    scores = cosine_similarity(query_vector, vectors)
-    indices = np.argsort(scores)[::-1][:top_k]
+    return top_scores_preview_batch([question], chunks, vectors, embedding_model, top_k=top_k)[0]
+
+
+def top_scores_preview_batch(
+    questions: list[str],
+    chunks: list[Chunk],
+    vectors: np.ndarray,
+    embedding_model: str,
+    top_k: int = 5,
+):
+    """Return top-scoring chunk previews for many queries in one pass.
+
+    All questions are embedded in one call and scored in blocks against the
+    row-normalized chunk matrix, keeping only each question's top-k.
+
+    Args:
+        questions: Query strings to inspect.
+        chunks: Chunk metadata aligned to `vectors`.
+        vectors: Chunk embedding matrix.
+        embedding_model: Embedding model used for query embedding.
+        top_k: Number of previews to return per question.
+
+    Returns:
+        One list of ranked preview dictionaries per question, in input order.
+    """
+    query_vectors = embed_texts(questions, model=embedding_model)
+    indices, scores = top_k_cosine(query_vectors, normalize_rows(vectors), top_k)
     return [
-        {
-            "rank": rank + 1,
-            "chunk_id": chunks[idx].chunk_id,
-            "score": float(scores[idx]),
-            "text": chunks[idx].text,
-        }
-        for rank, idx in enumerate(indices)
+        [
+            {
+                "rank": rank + 1,
+                "chunk_id": chunks[idx].chunk_id,
+                "score": float(score),
+                "text": chunks[idx].text,
+            }
+            for rank, (idx, score) in enumerate(zip(row_indices, row_scores))
+        ]
+        for row_indices, row_scores in zip(indices, scores)
     ]
@@ -5,15 +5,29 @@ Implements the Worker-Critic pattern:
   - Critic reviews the answer for accuracy and completeness.
   - If the Critic is not satisfied, it sends feedback back to the Worker.
   - The loop continues until the Critic approves or max_rounds is reached.
+
+`arun_reflection_loop` is the async counterpart, and `run_reflection_batch`
+runs loops for many questions concurrently on one `AsyncOpenAI` client.
+The sync functions accept a `cache_path` that serves repeated identical
+Worker or Critic prompts from a SQLite response cache.
 """
 from __future__ import annotations
 
+import asyncio
+import functools
+import hashlib
+import json
+import re
+import sqlite3
+from collections.abc import AsyncIterator, Callable
+from contextlib import closing
 from dataclasses import dataclass, field
+from pathlib import Path
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
 
-@dataclass
+@dataclass(slots=True)
 class CriticFeedback:
     """Structured review produced by the Critic agent."""
 
@@ -21,7 +35,7 @@ class CriticFeedback:
     feedback: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ReflectionResult:
     """Final output of a completed Worker-Critic reflection loop."""
 
@@ -50,12 +64,143 @@ _CRITIC_SYSTEM = (
     "Respond with valid JSON only. No extra text outside the JSON block."
 )
 
+_FUSED_SYSTEM = (
+    "You are a policy assistant that reviews its own work. Answer the question using\n"
+    "only the provided context; if the answer is not present, say you do not have\n"
+    "enough context. Then check the answer as a strict reviewer would: is it accurate,\n"
+    "complete, and grounded in the context?\n"
+    "\n"
+    "Respond with a JSON object with exactly three keys:\n"
+    "  answer    - the concise answer, citing relevant parts of the context\n"
+    "  approved  - true if the answer passes your review, false otherwise\n"
+    "  feedback  - if not approved, one or two sentences on what to fix.\n"
+    "              If approved, set to empty string.\n"
+    "\n"
+    "Respond with valid JSON only. No extra text outside the JSON block."
+)
+
+
+@functools.cache
+def _get_client() -> OpenAI:
+    """Return the module's OpenAI client, created on first use.
+
+    Worker and Critic calls reuse its keep-alive pool instead of paying a
+    new client and TLS handshake per round.
+    """
+    return OpenAI()
+
+
+def _context_message(context: str) -> dict:
+    """Leading message shared by every Worker and Critic call for one context.
+
+    Keeping the large, unchanging context first gives all rounds and both
+    roles an identical prompt prefix, which the provider's prompt cache can
+    reuse; only the short role instructions and question tail differ.
+    """
+    return {"role": "system", "content": f"Context:\n{context}"}
+
+
+def _worker_messages(
+    question: str, context: str, feedback: str, system: str = _WORKER_SYSTEM
+) -> list[dict]:
+    """Build the Worker chat messages, appending Critic feedback when present."""
+    user_content = f"Question: {question}"
+    if feedback:
+        user_content += f"\n\nCritic feedback on your previous answer:\n{feedback}\nPlease revise your answer."
+    return [
+        _context_message(context),
+        {"role": "system", "content": system},
+        {"role": "user", "content": user_content},
+    ]
+
+
+def _critic_messages(question: str, answer: str, context: str) -> list[dict]:
+    """Build the Critic chat messages for one draft answer."""
+    return [
+        _context_message(context),
+        {"role": "system", "content": _CRITIC_SYSTEM},
+        {"role": "user", "content": f"Question: {question}\n\nDraft answer:\n{answer}"},
+    ]
+
+
+def _complete(
+    model: str,
+    messages: list[dict],
+    cache_path: str | None = None,
+    validate: Callable[[str], object] | None = None,
+    **options,
+) -> str:
+    """Return the chat completion text for `messages`, optionally via a cache.
+
+    With `cache_path` set, replies are stored in a SQLite table keyed by a
+    hash of the model, messages, and request options, so an identical
+    prompt is answered without another API call. A fresh reply is passed to
+    `validate` before it is stored, so a reply that fails to parse is never
+    cached and a retry makes a new call.
+    """
+    if cache_path is None:
+        response = _get_client().chat.completions.create(model=model, messages=messages, **options)
+        return response.choices[0].message.content or ""
+
+    payload = json.dumps([model, messages, options], sort_keys=True)
+    key = hashlib.sha256(payload.encode()).digest()
+    Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+    with closing(sqlite3.connect(cache_path)) as connection, connection:
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS completions (key BLOB PRIMARY KEY, content TEXT NOT NULL)"
+        )
+        row = connection.execute("SELECT content FROM completions WHERE key = ?", (key,)).fetchone()
+    if row is not None:
+        return row[0]
+
+    content = _complete(model, messages, **options)
+    if validate is not None:
+        validate(content)
+    with closing(sqlite3.connect(cache_path)) as connection, connection:
+        connection.execute(
+            "INSERT OR REPLACE INTO completions (key, content) VALUES (?, ?)", (key, content)
+        )
+    return content
+
+
+def _parse_json_object(raw: str) -> dict:
+    """Parse a JSON-mode reply that must be a JSON object.
+
+    Raises:
+        ValueError: If the reply is not a JSON object. JSON mode makes this
+            rare, and raising surfaces it instead of silently approving.
+    """
+    try:
+        parsed = json.loads(raw)
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"Critic returned invalid JSON: {raw!r}") from exc
+    if not isinstance(parsed, dict):
+        # ValueError, not TypeError: callers retry any unparseable reply alike.
+        raise ValueError(  # noqa: TRY004
+            f"Critic returned {type(parsed).__name__}, expected a JSON object: {raw!r}"
+        )
+    return parsed
+
+
+def _parse_critic(raw: str) -> CriticFeedback:
+    """Parse the Critic's JSON-mode reply into a CriticFeedback.
+
+    Raises:
+        ValueError: If the reply is not a JSON object.
+    """
+    parsed = _parse_json_object(raw)
+    return CriticFeedback(
+        approved=bool(parsed.get("approved", False)),
+        feedback=str(parsed.get("feedback", "")),
+    )
+
 
 def worker_answer(
     question: str,
     context: str,
     feedback: str = "",
     model: str = "gpt-4.1-mini",
+    cache_path: str | None = None,
 ) -> str:
     """Generate an answer using retrieved context, optionally incorporating feedback.
 
@@ -64,23 +209,12 @@ def worker_answer(
         context: Retrieved context passages joined as a single string.
         feedback: Critic feedback from a previous round (empty string if first round).
         model: Chat model for answer generation.
+        cache_path: Optional SQLite file for reusing replies to identical prompts.
 
     Returns:
         Draft answer text.
     """
-    client = OpenAI()
-    user_content = f"Question: {question}\n\nContext:\n{context}"
-    if feedback:
-        user_content += f"\n\nCritic feedback on your previous answer:\n{feedback}\nPlease revise your answer."
-
-    response = client.chat.completions.create(
-        model=model,
-        messages=[
-            {"role": "system", "content": _WORKER_SYSTEM},
-            {"role": "user", "content": user_content},
-        ],
-    )
-    return (response.choices[0].message.content or "").strip()
+    return _complete(model, _worker_messages(question, context, feedback), cache_path).strip()
 
 
 def critic_review(
@@ -88,6 +222,7 @@ def critic_review(
     answer: str,
     context: str,
     model: str = "gpt-4.1-mini",
+    cache_path: str | None = None,
 ) -> CriticFeedback:
     """Evaluate a Worker answer and return approval status with optional feedback.
 
@@ -96,41 +231,120 @@ def critic_review(
         answer: Draft answer produced by the Worker.
         context: Retrieved context passages used by the Worker.
         model: Chat model for the critic.
+        cache_path: Optional SQLite file for reusing replies to identical prompts.
 
     Returns:
         CriticFeedback with approved flag and actionable feedback string.
+
+    Raises:
+        ValueError: If the Critic's reply cannot be parsed as a JSON object.
     """
-    import json
+    raw = _complete(
+        model,
+        _critic_messages(question, answer, context),
+        cache_path,
+        validate=_parse_json_object,
+        response_format={"type": "json_object"},
+    )
+    return _parse_critic(raw)
+
+
+# The bare refusal the Worker is told to give, with nothing else in the draft.
+_BARE_REFUSAL_RE = re.compile(
+    r"i (?:do not|don't) have enough context"
+    r"(?: to answer(?: (?:this|the|that|your) question)?)?[.!]?"
+)
+
 
-    client = OpenAI()
-    user_content = (
-        f"Question: {question}\n\n"
-        f"Context:\n{context}\n\n"
-        f"Draft answer:\n{answer}"
+def _normalize_draft(text: str) -> str:
+    """Lowercase `text`, fold curly apostrophes, and collapse whitespace for comparison."""
+    return " ".join(text.lower().replace("\u2019", "'").split())
+
+
+def _shortcut_critique(answer: str, history: list[dict]) -> CriticFeedback | None:
+    """Return a verdict for drafts where a Critic call cannot change the outcome.
+
+    A bare "I do not have enough context" refusal is what the Worker is told
+    to give when the context lacks the answer, so it is accepted as final.
+    Drafts that merely contain the phrase, such as a partial answer with a
+    hedge, still go to the Critic. A draft that
+    repeats the previous rejected one (ignoring case and whitespace) means
+    the loop has stalled. Returns None when the Critic should be consulted.
+    """
+    normalized = _normalize_draft(answer)
+    if _BARE_REFUSAL_RE.fullmatch(normalized):
+        return CriticFeedback(approved=True, feedback="")
+    if history and normalized == _normalize_draft(history[-1]["answer"]):
+        return CriticFeedback(approved=False, feedback="Answer unchanged from the previous round.")
+    return None
+
+
+def worker_and_critique(
+    question: str,
+    context: str,
+    feedback: str = "",
+    model: str = "gpt-4.1-mini",
+    cache_path: str | None = None,
+) -> tuple[str, CriticFeedback]:
+    """Answer and self-review in one JSON-mode call instead of Worker then Critic.
+
+    Args:
+        question: User question.
+        context: Retrieved context passages joined as a single string.
+        feedback: Review feedback from a previous round (empty string if first round).
+        model: Chat model for the combined call.
+        cache_path: Optional SQLite file for reusing replies to identical prompts.
+
+    Returns:
+        Tuple of `(answer, critique)` parsed from the model's JSON reply.
+
+    Raises:
+        ValueError: If the reply cannot be parsed as a JSON object.
+    """
+    raw = _complete(
+        model,
+        _worker_messages(question, context, feedback, system=_FUSED_SYSTEM),
+        cache_path,
+        validate=_parse_json_object,
+        response_format={"type": "json_object"},
     )
-    response = client.chat.completions.create(
-        model=model,
-        messages=[
-            {"role": "system", "content": _CRITIC_SYSTEM},
-            {"role": "user", "content": user_content},
-        ],
+    parsed = _parse_json_object(raw)
+    critique = CriticFeedback(
+        approved=bool(parsed.get("approved", False)),
+        feedback=str(parsed.get("feedback", "")),
     )
-    raw = (response.choices[0].message.content or "").strip()
+    return str(parsed.get("answer", "")).strip(), critique
+
+
+_UNPARSEABLE_REVIEW = CriticFeedback(
+    approved=False,
+    feedback="The review reply could not be parsed; re-check the answer against the context.",
+)
+
 
-    # Strip markdown fences if present
-    if raw.startswith("```"):
-        lines = raw.splitlines()
-        raw = "\n".join(lines[1:-1] if lines[-1].strip() == "```" else lines[1:])
+def _retry_unparseable(call, cache_path: str | None):
+    """Run `call(cache_path=cache_path)`, retrying once if the reply does not parse.
 
+    `_complete` never caches a reply that fails to parse, so the retry makes
+    a fresh call and caches its reply if that one parses.
+
+    Raises:
+        ValueError: If the retried reply cannot be parsed either.
+    """
     try:
-        parsed = json.loads(raw)
-        return CriticFeedback(
-            approved=bool(parsed.get("approved", False)),
-            feedback=str(parsed.get("feedback", "")),
-        )
-    except (json.JSONDecodeError, ValueError):
-        # If parsing fails, treat as approved to avoid infinite loops
-        return CriticFeedback(approved=True, feedback="")
+        return call(cache_path=cache_path)
+    except ValueError:
+        return call(cache_path=cache_path)
+
+
+def _round_entry(round_num: int, answer: str, critique: CriticFeedback) -> dict:
+    """Build one history record for a completed Worker-Critic round."""
+    return {
+        "round": round_num,
+        "answer": answer,
+        "approved": critique.approved,
+        "feedback": critique.feedback,
+    }
 
 
 def run_reflection_loop(
@@ -138,36 +352,75 @@ def run_reflection_loop(
     context: str,
     model: str = "gpt-4.1-mini",
     max_rounds: int = 3,
+    cache_path: str | None = None,
+    enable_shortcircuit: bool = False,
+    mode: str = "separate",
 ) -> ReflectionResult:
     """Run the Worker-Critic loop until approval or max_rounds is reached.
 
+    A review reply that is not valid JSON is retried once;
+    if it fails again the round is recorded as rejected and the loop goes on.
+    In `fused` mode such a round has no draft, so its answer is recorded empty.
+
     Args:
         question: User question to answer.
         context: Retrieved context passages as a single string.
         model: Chat model for both Worker and Critic.
         max_rounds: Maximum number of Worker-Critic cycles.
+        cache_path: Optional SQLite file for reusing replies to identical prompts.
+        enable_shortcircuit: Skip the Critic and stop early for bare "not
+            enough context" refusals and drafts identical to the previous
+            round. Off by default so every draft is reviewed.
+        mode: `separate` makes one Worker and one Critic call per round;
+            `fused` makes a single `worker_and_critique` call per round.
 
     Returns:
         ReflectionResult with the final approved answer and full round history.
+
+    Raises:
+        ValueError: If `mode` is not `separate` or `fused`.
     """
+    if mode not in ("separate", "fused"):
+        raise ValueError(f"Unknown reflection mode: {mode!r}")
     history: list[dict] = []
     feedback = ""
     answer = ""
 
     for round_num in range(1, max_rounds + 1):
-        answer = worker_answer(question, context, feedback=feedback, model=model)
-        critique = critic_review(question, answer, context, model=model)
-
-        history.append(
-            {
-                "round": round_num,
-                "answer": answer,
-                "approved": critique.approved,
-                "feedback": critique.feedback,
-            }
-        )
-
-        if critique.approved:
+        if mode == "fused":
+            try:
+                answer, critique = _retry_unparseable(
+                    functools.partial(
+                        worker_and_critique, question, context, feedback=feedback, model=model
+                    ),
+                    cache_path,
+                )
+            except ValueError:
+                # No usable draft this round; record the failure rather than
+                # the previous round's answer, and leave the shortcut unchecked.
+                answer, critique, shortcut = "", _UNPARSEABLE_REVIEW, None
+            else:
+                shortcut = _shortcut_critique(answer, history) if enable_shortcircuit else None
+                critique = shortcut or critique
+        else:
+            answer = worker_answer(
+                question, context, feedback=feedback, model=model, cache_path=cache_path
+            )
+            shortcut = _shortcut_critique(answer, history) if enable_shortcircuit else None
+            if shortcut is not None:
+                critique = shortcut
+            else:
+                try:
+                    critique = _retry_unparseable(
+                        functools.partial(critic_review, question, answer, context, model=model),
+                        cache_path,
+                    )
+                except ValueError:
+                    critique = _UNPARSEABLE_REVIEW
+
+        history.append(_round_entry(round_num, answer, critique))
+
+        if critique.approved or shortcut is not None:
             return ReflectionResult(
                 question=question,
                 final_answer=answer,
@@ -184,3 +437,223 @@ def run_reflection_loop(
         rounds=max_rounds,
         history=history,
     )
+
+
+async def aworker_answer(
+    question: str,
+    context: str,
+    feedback: str = "",
+    model: str = "gpt-4.1-mini",
+    client: AsyncOpenAI | None = None,
+) -> str:
+    """Async counterpart of `worker_answer`.
+
+    Args:
+        question: User question.
+        context: Retrieved context passages joined as a single string.
+        feedback: Critic feedback from a previous round (empty string if first round).
+        model: Chat model for answer generation.
+        client: Optional shared async client; a new one is created if omitted
+            and closed before returning. A passed-in client is left open.
+
+    Returns:
+        Draft answer text.
+    """
+    owns_client = client is None
+    client = client or AsyncOpenAI()
+    try:
+        response = await client.chat.completions.create(
+            model=model,
+            messages=_worker_messages(question, context, feedback),
+        )
+    finally:
+        if owns_client:
+            await client.close()
+    return (response.choices[0].message.content or "").strip()
+
+
+async def aworker_stream(
+    question: str,
+    context: str,
+    feedback: str = "",
+    model: str = "gpt-4.1-mini",
+    client: AsyncOpenAI | None = None,
+) -> AsyncIterator[str]:
+    """Stream the Worker answer as text deltas while it is generated.
+
+    Useful for showing the draft as it forms; joining the deltas gives the
+    same text as `aworker_answer` before stripping.
+
+    Args:
+        question: User question.
+        context: Retrieved context passages joined as a single string.
+        feedback: Critic feedback from a previous round (empty string if first round).
+        model: Chat model for answer generation.
+        client: Optional shared async client; a new one is created if omitted
+            and closed before returning. A passed-in client is left open.
+
+    Yields:
+        Non-empty content deltas in generation order.
+    """
+    owns_client = client is None
+    client = client or AsyncOpenAI()
+    try:
+        stream = await client.chat.completions.create(
+            model=model,
+            messages=_worker_messages(question, context, feedback),
+            stream=True,
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    finally:
+        if owns_client:
+            await client.close()
+
+
+async def acritic_review(
+    question: str,
+    answer: str,
+    context: str,
+    model: str = "gpt-4.1-mini",
+    client: AsyncOpenAI | None = None,
+) -> CriticFeedback:
+    """Async counterpart of `critic_review`.
+
+    Args:
+        question: Original user question.
+        answer: Draft answer produced by the Worker.
+        context: Retrieved context passages used by the Worker.
+        model: Chat model for the critic.
+        client: Optional shared async client; a new one is created if omitted
+            and closed before returning. A passed-in client is left open.
+
+    Returns:
+        CriticFeedback with approved flag and actionable feedback string.
+    """
+    owns_client = client is None
+    client = client or AsyncOpenAI()
+    try:
+        response = await client.chat.completions.create(
+            model=model,
+            messages=_critic_messages(question, answer, context),
+            response_format={"type": "json_object"},
+        )
+    finally:
+        if owns_client:
+            await client.close()
+    return _parse_critic(response.choices[0].message.content or "")
+
+
+async def _areview(
+    question: str, answer: str, context: str, model: str, client: AsyncOpenAI
+) -> CriticFeedback:
+    """Run `acritic_review`, retrying once if the reply does not parse.
+
+    A second unparseable reply is recorded as a rejection so the loop keeps
+    its completed rounds instead of failing.
+    """
+    for _ in range(2):
+        try:
+            return await acritic_review(question, answer, context, model=model, client=client)
+        except ValueError:
+            continue
+    return _UNPARSEABLE_REVIEW
+
+
+async def arun_reflection_loop(
+    question: str,
+    context: str,
+    model: str = "gpt-4.1-mini",
+    max_rounds: int = 3,
+    client: AsyncOpenAI | None = None,
+    enable_shortcircuit: bool = False,
+) -> ReflectionResult:
+    """Async counterpart of `run_reflection_loop`.
+
+    Always runs in `separate` mode and without the response cache; use the
+    sync loop for `fused` mode or `cache_path`.
+
+    Args:
+        question: User question to answer.
+        context: Retrieved context passages as a single string.
+        model: Chat model for both Worker and Critic.
+        max_rounds: Maximum number of Worker-Critic cycles.
+        client: Optional shared async client; a new one is created if omitted
+            and closed before returning. A passed-in client is left open.
+        enable_shortcircuit: Skip the Critic and stop early for bare "not
+            enough context" refusals and drafts identical to the previous
+            round. Off by default so every draft is reviewed.
+
+    Returns:
+        ReflectionResult with the final approved answer and full round history.
+    """
+    owns_client = client is None
+    client = client or AsyncOpenAI()
+    history: list[dict] = []
+    feedback = ""
+    answer = ""
+
+    try:
+        for round_num in range(1, max_rounds + 1):
+            answer = await aworker_answer(
+                question, context, feedback=feedback, model=model, client=client
+            )
+            shortcut = _shortcut_critique(answer, history) if enable_shortcircuit else None
+            critique = shortcut or await _areview(question, answer, context, model, client)
+            history.append(_round_entry(round_num, answer, critique))
+
+            if critique.approved or shortcut is not None:
+                return ReflectionResult(
+                    question=question,
+                    final_answer=answer,
+                    rounds=round_num,
+                    history=history,
+                )
+
+            feedback = critique.feedback
+
+        return ReflectionResult(
+            question=question,
+            final_answer=answer,
+            rounds=max_rounds,
+            history=history,
+        )
+    finally:
+        if owns_client:
+            await client.close()
+
+
+async def run_reflection_batch(
+    questions: list[str],
+    contexts: list[str],
+    model: str = "gpt-4.1-mini",
+    max_rounds: int = 3,
+    max_concurrency: int = 8,
+) -> list[ReflectionResult]:
+    """Run one reflection loop per question concurrently and keep input order.
+
+    Args:
+        questions: User questions to answer.
+        contexts: Retrieved context string for each question, aligned with `questions`.
+        model: Chat model for both Worker and Critic.
+        max_rounds: Maximum number of Worker-Critic cycles per question.
+        max_concurrency: Maximum number of loops in flight at the same time.
+
+    Returns:
+        One ReflectionResult per question, aligned with `questions`.
+    """
+    client = AsyncOpenAI()
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _bounded(question: str, context: str) -> ReflectionResult:
+        async with semaphore:
+            return await arun_reflection_loop(
+                question, context, model=model, max_rounds=max_rounds, client=client
+            )
+
+    try:
+        pairs = zip(questions, contexts, strict=True)
+        return list(await asyncio.gather(*(_bounded(q, c) for q, c in pairs)))
+    finally:
+        await client.close()
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import numpy as np
 from sentence_transformers import CrossEncoder
 
 from .schema import RetrievalResult
@@ -8,17 +9,39 @@ from .schema import RetrievalResult
 class LocalCrossEncoderReranker:
     """Second-stage reranker using a local cross-encoder model."""
 
-    def __init__(self, model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"):
+    def __init__(
+        self,
+        model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+        batch_size: int = 64,
+        onnx_file: str | None = None,
+    ):
         """Initialize the cross-encoder used for pairwise query-chunk scoring.
 
+        With `onnx_file` the model runs on ONNX Runtime instead of PyTorch;
+        `scripts/export_reranker.py` writes an INT8-quantized file for this.
+        A PyTorch model on a CUDA device has its weights cast to FP16.
+
         Args:
-            model_name: Sentence-transformers cross-encoder model identifier.
+            model_name: Sentence-transformers cross-encoder model identifier or
+                local directory containing an ONNX export.
+            batch_size: Number of query-chunk pairs scored per forward pass.
+            onnx_file: ONNX file inside the model directory, e.g.
+                `onnx/model_qint8_avx512_vnni.onnx`. None uses PyTorch.
         """
-        self.model = CrossEncoder(model_name)
+        if onnx_file is None:
+            self.model = CrossEncoder(model_name)
+            if self.model.device.type == "cuda":
+                self.model.model.half()
+        else:
+            self.model = CrossEncoder(model_name, backend="onnx", model_kwargs={"file_name": onnx_file})
+        self.batch_size = batch_size
 
     def rerank(self, query: str, results: list[RetrievalResult], top_k: int = 5) -> list[RetrievalResult]:
         """Reorder first-pass retrieval results with cross-encoder relevance scores.
 
+        Pairs are scored in order of chunk length so each batch pads to a
+        similar length, and scores are mapped back to the input order.
+
         Args:
             query: User query string.
             results: First-pass retrieval candidates to re-score.
@@ -27,23 +50,31 @@ class LocalCrossEncoderReranker:
         Returns:
             Top `top_k` results sorted by cross-encoder score.
         """
-        if not results:
+        if not results or top_k <= 0:
             return []
 
-        pairs = [[query, result.text] for result in results]
-        scores = self.model.predict(pairs)
-
-        ranked = sorted(
-            [
-                RetrievalResult(
-                    chunk_id=result.chunk_id,
-                    score=float(score),
-                    source="reranked",
-                    text=result.text,
-                )
-                for result, score in zip(results, scores, strict=True)
-            ],
-            key=lambda row: row.score,
-            reverse=True,
+        order = sorted(range(len(results)), key=lambda idx: len(results[idx].text))
+        sorted_scores = self.model.predict(
+            [[query, results[idx].text] for idx in order],
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
         )
-        return ranked[:top_k]
+        scores = np.empty(len(results), dtype=np.float64)
+        scores[order] = sorted_scores
+
+        if top_k < len(scores):
+            candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+            candidates.sort()
+        else:
+            candidates = np.arange(len(scores))
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        return [
+            RetrievalResult(
+                chunk_id=results[idx].chunk_id,
+                score=float(scores[idx]),
+                source="reranked",
+                text=results[idx].text,
+            )
+            for idx in ranked
+        ]
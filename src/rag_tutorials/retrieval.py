@@ -1,29 +1,215 @@
 from __future__ import annotations
 
-from collections import defaultdict
+import functools
+import hashlib
+import heapq
+import os
+import pickle
+from collections.abc import Sequence
+from importlib.metadata import version
+from pathlib import Path
 
+import numpy as np
 from rank_bm25 import BM25Okapi
+from scipy.sparse import csc_matrix
 
-from .schema import Chunk, RetrievalResult
+from .schema import Chunk, RetrievalBatch, RetrievalResult
 
+# Bump when `_tokenize` or the `SparseBM25` layout changes so pickled builds
+# from older code are not reused.
+_BM25_CACHE_FORMAT = 1
 
-def build_bm25(chunks: list[Chunk]) -> tuple[BM25Okapi, list[str], list[str]]:
+
+def _tokenize(text: str) -> list[str]:
+    """Lowercase and whitespace-split text into BM25 tokens."""
+    return text.lower().split()
+
+
+@functools.lru_cache(maxsize=1024)
+def _query_tokens(query: str) -> tuple[str, ...]:
+    """Return cached BM25 tokens for a query string."""
+    return tuple(_tokenize(query))
+
+
+def top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """Return indices of the `top_k` highest scores, best first.
+
+    Uses a linear-time partition and then sorts only the selected entries.
+    Ties go to the lower index, matching a stable descending sort.
+    """
+    if top_k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if top_k < len(scores):
+        kth = np.partition(scores, len(scores) - top_k)[len(scores) - top_k]
+        above = np.flatnonzero(scores > kth)
+        tied = np.flatnonzero(scores == kth)[: top_k - len(above)]
+        candidates = np.concatenate([above, tied])
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class SparseBM25:
+    """BM25 Okapi index with term weights precomputed into a sparse matrix.
+
+    `rank_bm25.BM25Okapi` walks every document in Python for each query term.
+    Here the per-(document, term) BM25 weights are computed once at build time
+    into a CSC matrix, so a query is a single sparse mat-vec over the columns
+    of its terms. Scores match `BM25Okapi.get_scores` for the same parameters.
+    The input token lists are kept on `tokenized_corpus` so callers that
+    rebuild or extend the index do not have to tokenize the corpus again.
+    """
+
+    def __init__(
+        self, tokenized_corpus: list[list[str]], k1: float = 1.5, b: float = 0.75, epsilon: float = 0.25
+    ):
+        """Fit BM25 statistics and precompute the term-document weight matrix.
+
+        Args:
+            tokenized_corpus: One token list per document.
+            k1: Term-frequency saturation parameter.
+            b: Document-length normalization strength.
+            epsilon: Floor factor applied to negative IDF values.
+        """
+        okapi = BM25Okapi(tokenized_corpus, k1=k1, b=b, epsilon=epsilon)
+        self.tokenized_corpus = tokenized_corpus
+        self.vocabulary = {term: col for col, term in enumerate(okapi.idf)}
+        idf = np.fromiter(okapi.idf.values(), dtype=np.float64, count=len(self.vocabulary))
+
+        rows: list[int] = []
+        cols: list[int] = []
+        freqs: list[int] = []
+        for row, doc_freqs in enumerate(okapi.doc_freqs):
+            rows.extend([row] * len(doc_freqs))
+            cols.extend(self.vocabulary[term] for term in doc_freqs)
+            freqs.extend(doc_freqs.values())
+
+        row_idx = np.asarray(rows, dtype=np.int64)
+        col_idx = np.asarray(cols, dtype=np.int64)
+        tf = np.asarray(freqs, dtype=np.float64)
+        doc_len = np.asarray(okapi.doc_len, dtype=np.float64)[row_idx]
+        weights = idf[col_idx] * tf * (k1 + 1) / (tf + k1 * (1 - b + b * doc_len / okapi.avgdl))
+        self.weights = csc_matrix(
+            (weights, (row_idx, col_idx)), shape=(okapi.corpus_size, len(self.vocabulary))
+        )
+
+    def get_scores(self, query_tokens: Sequence[str]) -> np.ndarray:
+        """Score every document against a tokenized query.
+
+        Args:
+            query_tokens: Query tokens; repeated tokens count once per occurrence.
+
+        Returns:
+            Array of BM25 scores aligned with the indexed corpus.
+        """
+        counts: dict[int, int] = {}
+        for token in query_tokens:
+            col = self.vocabulary.get(token)
+            if col is not None:
+                counts[col] = counts.get(col, 0) + 1
+        if not counts:
+            return np.zeros(self.weights.shape[0], dtype=np.float64)
+        columns = self.weights[:, list(counts)]
+        return columns @ np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+
+
+def build_bm25(
+    chunks: list[Chunk], k1: float = 1.5, b: float = 0.75, epsilon: float = 0.25
+) -> tuple[SparseBM25, list[str], list[str]]:
     """Create a BM25 index and aligned lookup arrays from chunks.
 
     Args:
         chunks: Chunk records used as the keyword-retrieval corpus.
+        k1: Term-frequency saturation parameter.
+        b: Document-length normalization strength.
+        epsilon: Floor factor applied to negative IDF values.
 
     Returns:
         Tuple of `(index, corpus_texts, chunk_ids)` for retrieval and mapping.
     """
     corpus = [chunk.text for chunk in chunks]
-    tokenized = [text.lower().split() for text in corpus]
-    index = BM25Okapi(tokenized)
+    tokenized = [_tokenize(text) for text in corpus]
+    index = SparseBM25(tokenized, k1=k1, b=b, epsilon=epsilon)
     chunk_ids = [chunk.chunk_id for chunk in chunks]
     return index, corpus, chunk_ids
 
 
-def bm25_search(index: BM25Okapi, query: str, corpus: list[str], chunk_ids: list[str], top_k: int = 5):
+def build_or_load_bm25(
+    chunks: list[Chunk],
+    cache_dir: str = "artifacts/bm25",
+    k1: float = 1.5,
+    b: float = 0.75,
+    epsilon: float = 0.25,
+) -> tuple[SparseBM25, list[str], list[str]]:
+    """Return a BM25 index for chunks, reusing a pickled build when available.
+
+    The cache file name is derived from a hash of the chunk ids and texts, the
+    BM25 parameters, the cache format version, and the installed rank-bm25,
+    NumPy and SciPy versions, so a change to any of them produces a fresh
+    build. Cache files are trusted local artifacts written by this function.
+
+    Args:
+        chunks: Chunk records used as the keyword-retrieval corpus.
+        cache_dir: Directory holding pickled BM25 builds.
+        k1: Term-frequency saturation parameter.
+        b: Document-length normalization strength.
+        epsilon: Floor factor applied to negative IDF values.
+
+    Returns:
+        Tuple of `(index, corpus_texts, chunk_ids)`, as from `build_bm25`.
+    """
+    digest = hashlib.sha256()
+    settings = (
+        _BM25_CACHE_FORMAT,
+        repr((k1, b, epsilon)),
+        version("rank-bm25"),
+        version("numpy"),
+        version("scipy"),
+    )
+    digest.update("\0".join(map(str, settings)).encode("utf-8") + b"\0")
+    for chunk in chunks:
+        digest.update(chunk.chunk_id.encode("utf-8") + b"\0" + chunk.text.encode("utf-8") + b"\0")
+    path = Path(cache_dir) / f"bm25-{digest.hexdigest()[:16]}.pkl"
+
+    if path.exists():
+        with path.open("rb") as handle:
+            return pickle.load(handle)
+
+    built = build_bm25(chunks, k1=k1, b=b, epsilon=epsilon)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("wb") as handle:
+        pickle.dump(built, handle, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    return built
+
+
+def bm25_search_batch(
+    index: SparseBM25, query: str, corpus: list[str], chunk_ids: list[str], top_k: int = 5
+) -> RetrievalBatch:
+    """Run BM25 keyword retrieval and return the top hits as a column batch.
+
+    Args:
+        index: Pre-built BM25 index.
+        query: User query string.
+        corpus: Raw corpus texts aligned with the index.
+        chunk_ids: Chunk ids aligned with the corpus.
+        top_k: Number of results to return.
+
+    Returns:
+        Keyword retrieval batch sorted by BM25 score.
+    """
+    scores = np.asarray(index.get_scores(_query_tokens(query)))
+    ranked = top_k_indices(scores, top_k).tolist()
+    return RetrievalBatch(
+        chunk_ids=[chunk_ids[idx] for idx in ranked],
+        scores=scores[ranked],
+        sources=["keyword"] * len(ranked),
+        texts=[corpus[idx] for idx in ranked],
+    )
+
+
+def bm25_search(index: SparseBM25, query: str, corpus: list[str], chunk_ids: list[str], top_k: int = 5):
     """Run BM25 keyword retrieval and return top-ranked chunk results.
 
     Args:
@@ -36,24 +222,14 @@ def bm25_search(index: BM25Okapi, query: str, corpus: list[str], chunk_ids: list
     Returns:
         Keyword retrieval results sorted by BM25 score.
     """
-    scores = index.get_scores(query.lower().split())
-    ranked = sorted(range(len(scores)), key=lambda idx: scores[idx], reverse=True)[:top_k]
-
-    results: list[RetrievalResult] = []
-    for idx in ranked:
-        results.append(
-            RetrievalResult(
-                chunk_id=chunk_ids[idx],
-                score=float(scores[idx]),
-                source="keyword",
-                text=corpus[idx],
-            )
-        )
-    return results
+    return bm25_search_batch(index, query, corpus, chunk_ids, top_k=top_k).to_list()
 
 
 def reciprocal_rank_fusion(
-    dense_results: list[RetrievalResult], keyword_results: list[RetrievalResult], k: int = 60
+    dense_results: list[RetrievalResult],
+    keyword_results: list[RetrievalResult],
+    k: int = 60,
+    top_k: int | None = None,
 ) -> list[RetrievalResult]:
     """Fuse dense and keyword rankings via Reciprocal Rank Fusion (RRF).
 
@@ -61,22 +237,27 @@ def reciprocal_rank_fusion(
         dense_results: Ranked dense-retrieval results.
         keyword_results: Ranked BM25 results.
         k: RRF smoothing constant controlling rank contribution decay.
+        top_k: Optional cap on returned results; only that many are selected
+            instead of sorting the full fused ranking.
 
     Returns:
         Fused ranking sorted by combined RRF score.
     """
-    fused_scores: dict[str, float] = defaultdict(float)
+    fused_scores: dict[str, float] = {}
     text_lookup: dict[str, str] = {}
 
-    for rank, result in enumerate(dense_results, start=1):
-        fused_scores[result.chunk_id] += 1 / (k + rank)
-        text_lookup[result.chunk_id] = result.text
-
-    for rank, result in enumerate(keyword_results, start=1):
-        fused_scores[result.chunk_id] += 1 / (k + rank)
-        text_lookup[result.chunk_id] = result.text
+    # Single pass over both rankings; enumerating from k + 1 yields the RRF
+    # denominator directly.
+    for ranking in (dense_results, keyword_results):
+        for denominator, result in enumerate(ranking, start=k + 1):
+            chunk_id = result.chunk_id
+            fused_scores[chunk_id] = fused_scores.get(chunk_id, 0.0) + 1 / denominator
+            text_lookup[chunk_id] = result.text
 
-    sorted_results = sorted(fused_scores.items(), key=lambda item: item[1], reverse=True)
+    if top_k is None:
+        sorted_results = sorted(fused_scores.items(), key=lambda item: item[1], reverse=True)
+    else:
+        sorted_results = heapq.nlargest(top_k, fused_scores.items(), key=lambda item: item[1])
     return [
         RetrievalResult(chunk_id=chunk_id, score=score, source="hybrid", text=text_lookup[chunk_id])
         for chunk_id, score in sorted_results
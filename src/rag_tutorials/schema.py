@@ -1,4 +1,7 @@
-from dataclasses import dataclass
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+
+import numpy as np
 
 
 @dataclass(slots=True)
@@ -10,6 +13,10 @@ class Document:
     section: str
     text: str
 
+    def to_dict(self) -> dict[str, str]:
+        """Return the record as a plain dict for JSON serialization."""
+        return {"doc_id": self.doc_id, "title": self.title, "section": self.section, "text": self.text}
+
 
 @dataclass(slots=True)
 class Chunk:
@@ -20,6 +27,34 @@ class Chunk:
     section: str
     text: str
 
+    def to_dict(self) -> dict[str, str]:
+        """Return the record as a plain dict for JSON serialization."""
+        return {"chunk_id": self.chunk_id, "doc_id": self.doc_id, "section": self.section, "text": self.text}
+
+
+@dataclass(slots=True)
+class ChunkBatch:
+    """Column-oriented (struct-of-arrays) batch of chunks.
+
+    Each list holds one `Chunk` field, aligned by position, so bulk consumers
+    such as embedding or serialization can read one column without touching
+    the others. Iterating yields `Chunk` records for row-oriented callers.
+    """
+
+    ids: list[str] = field(default_factory=list)
+    doc_ids: list[str] = field(default_factory=list)
+    sections: list[str] = field(default_factory=list)
+    texts: list[str] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[Chunk]:
+        for chunk_id, doc_id, section, text in zip(
+            self.ids, self.doc_ids, self.sections, self.texts, strict=True
+        ):
+            yield Chunk(chunk_id=chunk_id, doc_id=doc_id, section=section, text=text)
+
 
 @dataclass(slots=True)
 class QueryExample:
@@ -32,12 +67,66 @@ class QueryExample:
     target_section: str
     rationale: str
 
+    def to_dict(self) -> dict[str, object]:
+        """Return the record as a plain dict for JSON serialization."""
+        return {
+            "query_id": self.query_id,
+            "question": self.question,
+            "relevant_chunk_ids": self.relevant_chunk_ids,
+            "target_doc_id": self.target_doc_id,
+            "target_section": self.target_section,
+            "rationale": self.rationale,
+        }
 
-@dataclass(slots=True)
+
+@dataclass(slots=True, frozen=True)
 class RetrievalResult:
-    """Standard retrieval output used across dense, BM25, and hybrid paths."""
+    """Standard retrieval output used across dense, BM25, and hybrid paths.
+
+    Frozen, and therefore hashable, so results can be deduplicated in sets or
+    used as cache keys. Each stage builds new results rather than editing them.
+    """
 
     chunk_id: str
     score: float
     source: str
     text: str
+
+
+@dataclass(slots=True)
+class RetrievalBatch:
+    """Column-oriented (struct-of-arrays) batch of retrieval results.
+
+    Scores live in one float64 array so ranking stages can sort or select
+    with NumPy instead of reading a float off each `RetrievalResult`. The
+    string columns stay lists aligned by row. Iterating yields
+    `RetrievalResult` records for row-oriented callers.
+    """
+
+    chunk_ids: list[str] = field(default_factory=list)
+    scores: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.float64))
+    sources: list[str] = field(default_factory=list)
+    texts: list[str] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.chunk_ids)
+
+    def __iter__(self) -> Iterator[RetrievalResult]:
+        for chunk_id, score, source, text in zip(
+            self.chunk_ids, self.scores.tolist(), self.sources, self.texts, strict=True
+        ):
+            yield RetrievalResult(chunk_id=chunk_id, score=score, source=source, text=text)
+
+    @classmethod
+    def from_results(cls, results: list[RetrievalResult]) -> "RetrievalBatch":
+        """Build a batch from row-oriented retrieval results."""
+        return cls(
+            chunk_ids=[result.chunk_id for result in results],
+            scores=np.fromiter((result.score for result in results), dtype=np.float64, count=len(results)),
+            sources=[result.source for result in results],
+            texts=[result.text for result in results],
+        )
+
+    def to_list(self) -> list[RetrievalResult]:
+        """Return the batch as a list of `RetrievalResult` records."""
+        return list(self)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 import os
 from dataclasses import dataclass
 
@@ -22,13 +23,22 @@ class Paths:
     artifacts_dir: str = "artifacts"
 
 
+@functools.cache
+def _load_env_file() -> None:
+    """Read `.env` into the process environment once per process."""
+    load_dotenv()
+
+
 def load_settings() -> tuple[OpenAISettings, Paths]:
     """Load environment-backed settings and return typed config objects.
 
+    The `.env` file is parsed on the first call only; environment variables
+    are still read on every call and fresh config objects are returned.
+
     Returns:
         Tuple containing OpenAI model settings and common path settings.
     """
-    load_dotenv()
+    _load_env_file()
     return (
         OpenAISettings(
             embedding_model=os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small"),
@@ -36,3 +46,13 @@ def load_settings() -> tuple[OpenAISettings, Paths]:
         ),
         Paths(),
     )
+
+
+def reload_settings() -> tuple[OpenAISettings, Paths]:
+    """Re-read `.env` and return freshly loaded settings.
+
+    Returns:
+        Tuple containing OpenAI model settings and common path settings.
+    """
+    _load_env_file.cache_clear()
+    return load_settings()
@@ -1,49 +1,147 @@
 from __future__ import annotations
 
+import functools
+from collections.abc import Callable
 from pathlib import Path
 
 import chromadb
+import numpy as np
+from chromadb.api.shared_system_client import SharedSystemClient
 
 from .schema import Chunk, RetrievalResult
 
+CHROMA_ADD_BATCH_SIZE = 256
+
+
+@functools.lru_cache(maxsize=8)
+def _get_client(persist_dir: str) -> chromadb.ClientAPI:
+    """Return a persistent Chroma client for an absolute `persist_dir`, opened once per path.
+
+    Call it through `_client_for`, which resolves the path and drops stale clients.
+    """
+    return chromadb.PersistentClient(path=persist_dir)
+
+
+def _client_for(persist_dir: str) -> chromadb.ClientAPI:
+    """Return the cached Chroma client for `persist_dir`, keyed on its resolved path.
+
+    Resolving first means a relative path still names the same directory
+    after an `os.chdir`. If the directory is missing, for example deleted by
+    a tutorial rerun, cached clients and Chroma's own per-path system cache
+    are cleared so the recreated directory gets a fresh client.
+    """
+    path = Path(persist_dir).resolve()
+    if not path.is_dir():
+        _get_client.cache_clear()
+        SharedSystemClient.clear_system_cache()
+    path.mkdir(parents=True, exist_ok=True)
+    return _get_client(str(path))
+
+
+def auto_hnsw_params(vector_count: int) -> dict[str, int]:
+    """Suggest HNSW build and search parameters for a corpus size.
+
+    Small corpora keep Chroma's defaults; larger ones get more graph links and
+    wider candidate lists so recall holds up as the index grows.
+
+    Args:
+        vector_count: Number of vectors that will be indexed.
+
+    Returns:
+        Keyword arguments for `build_chroma_collection`: `hnsw_m`,
+        `hnsw_ef_construction`, and `hnsw_ef_search`.
+    """
+    if vector_count < 10_000:
+        m, ef_construction, ef_search = 16, 100, 100
+    elif vector_count < 100_000:
+        m, ef_construction, ef_search = 16, 200, 128
+    elif vector_count < 1_000_000:
+        m, ef_construction, ef_search = 32, 256, 200
+    else:
+        m, ef_construction, ef_search = 48, 400, 256
+    return {"hnsw_m": m, "hnsw_ef_construction": ef_construction, "hnsw_ef_search": ef_search}
+
+
+def _chunk_columns(chunks: list[Chunk]) -> tuple[list[str], list[str], list[dict[str, str]]]:
+    """Split chunks into Chroma's id, document, and metadata columns in one pass."""
+    ids: list[str] = [""] * len(chunks)
+    documents: list[str] = [""] * len(chunks)
+    metadatas: list[dict[str, str]] = [{}] * len(chunks)
+    for row, chunk in enumerate(chunks):
+        ids[row] = chunk.chunk_id
+        documents[row] = chunk.text
+        metadatas[row] = {"doc_id": chunk.doc_id, "section": chunk.section}
+    return ids, documents, metadatas
+
 
 def build_chroma_collection(
     chunks: list[Chunk],
-    embeddings: list[list[float]],
+    embeddings: np.ndarray | list[list[float]],
     collection_name: str,
     persist_dir: str = "artifacts/chroma",
+    batch_size: int = CHROMA_ADD_BATCH_SIZE,
+    progress_callback: Callable[[int, int], None] | None = None,
+    hnsw_m: int = 16,
+    hnsw_ef_construction: int = 100,
+    hnsw_ef_search: int = 100,
 ):
     """Create (or replace) a persistent Chroma collection from chunk embeddings.
 
+    Chunks are added in batches of `batch_size`, which bounds the size of
+    each insert payload and stays under Chroma's maximum batch size.
+
     Args:
         chunks: Chunk records to index.
-        embeddings: Embedding vectors aligned to chunks.
+        embeddings: Embedding vectors aligned to chunks, ideally a `float32`
+            matrix shaped `(len(chunks), dim)`; lists are converted once.
         collection_name: Chroma collection name.
         persist_dir: Local path for Chroma persistence.
+        batch_size: Number of chunks per `collection.add` call.
+        progress_callback: Optional callable receiving `(added, total)` after
+            each batch.
+        hnsw_m: Maximum graph neighbors per vector in the HNSW index.
+        hnsw_ef_construction: Candidate list size while building the index.
+        hnsw_ef_search: Candidate list size at query time. The defaults match
+            Chroma's; see `auto_hnsw_params` for larger corpora.
 
     Returns:
         The created Chroma collection instance.
     """
-    Path(persist_dir).mkdir(parents=True, exist_ok=True)
-    client = chromadb.PersistentClient(path=persist_dir)
+    client = _client_for(persist_dir)
     existing = {collection.name for collection in client.list_collections()}
     if collection_name in existing:
         client.delete_collection(collection_name)
 
-    collection = client.create_collection(name=collection_name)
-    collection.add(
-        ids=[chunk.chunk_id for chunk in chunks],
-        embeddings=embeddings,
-        documents=[chunk.text for chunk in chunks],
-        metadatas=[{"doc_id": chunk.doc_id, "section": chunk.section} for chunk in chunks],
+    collection = client.create_collection(
+        name=collection_name,
+        configuration={
+            "hnsw": {
+                "max_neighbors": hnsw_m,
+                "ef_construction": hnsw_ef_construction,
+                "ef_search": hnsw_ef_search,
+            }
+        },
     )
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    total = len(chunks)
+    for start in range(0, total, batch_size):
+        ids, documents, metadatas = _chunk_columns(chunks[start : start + batch_size])
+        collection.add(
+            ids=ids,
+            embeddings=matrix[start : start + batch_size],
+            documents=documents,
+            metadatas=metadatas,
+        )
+        if progress_callback is not None:
+            progress_callback(start + len(ids), total)
     return collection
 
 
 def dense_search(
     collection,
-    query_embedding: list[float],
+    query_embedding: np.ndarray | list[float],
     top_k: int = 5,
+    ef_search: int | None = None,
 ) -> list[RetrievalResult]:
     """Query a Chroma collection and map results to tutorial result schema.
 
@@ -51,22 +149,33 @@ def dense_search(
         collection: Chroma collection to query.
         query_embedding: Embedded query vector.
         top_k: Number of nearest chunks to return.
+        ef_search: Optional HNSW query-time candidate list size for this
+            query. When it differs from the collection's setting, the setting
+            is changed for the query and restored afterwards. The change is
+            briefly visible to other queries on the same collection; use
+            `build_chroma_collection(hnsw_ef_search=...)` to set it permanently.
 
     Returns:
         Dense retrieval results with distance-derived relevance scores.
     """
-    response = collection.query(query_embeddings=[query_embedding], n_results=top_k)
+    previous_ef_search = None
+    if ef_search is not None:
+        current = collection.configuration["hnsw"]["ef_search"]
+        if current != ef_search:
+            collection.modify(configuration={"hnsw": {"ef_search": ef_search}})
+            previous_ef_search = current
+    query = np.asarray(query_embedding, dtype=np.float32)
+    try:
+        response = collection.query(query_embeddings=[query], n_results=top_k)
+    finally:
+        if previous_ef_search is not None:
+            collection.modify(configuration={"hnsw": {"ef_search": previous_ef_search}})
 
     ids = response["ids"][0]
     docs = response["documents"][0]
-    scores = response["distances"][0]
+    scores = (1.0 - np.asarray(response["distances"][0], dtype=np.float64)).tolist()
 
     return [
-        RetrievalResult(
-            chunk_id=chunk_id,
-            score=float(1.0 - distance),
-            source="dense",
-            text=text,
-        )
-        for chunk_id, text, distance in zip(ids, docs, scores, strict=True)
+        RetrievalResult(chunk_id=chunk_id, score=score, source="dense", text=text)
+        for chunk_id, text, score in zip(ids, docs, scores, strict=True)
     ]
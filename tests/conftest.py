@@ -1,4 +1,7 @@
-"""Shared pytest fixtures for rag_tutorials unit tests."""
+"""Shared pytest fixtures for rag_tutorials unit tests.
+
+Fixtures are session-scoped and shared across tests; copy before mutating.
+"""
 from __future__ import annotations
 
 import pytest
@@ -6,7 +9,7 @@ import pytest
 from rag_tutorials.schema import Chunk, Document, QueryExample, RetrievalResult
 
 
-@pytest.fixture()
+@pytest.fixture(scope="session")
 def sample_document() -> Document:
     return Document(
         doc_id="DOC-001",
@@ -16,7 +19,7 @@ def sample_document() -> Document:
     )
 
 
-@pytest.fixture()
+@pytest.fixture(scope="session")
 def sample_documents() -> list[Document]:
     return [
         Document(
@@ -43,7 +46,7 @@ def sample_documents() -> list[Document]:
     ]
 
 
-@pytest.fixture()
+@pytest.fixture(scope="session")
 def sample_chunk() -> Chunk:
     return Chunk(
         chunk_id="DOC-001-FIX-00",
@@ -53,7 +56,7 @@ def sample_chunk() -> Chunk:
     )
 
 
-@pytest.fixture()
+@pytest.fixture(scope="session")
 def sample_chunks() -> list[Chunk]:
     return [
         Chunk(
@@ -77,7 +80,7 @@ def sample_chunks() -> list[Chunk]:
     ]
 
 
-@pytest.fixture()
+@pytest.fixture(scope="session")
 def sample_query() -> QueryExample:
     return QueryExample(
         query_id="Q-0001",
@@ -89,7 +92,7 @@ def sample_query() -> QueryExample:
     )
 
 
-@pytest.fixture()
+@pytest.fixture(scope="session")
 def sample_result() -> RetrievalResult:
     return RetrievalResult(
         chunk_id="DOC-001-FIX-00",
@@ -99,7 +102,7 @@ def sample_result() -> RetrievalResult:
     )
 
 
-@pytest.fixture()
+@pytest.fixture(scope="session")
 def sample_results() -> list[RetrievalResult]:
     return [
         RetrievalResult(
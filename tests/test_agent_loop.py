@@ -4,12 +4,26 @@ OpenAI calls are mocked so no API key is needed.
 """
 from __future__ import annotations
 
+import asyncio
+import dataclasses
+import functools
 import json
-from unittest.mock import MagicMock, patch
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from rag_tutorials.agent_loop import AgentResult, AgentStep, run_react_loop
+from rag_tutorials.agent_loop import (
+    AgentResult,
+    AgentStep,
+    _build_system_prompt,
+    _parse_agent_response,
+    _windowed_messages,
+    arun_react_loop,
+    run_react_batch,
+    run_react_loop,
+    run_react_loop_many,
+)
 
 
 # ---------------------------------------------------------------------------
@@ -19,21 +33,62 @@ from rag_tutorials.agent_loop import AgentResult, AgentStep, run_react_loop
 
 def _make_chat_response(content: str):
     """Build a minimal fake OpenAI chat response object."""
-    choice = MagicMock()
-    choice.message.content = content
-    resp = MagicMock()
-    resp.choices = [choice]
-    return resp
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class _StubCompletions:
+    """Plain stand-in for `client.chat.completions` that replays responses.
+
+    Responses are returned in order and the last one repeats, so a single
+    response serves loops that call the model any number of times.
+    """
+
+    def __init__(self):
+        self._responses: list = []
+        self.calls: list[dict] = []
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        if len(self._responses) > 1:
+            return self._responses.pop(0)
+        return self._responses[0]
+
+
+class _StubClient:
+    """OpenAI client stub exposing only `chat.completions.create`."""
+
+    def __init__(self):
+        self.completions = _StubCompletions()
+        self.chat = SimpleNamespace(completions=self.completions)
+
+    def set_responses(self, responses: list) -> None:
+        self.completions._responses = list(responses)
+
+
+@pytest.fixture()
+def mock_openai(monkeypatch) -> _StubClient:
+    """Make `agent_loop.OpenAI()` return one stub client for the test."""
+    client = _StubClient()
+    monkeypatch.setattr("rag_tutorials.agent_loop.OpenAI", lambda *args, **kwargs: client)
+    return client
+
+
+@functools.cache
+def _finish_payload(answer: str) -> str:
+    return json.dumps({"thought": "I have the answer.", "action": "finish", "action_input": answer})
+
+
+@functools.cache
+def _tool_payload(tool: str, tool_input: str) -> str:
+    return json.dumps({"thought": "Let me look this up.", "action": tool, "action_input": tool_input})
 
 
 def _finish_response(answer: str):
-    payload = json.dumps({"thought": "I have the answer.", "action": "finish", "action_input": answer})
-    return _make_chat_response(payload)
+    return _make_chat_response(_finish_payload(answer))
 
 
 def _tool_response(tool: str, tool_input: str):
-    payload = json.dumps({"thought": "Let me look this up.", "action": tool, "action_input": tool_input})
-    return _make_chat_response(payload)
+    return _make_chat_response(_tool_payload(tool, tool_input))
 
 
 # ---------------------------------------------------------------------------
@@ -49,6 +104,11 @@ class TestAgentDataclasses:
         assert step.action_input == "query"
         assert step.observation == "result"
 
+    def test_agent_step_is_frozen(self):
+        step = AgentStep(thought="t", action="retrieve", action_input="query", observation="result")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            step.observation = "changed"  # type: ignore[misc]
+
     def test_agent_result_defaults_empty_steps(self):
         result = AgentResult(question="q", answer="a")
         assert result.steps == []
@@ -59,113 +119,346 @@ class TestAgentDataclasses:
         assert len(result.steps) == 1
 
 
+# ---------------------------------------------------------------------------
+# _parse_agent_response
+# ---------------------------------------------------------------------------
+
+
+class TestParseAgentResponse:
+    def test_plain_json(self):
+        assert _parse_agent_response('{"action": "finish"}') == {"action": "finish"}
+
+    def test_fenced_json_with_language_tag(self):
+        text = '```json\n{"action": "finish"}\n```'
+        assert _parse_agent_response(text) == {"action": "finish"}
+
+    def test_unterminated_fence(self):
+        assert _parse_agent_response('```\n{"action": "retrieve"}') == {"action": "retrieve"}
+
+    def test_invalid_json_raises(self):
+        with pytest.raises(json.JSONDecodeError):
+            _parse_agent_response("not json")
+
+
+# ---------------------------------------------------------------------------
+# _build_system_prompt
+# ---------------------------------------------------------------------------
+
+
+class TestBuildSystemPrompt:
+    def test_lists_tools(self):
+        prompt = _build_system_prompt(("retrieve", "search"))
+        assert "retrieve, search" in prompt
+
+    def test_same_tool_set_reuses_cached_prompt(self, mock_openai):
+        mock_openai.set_responses([_finish_response("done")])
+
+        run_react_loop("q1", tools={"b": str, "a": str})
+        run_react_loop("q2", tools={"a": str, "b": str})
+        first, second = (call["messages"][0]["content"] for call in mock_openai.completions.calls)
+
+        assert first is second
+
+
 # ---------------------------------------------------------------------------
 # run_react_loop
 # ---------------------------------------------------------------------------
 
 
 class TestRunReactLoop:
-    def test_immediate_finish(self):
+    def test_immediate_finish(self, mock_openai):
         """Agent finishes on the first LLM call."""
-        with patch("rag_tutorials.agent_loop.OpenAI") as mock_openai_cls:
-            mock_client = MagicMock()
-            mock_openai_cls.return_value = mock_client
-            mock_client.chat.completions.create.return_value = _finish_response("42 days")
+        mock_openai.set_responses([_finish_response("42 days")])
 
-            result = run_react_loop("How many days?", tools={})
+        result = run_react_loop("How many days?", tools={})
 
         assert isinstance(result, AgentResult)
         assert result.answer == "42 days"
         assert result.steps == []
 
-    def test_one_tool_call_then_finish(self):
+    def test_one_tool_call_then_finish(self, mock_openai):
         """Agent calls a tool once, then finishes."""
-        call_count = 0
+        mock_openai.set_responses(
+            [_tool_response("retrieve", "leave policy"), _finish_response("14 days leave")]
+        )
+        tool_inputs: list[str] = []
 
-        def side_effect(*args, **kwargs):
-            nonlocal call_count
-            call_count += 1
-            if call_count == 1:
-                return _tool_response("retrieve", "leave policy")
-            return _finish_response("14 days leave")
+        def fake_tool(text: str) -> str:
+            tool_inputs.append(text)
+            return "Employees get 14 days leave."
 
-        with patch("rag_tutorials.agent_loop.OpenAI") as mock_openai_cls:
-            mock_client = MagicMock()
-            mock_openai_cls.return_value = mock_client
-            mock_client.chat.completions.create.side_effect = side_effect
-
-            fake_tool = MagicMock(return_value="Employees get 14 days leave.")
-            result = run_react_loop("What is the leave policy?", tools={"retrieve": fake_tool})
+        result = run_react_loop("What is the leave policy?", tools={"retrieve": fake_tool})
 
         assert result.answer == "14 days leave"
         assert len(result.steps) == 1
         assert result.steps[0].action == "retrieve"
-        fake_tool.assert_called_once_with("leave policy")
+        assert tool_inputs == ["leave policy"]
 
-    def test_unknown_tool_produces_error_observation(self):
+    def test_unknown_tool_produces_error_observation(self, mock_openai):
         """Calling an unknown tool results in an error observation, not a crash."""
-        call_count = 0
-
-        def side_effect(*args, **kwargs):
-            nonlocal call_count
-            call_count += 1
-            if call_count == 1:
-                return _tool_response("nonexistent_tool", "input")
-            return _finish_response("done")
-
-        with patch("rag_tutorials.agent_loop.OpenAI") as mock_openai_cls:
-            mock_client = MagicMock()
-            mock_openai_cls.return_value = mock_client
-            mock_client.chat.completions.create.side_effect = side_effect
+        mock_openai.set_responses([_tool_response("nonexistent_tool", "input"), _finish_response("done")])
 
-            result = run_react_loop("question", tools={})
+        result = run_react_loop("question", tools={})
 
         assert len(result.steps) == 1
         assert "Unknown tool" in result.steps[0].observation
 
-    def test_malformed_json_returns_raw_text(self):
+    def test_malformed_json_returns_raw_text(self, mock_openai):
         """If the LLM returns non-JSON, run_react_loop returns it as the answer."""
-        with patch("rag_tutorials.agent_loop.OpenAI") as mock_openai_cls:
-            mock_client = MagicMock()
-            mock_openai_cls.return_value = mock_client
-            mock_client.chat.completions.create.return_value = _make_chat_response("not json at all")
+        mock_openai.set_responses([_make_chat_response("not json at all")])
 
-            result = run_react_loop("question", tools={})
+        result = run_react_loop("question", tools={})
 
         assert result.answer == "not json at all"
 
-    def test_max_steps_terminates_loop(self):
+    def test_max_steps_terminates_loop(self, mock_openai):
         """Loop terminates after max_steps even if agent never finishes."""
-        with patch("rag_tutorials.agent_loop.OpenAI") as mock_openai_cls:
-            mock_client = MagicMock()
-            mock_openai_cls.return_value = mock_client
-            # Always return a tool call, never finish
-            mock_client.chat.completions.create.return_value = _tool_response("retrieve", "q")
+        # Always return a tool call, never finish
+        mock_openai.set_responses([_tool_response("retrieve", "q")])
 
-            fake_tool = MagicMock(return_value="some observation")
-            result = run_react_loop("q", tools={"retrieve": fake_tool}, max_steps=3)
+        result = run_react_loop("q", tools={"retrieve": lambda x: "some observation"}, max_steps=3)
 
         assert len(result.steps) == 3
+        assert len(mock_openai.completions.calls) == 3
 
-    def test_tool_exception_is_caught(self):
+    def test_tool_exception_is_caught(self, mock_openai):
         """A tool that raises an exception produces an error observation."""
-        call_count = 0
+        mock_openai.set_responses([_tool_response("bad_tool", "input"), _finish_response("done")])
+
+        def exploding_tool(x):
+            raise RuntimeError("boom")
+
+        result = run_react_loop("q", tools={"bad_tool": exploding_tool})
+
+        assert "Tool error" in result.steps[0].observation
 
-        def side_effect(*args, **kwargs):
-            nonlocal call_count
-            call_count += 1
-            if call_count == 1:
-                return _tool_response("bad_tool", "input")
-            return _finish_response("done")
+
+# ---------------------------------------------------------------------------
+# history_window (sliding-window compaction)
+# ---------------------------------------------------------------------------
+
+
+class TestHistoryWindow:
+    def _conversation(self, n_steps: int):
+        messages = [{"role": "system", "content": "sys"}, {"role": "user", "content": "Question: q"}]
+        steps = []
+        for i in range(n_steps):
+            steps.append(AgentStep(thought="t", action="retrieve", action_input=f"in{i}", observation=f"obs{i}"))
+            messages.append({"role": "assistant", "content": f"raw{i}"})
+            messages.append({"role": "user", "content": f"Observation: obs{i}\nContinue."})
+        return messages, steps
+
+    def test_none_keeps_full_history(self):
+        messages, steps = self._conversation(4)
+        assert _windowed_messages(messages, steps, None) is messages
+
+    def test_within_window_is_unchanged(self):
+        messages, steps = self._conversation(2)
+        assert _windowed_messages(messages, steps, 2) is messages
+
+    def test_older_steps_collapse_into_summary(self):
+        messages, steps = self._conversation(4)
+        windowed = _windowed_messages(messages, steps, 1)
+        assert windowed[:2] == messages[:2]
+        assert "obs0" in windowed[2]["content"] and "obs2" in windowed[2]["content"]
+        assert "obs3" not in windowed[2]["content"]
+        assert windowed[3:] == messages[-2:]
+
+    def test_prompt_size_stays_bounded_with_long_observations(self):
+        sizes = []
+        for n_steps in (16, 32, 64):
+            messages, steps = self._conversation(n_steps)
+            steps = [dataclasses.replace(step, observation="x" * 2000) for step in steps]
+            windowed = _windowed_messages(messages, steps, 1)
+            sizes.append(sum(len(message["content"]) for message in windowed))
+        # Only the digits of the omitted-step count and step numbers differ
+        assert max(sizes) - min(sizes) <= 16
+        assert max(sizes) < 2 * 2000
+        assert "x" * 100 not in windowed[2]["content"]
+
+    def test_loop_sends_bounded_prompt(self):
+        sent_lengths: list[int] = []
+
+        def fake_create(model, messages):
+            sent_lengths.append(len(messages))
+            return _tool_response("retrieve", "q")
 
         with patch("rag_tutorials.agent_loop.OpenAI") as mock_openai_cls:
             mock_client = MagicMock()
             mock_openai_cls.return_value = mock_client
-            mock_client.chat.completions.create.side_effect = side_effect
+            mock_client.chat.completions.create.side_effect = fake_create
 
-            def exploding_tool(x):
-                raise RuntimeError("boom")
+            run_react_loop("q", tools={"retrieve": lambda x: "obs"}, max_steps=5, history_window=1)
 
-            result = run_react_loop("q", tools={"bad_tool": exploding_tool})
+        # system + question + summary + one assistant/user pair
+        assert sent_lengths == [2, 4, 5, 5, 5]
 
-        assert "Tool error" in result.steps[0].observation
+    @pytest.mark.parametrize("history_window", [0, -1])
+    def test_non_positive_window_raises(self, history_window):
+        with patch("rag_tutorials.agent_loop.OpenAI") as mock_openai_cls:
+            with pytest.raises(ValueError, match="history_window"):
+                run_react_loop("q", tools={}, history_window=history_window)
+            with pytest.raises(ValueError, match="history_window"):
+                asyncio.run(arun_react_loop("q", tools={}, history_window=history_window))
+        mock_openai_cls.assert_not_called()
+
+
+# ---------------------------------------------------------------------------
+# arun_react_loop / run_react_loop_many (async client mocked)
+# ---------------------------------------------------------------------------
+
+
+class TestAsyncReactLoop:
+    def test_arun_one_tool_call_then_finish(self):
+        mock_client = MagicMock()
+        mock_client.chat.completions.create = AsyncMock(
+            side_effect=[_tool_response("retrieve", "leave policy"), _finish_response("14 days")]
+        )
+        fake_tool = MagicMock(return_value="Employees get 14 days leave.")
+
+        result = asyncio.run(
+            arun_react_loop("q", tools={"retrieve": fake_tool}, client=mock_client)
+        )
+
+        assert result.answer == "14 days"
+        assert len(result.steps) == 1
+        fake_tool.assert_called_once_with("leave policy")
+
+    def test_arun_max_steps_terminates_loop(self):
+        mock_client = MagicMock()
+        mock_client.chat.completions.create = AsyncMock(return_value=_tool_response("retrieve", "q"))
+
+        result = asyncio.run(
+            arun_react_loop(
+                "q", tools={"retrieve": lambda x: "obs"}, max_steps=2, client=mock_client
+            )
+        )
+
+        assert len(result.steps) == 2
+        assert result.answer == "obs"
+
+    def test_many_preserves_question_order(self):
+        async def fake_create(model, messages):
+            question = messages[1]["content"].removeprefix("Question: ")
+            return _finish_response(f"answer to {question}")
+
+        with patch("rag_tutorials.agent_loop.AsyncOpenAI") as mock_openai_cls:
+            mock_client = MagicMock()
+            mock_openai_cls.return_value = mock_client
+            mock_client.chat.completions.create = AsyncMock(side_effect=fake_create)
+            mock_client.close = AsyncMock()
+
+            results = asyncio.run(run_react_loop_many(["a", "b", "c"], tools={}, concurrency=2))
+
+        assert [r.question for r in results] == ["a", "b", "c"]
+        assert [r.answer for r in results] == ["answer to a", "answer to b", "answer to c"]
+        # One shared client for the whole fan-out, closed once at the end
+        mock_openai_cls.assert_called_once()
+        mock_client.close.assert_awaited_once()
+
+    def test_arun_closes_only_clients_it_creates(self):
+        with patch("rag_tutorials.agent_loop.AsyncOpenAI") as mock_openai_cls:
+            own_client = MagicMock()
+            mock_openai_cls.return_value = own_client
+            own_client.chat.completions.create = AsyncMock(return_value=_finish_response("done"))
+            own_client.close = AsyncMock()
+            asyncio.run(arun_react_loop("q", tools={}))
+        own_client.close.assert_awaited_once()
+
+        shared_client = MagicMock()
+        shared_client.chat.completions.create = AsyncMock(return_value=_finish_response("done"))
+        shared_client.close = AsyncMock()
+        asyncio.run(arun_react_loop("q", tools={}, client=shared_client))
+        shared_client.close.assert_not_awaited()
+
+
+# ---------------------------------------------------------------------------
+# run_react_batch (Batch API mocked)
+# ---------------------------------------------------------------------------
+
+
+def _batch_output(lines: dict[str, str]) -> MagicMock:
+    """Build a fake batch output file with one chat completion per custom_id."""
+    records = [
+        {
+            "custom_id": custom_id,
+            "response": {"status_code": 200, "body": {"choices": [{"message": {"content": content}}]}},
+        }
+        for custom_id, content in lines.items()
+    ]
+    return MagicMock(text="\n".join(json.dumps(record) for record in records))
+
+
+class TestRunReactBatch:
+    def _client(self, outputs: list[dict[str, str]]) -> MagicMock:
+        client = MagicMock()
+        client.batches.create.return_value = MagicMock(
+            id="batch-1", status="completed", output_file_id="out-1", error_file_id=None
+        )
+        client.files.content.side_effect = [_batch_output(lines) for lines in outputs]
+        return client
+
+    def test_multi_step_traces_are_reassembled(self):
+        tool_payload = json.dumps({"thought": "t", "action": "retrieve", "action_input": "x"})
+        finish_a = json.dumps({"thought": "t", "action": "finish", "action_input": "A"})
+        finish_b = json.dumps({"thought": "t", "action": "finish", "action_input": "B"})
+        client = self._client(
+            [
+                {"0:step0": finish_a, "1:step0": tool_payload},
+                {"1:step1": finish_b},
+            ]
+        )
+        fake_tool = MagicMock(return_value="obs")
+
+        with patch("rag_tutorials.agent_loop.OpenAI", return_value=client):
+            results = run_react_batch(["qa", "qb"], tools={"retrieve": fake_tool})
+
+        assert [r.answer for r in results] == ["A", "B"]
+        assert results[0].steps == []
+        assert len(results[1].steps) == 1
+        # Second batch only carries the question that was still running
+        assert client.batches.create.call_count == 2
+        second_upload = client.files.create.call_args_list[1].kwargs["file"][1]
+        assert second_upload.decode().count("custom_id") == 1
+        fake_tool.assert_called_once_with("x")
+
+    def test_failed_batch_raises(self):
+        client = MagicMock()
+        client.batches.create.return_value = MagicMock(id="batch-1", status="failed")
+
+        with patch("rag_tutorials.agent_loop.OpenAI", return_value=client):
+            with pytest.raises(RuntimeError):
+                run_react_batch(["q"], tools={})
+
+    def test_max_steps_returns_last_observation(self):
+        tool_payload = json.dumps({"thought": "t", "action": "retrieve", "action_input": "x"})
+        client = self._client([{"0:step0": tool_payload}])
+
+        with patch("rag_tutorials.agent_loop.OpenAI", return_value=client):
+            results = run_react_batch(["q"], tools={"retrieve": lambda x: "last"}, max_steps=1)
+
+        assert results[0].answer == "last"
+
+    def test_request_errors_raise_with_custom_ids(self):
+        client = MagicMock()
+        client.batches.create.return_value = MagicMock(
+            id="batch-1", status="completed", output_file_id=None, error_file_id="err-1"
+        )
+        error_line = {
+            "custom_id": "0:step0",
+            "response": {"status_code": 429, "body": {"error": {"message": "rate limited"}}},
+        }
+        client.files.content.return_value = MagicMock(text=json.dumps(error_line))
+
+        with patch("rag_tutorials.agent_loop.OpenAI", return_value=client):
+            with pytest.raises(RuntimeError, match=r"0:step0: rate limited"):
+                run_react_batch(["q"], tools={})
+        client.files.content.assert_called_once_with("err-1")
+
+    def test_missing_result_raises_instead_of_empty_answer(self):
+        finish = json.dumps({"thought": "t", "action": "finish", "action_input": "A"})
+        client = self._client([{"0:step0": finish}])
+
+        with patch("rag_tutorials.agent_loop.OpenAI", return_value=client):
+            with pytest.raises(RuntimeError, match=r"1:step0: no result"):
+                run_react_batch(["qa", "qb"], tools={})
@@ -4,11 +4,20 @@ No external calls are made; these tests are fully in-process.
 """
 from __future__ import annotations
 
+import dataclasses
+import json
+
 import pytest
 
 from rag_tutorials.agent_state import AgentState, Checkpoint, StateManager
 
 
+def _stored_steps(manager: StateManager, checkpoint_id: str) -> list:
+    """Return the manager's stored (shared) steps for one checkpoint."""
+    checkpoint = next(c for c in manager.list_checkpoints() if c.checkpoint_id == checkpoint_id)
+    return manager._chain_steps(checkpoint.delta_index)
+
+
 # ---------------------------------------------------------------------------
 # AgentState dataclass
 # ---------------------------------------------------------------------------
@@ -38,12 +47,29 @@ class TestAgentState:
 
 class TestCheckpoint:
     def test_fields(self):
-        state = AgentState(question="q")
-        cp = Checkpoint(checkpoint_id="abc123", step_number=0, label="start", state=state)
+        cp = Checkpoint(checkpoint_id="abc123", step_number=0, label="start", delta_index=0)
         assert cp.checkpoint_id == "abc123"
         assert cp.step_number == 0
         assert cp.label == "start"
-        assert cp.state is state
+        assert cp.delta_index == 0
+
+    def test_state_rebuilds_snapshot(self):
+        manager = StateManager()
+        state = AgentState(question="q", steps=[{"a": 1}], current_answer="x")
+        cid = manager.save_checkpoint(state)
+        cp = manager.list_checkpoints()[0]
+        assert cp.checkpoint_id == cid
+        assert cp.state == state
+
+    def test_detached_checkpoint_has_no_state(self):
+        cp = Checkpoint(checkpoint_id="abc123", step_number=0, label="start", delta_index=0)
+        with pytest.raises(ValueError):
+            _ = cp.state
+
+    def test_checkpoint_is_frozen(self):
+        cp = Checkpoint(checkpoint_id="abc123", step_number=0, label="start", delta_index=0)
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            cp.label = "changed"  # type: ignore[misc]
 
 
 # ---------------------------------------------------------------------------
@@ -85,6 +111,54 @@ class TestStateManagerSave:
         assert "2" in cp.label
 
 
+    def test_later_checkpoint_reuses_unchanged_steps(self):
+        manager = StateManager()
+        state = AgentState(question="q", steps=[{"a": 1}])
+        cid1 = manager.save_checkpoint(state)
+        state.steps.append({"b": 2})
+        cid2 = manager.save_checkpoint(state)
+        assert manager.load_checkpoint(cid2).steps == [{"a": 1}, {"b": 2}]
+        first, second = (_stored_steps(manager, cid) for cid in (cid1, cid2))
+        assert second[0] is first[0]
+
+    def test_unrelated_state_starts_new_chain(self):
+        manager = StateManager()
+        manager.save_checkpoint(AgentState(question="q", steps=[{"a": 1}, {"b": 2}]))
+        cid = manager.save_checkpoint(AgentState(question="q", steps=[{"c": 3}]))
+        assert manager.load_checkpoint(cid).steps == [{"c": 3}]
+
+    def test_editing_earlier_step_in_place_is_captured(self):
+        manager = StateManager()
+        state = AgentState(question="q", steps=[{"a": 1}])
+        cid1 = manager.save_checkpoint(state)
+        state.steps[0]["a"] = 2
+        state.steps.append({"b": 2})
+        cid2 = manager.save_checkpoint(state)
+        assert manager.load_checkpoint(cid1).steps == [{"a": 1}]
+        assert manager.load_checkpoint(cid2).steps == [{"a": 2}, {"b": 2}]
+
+    def test_replacing_earlier_step_starts_new_chain(self):
+        manager = StateManager()
+        state = AgentState(question="q", steps=[{"a": 1}, {"b": 2}])
+        manager.save_checkpoint(state)
+        state.steps[0] = {"a": "edited"}
+        state.steps.append({"c": 3})
+        cid = manager.save_checkpoint(state)
+        assert manager.load_checkpoint(cid).steps == [{"a": "edited"}, {"b": 2}, {"c": 3}]
+
+    def test_consecutive_saves_do_not_rebuild_history(self, monkeypatch):
+        manager = StateManager()
+        state = AgentState(question="q", steps=[{"a": 1}])
+        manager.save_checkpoint(state)
+        monkeypatch.setattr(manager, "_chain_steps", lambda index: pytest.fail("chain walked"))
+        state.steps.append({"b": 2})
+        manager.save_checkpoint(state)
+        state.steps.append({"c": 3})
+        cid = manager.save_checkpoint(state)
+        monkeypatch.undo()
+        assert manager.load_checkpoint(cid).steps == [{"a": 1}, {"b": 2}, {"c": 3}]
+
+
 # ---------------------------------------------------------------------------
 # StateManager — load_checkpoint
 # ---------------------------------------------------------------------------
@@ -114,6 +188,59 @@ class TestStateManagerLoad:
         assert loaded2.steps == []
 
 
+    def test_checkpoints_share_frozen_steps(self):
+        manager = StateManager()
+        state = AgentState(question="q", steps=[{"action": "retrieve"}])
+        cid1 = manager.save_checkpoint(state)
+        state.steps.append({"action": "finish"})
+        cid2 = manager.save_checkpoint(state)
+        assert _stored_steps(manager, cid1)[0] is _stored_steps(manager, cid2)[0]
+
+    def test_caller_steps_stay_mutable(self):
+        manager = StateManager()
+        step = {"action": "retrieve"}
+        state = AgentState(question="q", steps=[step])
+        cid = manager.save_checkpoint(state)
+        assert state.steps[0] is step
+        state.steps[0]["action"] = "edited"
+        assert manager.load_checkpoint(cid).steps[0]["action"] == "retrieve"
+
+    def test_restored_steps_are_plain_and_editable(self):
+        manager = StateManager()
+        step = {"action": "retrieve", "ids": ["a"], "pair": (1, 2), "tags": {"x"}}
+        cid = manager.save_checkpoint(AgentState(question="q", steps=[step]))
+        restored = manager.load_checkpoint(cid).steps[0]
+        assert restored == step
+        assert type(restored) is dict and type(restored["ids"]) is list
+        assert type(restored["tags"]) is set
+        json.dumps({key: value for key, value in restored.items() if key != "tags"})
+        restored["action"] = "edited"
+        restored["ids"].append("b")
+        assert manager.load_checkpoint(cid).steps[0] == step
+
+    def test_nested_values_are_copied(self):
+        manager = StateManager()
+        sources = ["DOC-1"]
+        step = {"action": "retrieve", "meta": {"sources": sources}}
+        state = AgentState(question="q", steps=[step])
+        cid = manager.save_checkpoint(state)
+        sources.append("DOC-2")
+        state.steps[0]["meta"]["extra"] = True
+        expected = [{"action": "retrieve", "meta": {"sources": ["DOC-1"]}}]
+        assert manager.load_checkpoint(cid).steps == expected
+
+    def test_caller_step_dicts_stay_decoupled(self):
+        manager = StateManager()
+        step = {"action": "retrieve", "observation": "first"}
+        state = AgentState(question="q", steps=[step])
+        cid = manager.save_checkpoint(state)
+        # The caller's own dict reference is not the stored snapshot
+        step["observation"] = "changed"
+        state.steps.pop()
+        expected = [{"action": "retrieve", "observation": "first"}]
+        assert manager.load_checkpoint(cid).steps == expected
+
+
 # ---------------------------------------------------------------------------
 # StateManager — list_checkpoints
 # ---------------------------------------------------------------------------
@@ -188,3 +315,19 @@ class TestStateManagerRewind:
         rewound1 = manager.rewind_to(cid1)
         assert len(rewound1.steps) == 1
         assert rewound1.steps[0]["observation"] == "context A"
+
+    def test_continuing_from_rewound_state_forks_history(self):
+        manager = StateManager()
+        state = AgentState(question="q", steps=[{"action": "retrieve"}])
+        cid1 = manager.save_checkpoint(state)
+        state.steps.append({"action": "bad"})
+        cid_bad = manager.save_checkpoint(state)
+
+        forked = manager.rewind_to(cid1)
+        forked.steps.append({"action": "good"})
+        cid_good = manager.save_checkpoint(forked)
+
+        good = manager.load_checkpoint(cid_good)
+        assert [s["action"] for s in good.steps] == ["retrieve", "good"]
+        assert _stored_steps(manager, cid_good)[0] is _stored_steps(manager, cid1)[0]
+        assert [s["action"] for s in manager.load_checkpoint(cid_bad).steps] == ["retrieve", "bad"]
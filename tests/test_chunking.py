@@ -3,8 +3,12 @@ from __future__ import annotations
 
 import pytest
 
-from rag_tutorials.chunking import fixed_chunk_documents, semantic_chunk_documents
-from rag_tutorials.schema import Chunk, Document
+from rag_tutorials.chunking import (
+    fixed_chunk_documents,
+    fixed_chunk_documents_batch,
+    semantic_chunk_documents,
+)
+from rag_tutorials.schema import Chunk, ChunkBatch, Document
 
 
 # ---------------------------------------------------------------------------
@@ -47,6 +51,13 @@ class TestFixedChunkDocuments:
         chunks = fixed_chunk_documents([doc], chunk_size=5)
         assert all("-FIX-" in c.chunk_id for c in chunks)
 
+    def test_chunk_id_suffixes_are_zero_padded_past_table(self):
+        doc = _make_doc(doc_id="D-1", text="x" * 300)
+        chunks = fixed_chunk_documents([doc], chunk_size=1)
+        assert chunks[0].chunk_id == "D-1-FIX-00"
+        assert chunks[7].chunk_id == "D-1-FIX-07"
+        assert chunks[299].chunk_id == "D-1-FIX-299"
+
     def test_metadata_propagates(self):
         doc = _make_doc(doc_id="D-99", section="Security", text="VPN required.")
         chunks = fixed_chunk_documents([doc], chunk_size=50)
@@ -70,6 +81,21 @@ class TestFixedChunkDocuments:
         assert len(ids) == 3  # each doc produces one chunk
 
 
+# ---------------------------------------------------------------------------
+# fixed_chunk_documents_batch
+# ---------------------------------------------------------------------------
+
+class TestFixedChunkDocumentsBatch:
+    def test_returns_aligned_columns(self, sample_documents):
+        batch = fixed_chunk_documents_batch(sample_documents, chunk_size=30)
+        assert isinstance(batch, ChunkBatch)
+        assert len(batch.ids) == len(batch.doc_ids) == len(batch.sections) == len(batch.texts)
+
+    def test_matches_row_oriented_chunking(self, sample_documents):
+        batch = fixed_chunk_documents_batch(sample_documents, chunk_size=30)
+        assert list(batch) == fixed_chunk_documents(sample_documents, chunk_size=30)
+
+
 # ---------------------------------------------------------------------------
 # semantic_chunk_documents
 # ---------------------------------------------------------------------------
@@ -109,6 +135,18 @@ class TestSemanticChunkDocuments:
         chunks = semantic_chunk_documents([doc])
         assert len(chunks) == 2
 
+    def test_groups_are_sliced_from_original_text(self):
+        doc = _make_doc(text="First sentence. Second sentence. Third sentence. Fourth sentence.")
+        chunks = semantic_chunk_documents([doc])
+        assert chunks[0].text == "First sentence. Second sentence"
+        assert chunks[1].text == "Third sentence. Fourth sentence."
+
+    def test_newline_after_period_is_a_sentence_break(self):
+        doc = _make_doc(text="First sentence.\nSecond sentence.\nThird sentence.")
+        chunks = semantic_chunk_documents([doc])
+        assert len(chunks) == 2
+        assert chunks[1].text == "Third sentence."
+
     def test_empty_documents_list(self):
         assert semantic_chunk_documents([]) == []
 
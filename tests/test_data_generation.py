@@ -14,6 +14,7 @@ from rag_tutorials.data_generation import (
     generate_queries,
     parse_handbook_to_documents,
     save_dataset,
+    save_dataset_stream,
 )
 from rag_tutorials.schema import Document, QueryExample
 
@@ -64,6 +65,17 @@ class TestParseHandbookToDocuments:
         docs = parse_handbook_to_documents("")
         assert docs == []
 
+    def test_body_lines_joined_and_title_lines_dropped(self):
+        text = "## Security\n  Use VPN.  \n# Appendix\n\nReport within 1 hour.\n## Empty\n\n"
+        docs = parse_handbook_to_documents(text)
+        assert len(docs) == 1
+        assert docs[0].text == "Use VPN. Report within 1 hour."
+
+    def test_whitespace_inside_a_line_is_kept(self):
+        text = "## Security\nUse  VPN.\tAlways.\n"
+        docs = parse_handbook_to_documents(text)
+        assert docs[0].text == "Use  VPN.\tAlways."
+
 
 # ---------------------------------------------------------------------------
 # generate_documents
@@ -81,16 +93,24 @@ class TestGenerateDocuments:
         assert len(docs) == len(expected)
         assert {d.doc_id for d in docs} == {d.doc_id for d in expected}
 
+    def test_mutating_result_does_not_leak_into_later_calls(self):
+        docs = generate_documents()
+        docs[0].text = "changed"
+        docs.clear()
+        fresh = generate_documents()
+        assert fresh == parse_handbook_to_documents(HANDBOOK_TEXT)
+
 
 # ---------------------------------------------------------------------------
 # generate_queries
 # ---------------------------------------------------------------------------
 
-class TestGenerateQueries:
-    @pytest.fixture()
-    def documents(self):
-        return generate_documents()
+@pytest.fixture(scope="module")
+def documents():
+    return generate_documents()
+
 
+class TestGenerateQueries:
     def test_returns_query_examples(self, documents):
         queries = generate_queries(documents, query_count=10)
         assert len(queries) == 10
@@ -142,11 +162,30 @@ class TestGenerateQueries:
         # With two docs per section, different seeds must produce different picks
         assert targets1 != targets2
 
+    def test_does_not_touch_global_random_state(self, documents):
+        import random
+
+        random.seed(123)
+        expected = random.random()
+        random.seed(123)
+        generate_queries(documents, query_count=10)
+        assert random.random() == expected
+
     def test_rationale_is_non_empty(self, documents):
         queries = generate_queries(documents, query_count=5)
         for q in queries:
             assert len(q.rationale) > 0
 
+    def test_missing_form_marker_raises(self, documents):
+        broken = [
+            Document(d.doc_id, d.title, d.section, "No form is needed.")
+            if d.section == "International Tax"
+            else d
+            for d in documents
+        ]
+        with pytest.raises(ValueError, match="Form "):
+            generate_queries(broken, query_count=5)
+
 
 # ---------------------------------------------------------------------------
 # save_dataset
@@ -180,6 +219,24 @@ class TestSaveDataset:
             obj = json.loads(line)
             assert "query_id" in obj
 
+    def test_records_roundtrip_with_all_fields(self, tmp_path):
+        docs = generate_documents()
+        queries = generate_queries(docs, query_count=2)
+        save_dataset(docs, queries, output_dir=str(tmp_path))
+        lines = (tmp_path / "queries.jsonl").read_text().splitlines()
+        assert QueryExample(**json.loads(lines[0])) == queries[0]
+        assert (tmp_path / "documents.jsonl").read_text().endswith("\n")
+
+
+class TestSaveDatasetStream:
+    def test_matches_save_dataset_output(self, tmp_path):
+        docs = generate_documents()
+        queries = generate_queries(docs, query_count=6)
+        save_dataset(docs, queries, output_dir=str(tmp_path / "list"))
+        save_dataset_stream(iter(docs), (q for q in queries), output_dir=str(tmp_path / "stream"))
+        for name in ("documents.jsonl", "queries.jsonl"):
+            assert (tmp_path / "stream" / name).read_bytes() == (tmp_path / "list" / name).read_bytes()
+
 
 # ---------------------------------------------------------------------------
 # build_and_save_dataset
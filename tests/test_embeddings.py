@@ -1,12 +1,32 @@
 """Tests for embeddings.py — cosine_similarity (pure) and embed_texts (mocked)."""
 from __future__ import annotations
 
-from unittest.mock import MagicMock, patch
+import asyncio
+import base64
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import numpy as np
 import pytest
 
-from rag_tutorials.embeddings import cosine_similarity, embed_texts
+from rag_tutorials.embeddings import (
+    ChunkStore,
+    _get_client,
+    cosine_similarity,
+    cosine_similarity_batch,
+    embed_texts,
+    embed_texts_async,
+    normalize_rows,
+    top_k_cosine,
+)
+from rag_tutorials.schema import Chunk
+
+
+@pytest.fixture(autouse=True)
+def _fresh_client():
+    """Drop the memoized client so each test sees its own patched OpenAI."""
+    _get_client.cache_clear()
+    yield
+    _get_client.cache_clear()
 
 
 # ---------------------------------------------------------------------------
@@ -64,6 +84,80 @@ class TestCosineSimilarity:
         assert scores[0] > scores[1]
 
 
+    def test_normalized_matrix_matches_default_path(self):
+        rng = np.random.default_rng(0)
+        q = rng.normal(size=8).astype(np.float32)
+        m = rng.normal(size=(5, 8)).astype(np.float32)
+        fast = cosine_similarity(q, normalize_rows(m), normalized=True)
+        assert fast.dtype == np.float32
+        assert fast == pytest.approx(cosine_similarity(q, m), abs=1e-6)
+
+
+class TestCosineSimilarityBatch:
+    def test_normalize_rows_gives_unit_norms(self):
+        m = np.array([[3.0, 4.0], [0.0, 2.0]])
+        assert np.linalg.norm(normalize_rows(m), axis=1) == pytest.approx([1.0, 1.0])
+
+    def test_normalize_rows_keeps_zero_rows(self):
+        assert normalize_rows(np.zeros((1, 3))).tolist() == [[0.0, 0.0, 0.0]]
+
+    def test_matches_per_query_cosine_similarity(self):
+        rng = np.random.default_rng(0)
+        m = rng.random((6, 4))
+        q = rng.random((3, 4))
+        scores = cosine_similarity_batch(q, normalize_rows(m))
+        assert scores.shape == (3, 6)
+        for row, query in zip(scores, q):
+            assert row == pytest.approx(cosine_similarity(query, m))
+
+
+class TestTopKCosine:
+    def test_matches_full_sort_across_blocks(self):
+        rng = np.random.default_rng(1)
+        m = normalize_rows(rng.random((20, 5)))
+        q = rng.random((7, 5))
+        indices, scores = top_k_cosine(q, m, top_k=4, block_size=3)
+        full = cosine_similarity_batch(q, m)
+        assert indices.tolist() == np.argsort(-full, axis=1)[:, :4].tolist()
+        assert scores == pytest.approx(np.take_along_axis(full, indices, axis=1))
+
+    def test_top_k_larger_than_corpus(self):
+        m = normalize_rows(np.eye(3))
+        indices, scores = top_k_cosine(np.array([[0.0, 1.0, 0.5]]), m, top_k=10)
+        assert indices.tolist() == [[1, 2, 0]]
+        assert scores.shape == (1, 3)
+
+
+# ---------------------------------------------------------------------------
+# ChunkStore — embed_texts mocked
+# ---------------------------------------------------------------------------
+
+class TestChunkStore:
+    @pytest.fixture()
+    def store(self):
+        chunks = [Chunk(chunk_id=f"C-{i}", doc_id="D-1", section="S", text=f"text {i}") for i in range(3)]
+        vectors = np.array([[3.0, 0.0], [0.0, 2.0], [1.0, 1.0]])
+        with patch("rag_tutorials.embeddings.embed_texts", return_value=vectors):
+            return ChunkStore.from_chunks(chunks)
+
+    def test_rows_are_normalized_float32(self, store):
+        assert store.embeddings.dtype == np.float32
+        assert np.linalg.norm(store.embeddings, axis=1) == pytest.approx(np.ones(3))
+
+    def test_top_k_ranks_by_cosine(self, store):
+        results = store.top_k(np.array([0.0, 5.0]), top_k=2)
+        assert [r.chunk_id for r in results] == ["C-1", "C-2"]
+        assert results[0].score == pytest.approx(1.0)
+        assert all(r.source == "dense" for r in results)
+
+    def test_save_and_load_round_trip(self, store, tmp_path):
+        store.save(tmp_path)
+        loaded = ChunkStore.load(tmp_path)
+        assert isinstance(loaded.embeddings, np.memmap)
+        assert loaded.chunks == store.chunks
+        assert loaded.top_k(np.array([1.0, 0.0]), top_k=1)[0].chunk_id == "C-0"
+
+
 # ---------------------------------------------------------------------------
 # embed_texts — OpenAI API mocked
 # ---------------------------------------------------------------------------
@@ -114,5 +208,152 @@ class TestEmbedTexts:
 
         embed_texts(["x"], model="text-embedding-3-large")
         mock_client.embeddings.create.assert_called_once_with(
-            model="text-embedding-3-large", input=["x"]
+            model="text-embedding-3-large", input=["x"], encoding_format="base64"
         )
+
+    @patch("rag_tutorials.embeddings.OpenAI")
+    def test_decodes_base64_embeddings(self, mock_openai_cls):
+        mock_client = MagicMock()
+        mock_openai_cls.return_value = mock_client
+        raw = np.array([[0.5, -1.0, 2.0], [3.0, 0.0, 1.5]], dtype=np.float32)
+        mock_client.embeddings.create.return_value = MagicMock(
+            data=[MagicMock(embedding=base64.b64encode(row.tobytes()).decode()) for row in raw]
+        )
+
+        result = embed_texts(["a", "b"])
+        np.testing.assert_array_equal(result, raw)
+
+    @patch("rag_tutorials.embeddings.OpenAI")
+    def test_reuses_one_client_across_calls(self, mock_openai_cls):
+        mock_client = MagicMock()
+        mock_openai_cls.return_value = mock_client
+        mock_client.embeddings.create.return_value = self._make_mock_response(["x"], dim=2)
+
+        embed_texts(["x"])
+        embed_texts(["y"])
+        assert mock_openai_cls.call_count == 1
+
+    @patch("rag_tutorials.embeddings.OpenAI")
+    def test_large_inputs_are_batched_in_order(self, mock_openai_cls):
+        mock_client = MagicMock()
+        mock_openai_cls.return_value = mock_client
+        mock_client.embeddings.create.side_effect = lambda model, input, **kwargs: MagicMock(
+            data=[MagicMock(embedding=[float(text), 0.0]) for text in input]
+        )
+
+        texts = [str(i) for i in range(5)]
+        result = embed_texts(texts, batch_size=2)
+        assert mock_client.embeddings.create.call_count == 3
+        assert result[:, 0].tolist() == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+    @patch("rag_tutorials.embeddings.OpenAI")
+    def test_batch_size_is_capped_at_api_input_limit(self, mock_openai_cls):
+        mock_client = MagicMock()
+        mock_openai_cls.return_value = mock_client
+        mock_client.embeddings.create.side_effect = lambda model, input, **kwargs: MagicMock(
+            data=[MagicMock(embedding=[float(text), 0.0]) for text in input]
+        )
+
+        result = embed_texts([str(i) for i in range(5000)], batch_size=10_000)
+        assert mock_client.embeddings.create.call_count == 3
+        assert max(len(c.kwargs["input"]) for c in mock_client.embeddings.create.call_args_list) == 2048
+        assert result.shape == (5000, 2)
+
+    @patch("rag_tutorials.embeddings.OpenAI")
+    def test_duplicate_texts_are_embedded_once(self, mock_openai_cls):
+        mock_client = MagicMock()
+        mock_openai_cls.return_value = mock_client
+        mock_client.embeddings.create.side_effect = lambda model, input, **kwargs: MagicMock(
+            data=[MagicMock(embedding=[float(text), 0.0]) for text in input]
+        )
+
+        result = embed_texts(["1", "2", "1", "1"])
+        assert mock_client.embeddings.create.call_args.kwargs["input"] == ["1", "2"]
+        assert result[:, 0].tolist() == [1.0, 2.0, 1.0, 1.0]
+
+    def test_async_variant_gathers_batches(self):
+        mock_client = MagicMock()
+        mock_client.embeddings.create = AsyncMock(
+            side_effect=lambda model, input, **kwargs: MagicMock(
+                data=[MagicMock(embedding=[float(text)] * 3) for text in input]
+            )
+        )
+
+        result = asyncio.run(embed_texts_async(["1", "2", "3"], batch_size=2, client=mock_client))
+        assert mock_client.embeddings.create.await_count == 2
+        assert result.shape == (3, 3)
+        assert result.dtype == np.float32
+        assert result[:, 0].tolist() == [1.0, 2.0, 3.0]
+
+    def test_async_variant_caps_in_flight_batches(self):
+        in_flight = 0
+        peak = 0
+
+        async def fake_create(model, input, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return MagicMock(data=[MagicMock(embedding=[float(text)]) for text in input])
+
+        mock_client = MagicMock()
+        mock_client.embeddings.create = AsyncMock(side_effect=fake_create)
+        texts = [str(i) for i in range(10)]
+
+        result = asyncio.run(embed_texts_async(texts, batch_size=1, client=mock_client, max_concurrency=3))
+        assert peak == 3
+        assert result[:, 0].tolist() == [float(i) for i in range(10)]
+
+    def test_async_variant_closes_only_clients_it_creates(self):
+        with patch("rag_tutorials.embeddings.AsyncOpenAI") as mock_async_cls:
+            own_client = MagicMock()
+            mock_async_cls.return_value = own_client
+            own_client.embeddings.create = AsyncMock(
+                return_value=MagicMock(data=[MagicMock(embedding=[1.0])])
+            )
+            own_client.close = AsyncMock()
+            asyncio.run(embed_texts_async(["x"]))
+        own_client.close.assert_awaited_once()
+
+
+class TestEmbedTextsCache:
+    @staticmethod
+    def _fake_create(model, input, **kwargs):
+        return MagicMock(data=[MagicMock(embedding=[float(len(text)), 1.0]) for text in input])
+
+    @patch("rag_tutorials.embeddings.OpenAI")
+    def test_warm_call_skips_api(self, mock_openai_cls, tmp_path):
+        mock_client = MagicMock()
+        mock_openai_cls.return_value = mock_client
+        mock_client.embeddings.create.side_effect = self._fake_create
+        cache = str(tmp_path / "cache" / "embeddings.sqlite")
+
+        cold = embed_texts(["a", "bb"], cache_path=cache)
+        warm = embed_texts(["bb", "a"], cache_path=cache)
+        assert mock_client.embeddings.create.call_count == 1
+        np.testing.assert_array_equal(warm, cold[::-1])
+        assert warm.dtype == np.float32
+
+    @patch("rag_tutorials.embeddings.OpenAI")
+    def test_only_unique_misses_are_sent(self, mock_openai_cls, tmp_path):
+        mock_client = MagicMock()
+        mock_openai_cls.return_value = mock_client
+        mock_client.embeddings.create.side_effect = self._fake_create
+        cache = str(tmp_path / "embeddings.sqlite")
+
+        embed_texts(["a"], cache_path=cache)
+        result = embed_texts(["a", "ccc", "ccc"], cache_path=cache)
+        assert mock_client.embeddings.create.call_args.kwargs["input"] == ["ccc"]
+        assert result[:, 0].tolist() == [1.0, 3.0, 3.0]
+
+    @patch("rag_tutorials.embeddings.OpenAI")
+    def test_model_is_part_of_cache_key(self, mock_openai_cls, tmp_path):
+        mock_client = MagicMock()
+        mock_openai_cls.return_value = mock_client
+        mock_client.embeddings.create.side_effect = self._fake_create
+        cache = str(tmp_path / "embeddings.sqlite")
+
+        embed_texts(["a"], model="m1", cache_path=cache)
+        embed_texts(["a"], model="m2", cache_path=cache)
+        assert mock_client.embeddings.create.call_count == 2
@@ -1,12 +1,21 @@
 """Tests for evaluation.py — recall, MRR, groundedness, evaluate_single, summarize."""
 from __future__ import annotations
 
+import asyncio
+import dataclasses
+import re
+
 import pytest
 
 from rag_tutorials.evaluation import (
     EvalRow,
+    EvalRowTable,
+    _context_tokens,
     _normalize,
+    evaluate_many,
+    evaluate_many_async,
     evaluate_single,
+    evaluate_single_async,
     groundedness_score,
     recall_at_k,
     reciprocal_rank,
@@ -52,6 +61,14 @@ class TestNormalize:
     def test_empty_string(self):
         assert _normalize("") == set()
 
+    def test_matches_regex_tokenizer_on_non_ascii(self):
+        text = "Café Ünïcode—naïve résumé, K-9 \u212a ok\ttab"
+        assert _normalize(text) == set(re.findall(r"[a-zA-Z0-9-]+", text.lower()))
+
+    def test_context_tokens_match_normalize(self):
+        text = "Form-A12 requires VPN, form-a12!"
+        assert _context_tokens(text) == _normalize(text)
+
 
 # ---------------------------------------------------------------------------
 # recall_at_k
@@ -89,6 +106,21 @@ class TestRecallAtK:
     def test_empty_results(self):
         assert recall_at_k([], _make_query(), k=5) == 0.0
 
+    def test_doc_id_prefix_of_another_doc_is_not_a_hit(self):
+        results = [_make_result("DOC-0010-FIX-00")]
+        query = _make_query(target_doc_id="DOC-001")
+        assert recall_at_k(results, query, k=5) == 0.0
+
+    def test_semantic_chunk_ids_match(self):
+        results = [_make_result("DOC-HB-SECURITY-SEM-01")]
+        query = _make_query(target_doc_id="DOC-HB-SECURITY")
+        assert recall_at_k(results, query, k=5) == 1.0
+
+    def test_unsuffixed_chunk_id_must_equal_doc_id(self):
+        query = _make_query(target_doc_id="DOC-001")
+        assert recall_at_k([_make_result("DOC-001")], query, k=5) == 1.0
+        assert recall_at_k([_make_result("DOC-001-PART-2")], query, k=5) == 0.0
+
 
 # ---------------------------------------------------------------------------
 # reciprocal_rank
@@ -147,6 +179,11 @@ class TestGroundednessScore:
         score = groundedness_score("remote work vpn", ["remote work allowed", "vpn required"])
         assert score == pytest.approx(1.0)
 
+    def test_same_contexts_different_answers(self):
+        contexts = ["remote work allowed", "vpn required"]
+        assert groundedness_score("vpn travel", contexts) == pytest.approx(0.5)
+        assert groundedness_score("remote vpn", contexts) == pytest.approx(1.0)
+
 
 # ---------------------------------------------------------------------------
 # evaluate_single
@@ -193,6 +230,77 @@ class TestEvaluateSingle:
         assert row.recall_at_k == 1.0
 
 
+    def test_many_matches_sequential_rows_in_order(self):
+        queries = [
+            dataclasses.replace(_make_query(target_doc_id=f"DOC-00{i}"), query_id=f"Q-{i}")
+            for i in range(1, 6)
+        ]
+
+        def retrieval_fn(q, top_k=5):
+            return [_make_result("DOC-003-FIX-00", text="remote work"), _make_result("DOC-001-FIX-00")]
+
+        def answer_fn(q, contexts):
+            return "remote work allowed"
+
+        rows = evaluate_many(queries, retrieval_fn, answer_fn, top_k=2, workers=3)
+        sequential = [evaluate_single(q, retrieval_fn, answer_fn, top_k=2) for q in queries]
+        assert len(rows) == len(queries)
+        assert [row.query_id for row in rows] == [row.query_id for row in sequential]
+        assert [(row.recall_at_k, row.mrr, row.groundedness) for row in rows] == [
+            (row.recall_at_k, row.mrr, row.groundedness) for row in sequential
+        ]
+
+
+# ---------------------------------------------------------------------------
+# evaluate_single_async / evaluate_many_async
+# ---------------------------------------------------------------------------
+
+class TestEvaluateAsync:
+    def test_async_callables_match_sync_result(self, sample_query):
+        async def retrieval_fn(q, top_k=5):
+            return [_make_result("DOC-001-FIX-00", text="remote work")]
+
+        async def answer_fn(q, contexts):
+            return "remote work allowed"
+
+        row = asyncio.run(evaluate_single_async(sample_query, retrieval_fn, answer_fn, top_k=5))
+        assert row.recall_at_k == 1.0
+        assert row.groundedness == pytest.approx(2 / 3)
+
+    def test_sync_callables_and_top_k_fallback(self, sample_query):
+        def retrieval_fn_no_kwarg(q):
+            return [_make_result("DOC-001-FIX-00")]
+
+        row = asyncio.run(
+            evaluate_single_async(sample_query, retrieval_fn_no_kwarg, lambda q, c: "ans", top_k=5)
+        )
+        assert row.mrr == pytest.approx(1.0)
+
+    def test_many_runs_concurrently_and_keeps_order(self):
+        queries = [
+            dataclasses.replace(_make_query(target_doc_id=f"DOC-00{i}"), query_id=f"Q-{i}")
+            for i in range(1, 5)
+        ]
+        in_flight = 0
+        peak = 0
+
+        async def retrieval_fn(q, top_k=5):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return [_make_result("DOC-002-FIX-00")]
+
+        async def answer_fn(q, contexts):
+            return "ans"
+
+        rows = asyncio.run(evaluate_many_async(queries, retrieval_fn, answer_fn, concurrency=2))
+        assert [row.query_id for row in rows] == ["Q-1", "Q-2", "Q-3", "Q-4"]
+        assert [row.recall_at_k for row in rows] == [0.0, 1.0, 0.0, 0.0]
+        assert peak == 2
+
+
 # ---------------------------------------------------------------------------
 # summarize
 # ---------------------------------------------------------------------------
@@ -220,3 +328,13 @@ class TestSummarize:
         assert result["mrr"] == pytest.approx(0.5)
         assert result["latency_ms"] == pytest.approx(150.0)
         assert result["groundedness"] == pytest.approx(0.6)
+
+    def test_accepts_columnar_table(self):
+        rows = [
+            EvalRow(query_id="Q-0", recall_at_k=1.0, mrr=1.0, latency_ms=100.0, groundedness=0.8),
+            EvalRow(query_id="Q-1", recall_at_k=0.0, mrr=0.0, latency_ms=200.0, groundedness=0.4),
+        ]
+        table = EvalRowTable.from_rows(rows)
+        assert table.query_ids == ["Q-0", "Q-1"]
+        assert table.latency_ms.tolist() == [100.0, 200.0]
+        assert summarize(table) == summarize(rows)
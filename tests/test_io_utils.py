@@ -74,6 +74,18 @@ class TestLoadQueries:
         assert q.question == "Question 0?"
         assert q.target_doc_id == "DOC-001"
 
+    def test_blank_lines_and_missing_final_newline(self, tmp_path, sample_query):
+        path = tmp_path / "queries.jsonl"
+        line = json.dumps(sample_query.to_dict())
+        path.write_text(line + "\n\n" + line)
+        assert load_queries(path) == [sample_query, sample_query]
+
+    def test_key_order_in_file_does_not_matter(self, tmp_path, sample_query):
+        path = tmp_path / "queries.jsonl"
+        shuffled = dict(reversed(list(sample_query.to_dict().items())))
+        path.write_text(json.dumps(shuffled) + "\n")
+        assert load_queries(path) == [sample_query]
+
 
 # ---------------------------------------------------------------------------
 # save_chunks / load_chunks roundtrip
@@ -116,3 +128,24 @@ class TestSaveAndLoadChunks:
         path = tmp_path / "empty.jsonl"
         save_chunks([], path)
         assert path.read_text() == ""
+
+    def test_unknown_key_raises_with_line_number(self, tmp_path):
+        path = tmp_path / "chunks.jsonl"
+        good = {"chunk_id": "C-1", "doc_id": "D-1", "section": "S", "text": "a"}
+        path.write_text(json.dumps(good) + "\n" + json.dumps({**good, "extra": 1}) + "\n")
+        with pytest.raises(TypeError, match=r"chunks\.jsonl:2: .*unexpected keys \['extra'\]"):
+            load_chunks(path)
+
+    def test_missing_key_raises_with_line_number(self, tmp_path):
+        path = tmp_path / "chunks.jsonl"
+        path.write_text(json.dumps({"chunk_id": "C-1", "doc_id": "D-1", "section": "S"}) + "\n")
+        with pytest.raises(TypeError, match=r"chunks\.jsonl:1: .*missing keys \['text'\]"):
+            load_chunks(path)
+
+    @pytest.mark.parametrize("line", ["[]", "1", '"x"', "null"])
+    def test_non_object_line_raises_with_line_number(self, tmp_path, line):
+        path = tmp_path / "chunks.jsonl"
+        good = {"chunk_id": "C-1", "doc_id": "D-1", "section": "S", "text": "a"}
+        path.write_text(json.dumps(good) + "\n" + line + "\n")
+        with pytest.raises(TypeError, match=r"chunks\.jsonl:2: expected a JSON object"):
+            load_chunks(path)
@@ -16,6 +16,7 @@ from rag_tutorials.pipeline import (
     build_hybrid_retriever,
     prepare_chunks,
     top_scores_preview,
+    top_scores_preview_batch,
 )
 from rag_tutorials.schema import Chunk, RetrievalResult
 
@@ -124,6 +125,35 @@ class TestBuildDenseRetriever:
             results = retrieve_fn("query", top_k=3)
         assert all(r.source == "dense" for r in results)
 
+    def test_in_memory_path_matches_chroma(self, tmp_path):
+        chunks = [_make_chunk(f"C-{i}", f"text {i}") for i in range(6)]
+        from rag_tutorials.vector_store import build_chroma_collection as real_build
+
+        def build_with_tmp(chunks, embeddings, collection_name):
+            return real_build(
+                chunks=chunks, embeddings=embeddings, collection_name=collection_name, persist_dir=str(tmp_path)
+            )
+
+        with patch("rag_tutorials.pipeline.embed_texts", side_effect=_fake_embed), \
+             patch("rag_tutorials.pipeline.build_chroma_collection", side_effect=build_with_tmp) as mock_build:
+            in_memory, _ = build_dense_retriever(chunks, "in_memory", "model", in_memory_max_chunks=1024)
+            assert mock_build.call_count == 0
+            chroma, _ = build_dense_retriever(chunks, "chroma", "model")
+            assert mock_build.call_count == 1
+            fast = in_memory("question", top_k=3)
+            slow = chroma("question", top_k=3)
+
+        assert [r.chunk_id for r in fast] == [r.chunk_id for r in slow]
+        assert [r.score for r in fast] == pytest.approx([r.score for r in slow], abs=1e-4)
+
+    def test_repeated_question_is_embedded_once(self, dense_retriever_and_vectors):
+        retrieve_fn, _, _ = dense_retriever_and_vectors
+        with patch("rag_tutorials.pipeline.embed_texts", side_effect=_fake_embed) as mock_embed:
+            first = retrieve_fn("vpn policy", top_k=2)
+            second = retrieve_fn("vpn policy", top_k=2)
+        assert mock_embed.call_count == 1
+        assert [r.chunk_id for r in first] == [r.chunk_id for r in second]
+
 
 # ---------------------------------------------------------------------------
 # build_hybrid_retriever
@@ -197,3 +227,21 @@ class TestTopScoresPreview:
             mock_embed.return_value = np.array([[1.0]], dtype=np.float32)
             previews = top_scores_preview("query", chunks, vectors, "model", top_k=1)
         assert previews[0]["rank"] == 1
+
+    def test_batch_embeds_all_questions_once(self):
+        chunks = [_make_chunk(f"C-{i}", f"text {i}") for i in range(3)]
+        vectors = np.eye(3, dtype=np.float32)
+        with patch("rag_tutorials.pipeline.embed_texts") as mock_embed:
+            mock_embed.return_value = np.array([[0.0, 1.0, 0.0], [0.0, 0.0, 2.0]], dtype=np.float32)
+            previews = top_scores_preview_batch(["q1", "q2"], chunks, vectors, "model", top_k=1)
+        mock_embed.assert_called_once_with(["q1", "q2"], model="model")
+        assert [p[0]["chunk_id"] for p in previews] == ["C-1", "C-2"]
+        assert previews[1][0]["score"] == pytest.approx(1.0)
+
+    def test_top_k_larger_than_corpus_returns_all_sorted(self):
+        chunks = [_make_chunk(f"C-{i}", f"text {i}") for i in range(3)]
+        vectors = np.array([[1.0, 0.0], [0.6, 0.8], [0.0, 1.0]], dtype=np.float32)
+        with patch("rag_tutorials.pipeline.embed_texts") as mock_embed:
+            mock_embed.return_value = np.array([[0.0, 1.0]], dtype=np.float32)
+            previews = top_scores_preview("query", chunks, vectors, "model", top_k=10)
+        assert [p["chunk_id"] for p in previews] == ["C-2", "C-1", "C-0"]
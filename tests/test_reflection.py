@@ -4,16 +4,22 @@ OpenAI calls are mocked so no API key is needed.
 """
 from __future__ import annotations
 
+import asyncio
 import json
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
 from rag_tutorials.reflection import (
     CriticFeedback,
     ReflectionResult,
+    _get_client,
+    arun_reflection_loop,
+    aworker_stream,
     critic_review,
+    run_reflection_batch,
     run_reflection_loop,
+    worker_and_critique,
     worker_answer,
 )
 
@@ -23,6 +29,14 @@ from rag_tutorials.reflection import (
 # ---------------------------------------------------------------------------
 
 
+@pytest.fixture(autouse=True)
+def _fresh_client():
+    """Drop the memoized client so each test sees its own patched OpenAI."""
+    _get_client.cache_clear()
+    yield
+    _get_client.cache_clear()
+
+
 def _make_chat_response(content: str):
     choice = MagicMock()
     choice.message.content = content
@@ -55,6 +69,11 @@ class TestCriticFeedback:
         assert not fb.approved
         assert "Missing" in fb.feedback
 
+    def test_slots_prevent_arbitrary_attributes(self):
+        fb = CriticFeedback(approved=True, feedback="")
+        with pytest.raises(AttributeError):
+            fb.unexpected_field = "oops"  # type: ignore[attr-defined]
+
 
 # ---------------------------------------------------------------------------
 # ReflectionResult dataclass
@@ -102,6 +121,67 @@ class TestWorkerAnswer:
             user_message = next(m["content"] for m in messages if m["role"] == "user")
             assert "Critic feedback" in user_message
 
+    def test_reuses_one_client_across_calls(self):
+        with patch("rag_tutorials.reflection.OpenAI") as mock_openai_cls:
+            mock_client = MagicMock()
+            mock_openai_cls.return_value = mock_client
+            mock_client.chat.completions.create.side_effect = [
+                _make_chat_response("ok"),
+                _approved_response(),
+            ]
+            worker_answer("q", context="ctx")
+            critic_review("q", "ok", "ctx")
+        assert mock_openai_cls.call_count == 1
+
+
+class TestResponseCache:
+    def test_identical_prompts_hit_cache(self, tmp_path):
+        cache_path = str(tmp_path / "llm.sqlite")
+        with patch("rag_tutorials.reflection.OpenAI") as mock_openai_cls:
+            mock_client = MagicMock()
+            mock_openai_cls.return_value = mock_client
+            mock_client.chat.completions.create.side_effect = [
+                _make_chat_response("cached answer"),
+                _approved_response(),
+            ]
+            first = worker_answer("q", context="ctx", cache_path=cache_path)
+            second = worker_answer("q", context="ctx", cache_path=cache_path)
+            critic_review("q", first, "ctx", cache_path=cache_path)
+            critique = critic_review("q", first, "ctx", cache_path=cache_path)
+        assert first == second == "cached answer"
+        assert critique.approved is True
+        assert mock_client.chat.completions.create.call_count == 2
+
+    def test_different_feedback_misses_cache(self, tmp_path):
+        cache_path = str(tmp_path / "llm.sqlite")
+        with patch("rag_tutorials.reflection.OpenAI") as mock_openai_cls:
+            mock_client = MagicMock()
+            mock_openai_cls.return_value = mock_client
+            mock_client.chat.completions.create.side_effect = [
+                _make_chat_response("first"),
+                _make_chat_response("second"),
+            ]
+            worker_answer("q", context="ctx", cache_path=cache_path)
+            revised = worker_answer("q", context="ctx", feedback="Cite it.", cache_path=cache_path)
+        assert revised == "second"
+        assert mock_client.chat.completions.create.call_count == 2
+
+    def test_unparseable_reply_is_not_cached(self, tmp_path):
+        cache_path = str(tmp_path / "llm.sqlite")
+        with patch("rag_tutorials.reflection.OpenAI") as mock_openai_cls:
+            mock_client = MagicMock()
+            mock_openai_cls.return_value = mock_client
+            mock_client.chat.completions.create.side_effect = [
+                _make_chat_response("not json"),
+                _approved_response(),
+            ]
+            with pytest.raises(ValueError):
+                critic_review("q", "a", "ctx", cache_path=cache_path)
+            retried = critic_review("q", "a", "ctx", cache_path=cache_path)
+            cached = critic_review("q", "a", "ctx", cache_path=cache_path)
+        assert retried.approved is cached.approved is True
+        assert mock_client.chat.completions.create.call_count == 2
+
 
 # ---------------------------------------------------------------------------
 # critic_review
@@ -127,14 +207,44 @@ class TestCriticReview:
         assert result.approved is False
         assert "citation" in result.feedback.lower()
 
-    def test_malformed_json_returns_approved(self):
-        """Parsing failure should not crash; defaults to approved=True."""
+    def test_malformed_json_raises(self):
+        """Parsing failure is surfaced instead of silently approving."""
         with patch("rag_tutorials.reflection.OpenAI") as mock_openai_cls:
             mock_client = MagicMock()
             mock_openai_cls.return_value = mock_client
             mock_client.chat.completions.create.return_value = _make_chat_response("not valid json")
-            result = critic_review("q", "answer", "ctx")
-        assert result.approved is True
+            with pytest.raises(ValueError):
+                critic_review("q", "answer", "ctx")
+
+    def test_requests_json_mode(self):
+        with patch("rag_tutorials.reflection.OpenAI") as mock_openai_cls:
+            mock_client = MagicMock()
+            mock_openai_cls.return_value = mock_client
+            mock_client.chat.completions.create.return_value = _approved_response()
+            critic_review("q", "answer", "ctx")
+        kwargs = mock_client.chat.completions.create.call_args.kwargs
+        assert kwargs["response_format"] == {"type": "json_object"}
+
+
+class TestPromptPrefix:
+    def test_worker_and_critic_share_context_prefix(self):
+        with patch("rag_tutorials.reflection.OpenAI") as mock_openai_cls:
+            mock_client = MagicMock()
+            mock_openai_cls.return_value = mock_client
+            mock_client.chat.completions.create.side_effect = [
+                _make_chat_response("draft"),
+                _approved_response(),
+                _make_chat_response("draft"),
+            ]
+            worker_answer("q", context="long policy context")
+            critic_review("q", "draft", "long policy context")
+            worker_answer("q", context="long policy context", feedback="Add detail.")
+
+        calls = mock_client.chat.completions.create.call_args_list
+        first_messages = [call.kwargs["messages"][0] for call in calls]
+        assert all(message == first_messages[0] for message in first_messages)
+        assert "long policy context" in first_messages[0]["content"]
+        assert all("long policy context" not in call.kwargs["messages"][-1]["content"] for call in calls)
 
 
 # ---------------------------------------------------------------------------
@@ -156,7 +266,7 @@ class TestRunReflectionLoop:
         answers = ["first draft", "revised draft"]
         answer_iter = iter(answers)
 
-        def fake_worker(question, context, feedback="", model="gpt-4.1-mini"):
+        def fake_worker(question, context, feedback="", model="gpt-4.1-mini", cache_path=None):
             return next(answer_iter)
 
         feedbacks = [
@@ -165,7 +275,7 @@ class TestRunReflectionLoop:
         ]
         feedback_iter = iter(feedbacks)
 
-        def fake_critic(question, answer, context, model="gpt-4.1-mini"):
+        def fake_critic(question, answer, context, model="gpt-4.1-mini", cache_path=None):
             return next(feedback_iter)
 
         with patch("rag_tutorials.reflection.worker_answer", side_effect=fake_worker), \
@@ -196,3 +306,225 @@ class TestRunReflectionLoop:
             result = run_reflection_loop("q", context="ctx")
         round_numbers = [h["round"] for h in result.history]
         assert round_numbers == [1, 2]
+
+
+    def test_refusal_skips_critic(self):
+        with patch("rag_tutorials.reflection.worker_answer",
+                   return_value="I do not have enough context to answer."), \
+             patch("rag_tutorials.reflection.critic_review") as mock_critic:
+            result = run_reflection_loop("q", context="ctx", enable_shortcircuit=True)
+        mock_critic.assert_not_called()
+        assert result.rounds == 1
+        assert result.history[0]["approved"] is True
+
+    def test_unparseable_review_is_retried_once(self):
+        reviews = [ValueError("bad json"), CriticFeedback(approved=True, feedback="")]
+
+        def flaky_review(*args, **kwargs):
+            outcome = reviews.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        with patch("rag_tutorials.reflection.worker_answer", return_value="a"), \
+             patch("rag_tutorials.reflection.critic_review", side_effect=flaky_review) as mock_critic:
+            result = run_reflection_loop("q", context="ctx", cache_path="unused.sqlite")
+        assert mock_critic.call_count == 2
+        assert mock_critic.call_args_list[1].kwargs["cache_path"] == "unused.sqlite"
+        assert result.history[0]["approved"] is True
+
+    def test_repeatedly_unparseable_review_keeps_history(self):
+        with patch("rag_tutorials.reflection.worker_answer", side_effect=["draft 1", "draft 2"]), \
+             patch("rag_tutorials.reflection.critic_review", side_effect=ValueError("bad json")):
+            result = run_reflection_loop("q", context="ctx", max_rounds=2)
+        assert result.rounds == 2
+        assert result.final_answer == "draft 2"
+        assert [h["approved"] for h in result.history] == [False, False]
+
+    def test_hedged_answer_still_goes_to_critic(self):
+        hedged = "Remote work is 3 days a week, but I do not have enough context for contractors."
+        with patch("rag_tutorials.reflection.worker_answer", return_value=hedged), \
+             patch("rag_tutorials.reflection.critic_review",
+                   return_value=CriticFeedback(approved=True, feedback="")) as mock_critic:
+            run_reflection_loop("q", context="ctx", enable_shortcircuit=True)
+        mock_critic.assert_called_once()
+
+    def test_repeated_draft_stops_without_critic(self):
+        with patch("rag_tutorials.reflection.worker_answer", side_effect=["Same  draft", "same draft"]), \
+             patch("rag_tutorials.reflection.critic_review",
+                   return_value=CriticFeedback(approved=False, feedback="Fix it.")) as mock_critic:
+            result = run_reflection_loop("q", context="ctx", max_rounds=3, enable_shortcircuit=True)
+        assert mock_critic.call_count == 1
+        assert result.rounds == 2
+        assert result.history[-1]["approved"] is False
+
+    def test_shortcircuit_is_off_by_default(self):
+        with patch("rag_tutorials.reflection.worker_answer",
+                   return_value="I do not have enough context."), \
+             patch("rag_tutorials.reflection.critic_review",
+                   return_value=CriticFeedback(approved=False, feedback="It is in the context.")) as mock_critic:
+            result = run_reflection_loop("q", context="ctx", max_rounds=2)
+        assert mock_critic.call_count == 2
+        assert result.rounds == 2
+
+
+class TestFusedReflection:
+    def test_worker_and_critique_parses_one_reply(self):
+        reply = json.dumps({"answer": " 14 days. ", "approved": True, "feedback": ""})
+        with patch("rag_tutorials.reflection.OpenAI") as mock_openai_cls:
+            mock_client = MagicMock()
+            mock_openai_cls.return_value = mock_client
+            mock_client.chat.completions.create.return_value = _make_chat_response(reply)
+            answer, critique = worker_and_critique("q", context="ctx")
+            kwargs = mock_client.chat.completions.create.call_args[1]
+        assert answer == "14 days."
+        assert critique == CriticFeedback(approved=True, feedback="")
+        assert kwargs["response_format"] == {"type": "json_object"}
+
+    def test_fused_loop_makes_one_call_per_round(self):
+        replies = [
+            _make_chat_response(json.dumps({"answer": "draft", "approved": False, "feedback": "Cite it."})),
+            _make_chat_response(json.dumps({"answer": "cited draft", "approved": True, "feedback": ""})),
+        ]
+        with patch("rag_tutorials.reflection.OpenAI") as mock_openai_cls:
+            mock_client = MagicMock()
+            mock_openai_cls.return_value = mock_client
+            mock_client.chat.completions.create.side_effect = replies
+            result = run_reflection_loop("q", context="ctx", mode="fused")
+            second_user = mock_client.chat.completions.create.call_args_list[1][1]["messages"][-1]["content"]
+        assert mock_client.chat.completions.create.call_count == 2
+        assert result.final_answer == "cited draft"
+        assert result.rounds == 2
+        assert "Cite it." in second_user
+
+    def test_unparseable_fused_round_does_not_reuse_previous_draft(self):
+        replies = [
+            _make_chat_response(json.dumps({"answer": "draft", "approved": False, "feedback": "Cite it."})),
+            _make_chat_response("not json"),
+            _make_chat_response("still not json"),
+            _make_chat_response(json.dumps({"answer": "cited draft", "approved": True, "feedback": ""})),
+        ]
+        with patch("rag_tutorials.reflection.OpenAI") as mock_openai_cls:
+            mock_client = MagicMock()
+            mock_openai_cls.return_value = mock_client
+            mock_client.chat.completions.create.side_effect = replies
+            result = run_reflection_loop(
+                "q", context="ctx", max_rounds=3, mode="fused", enable_shortcircuit=True
+            )
+        assert mock_client.chat.completions.create.call_count == 4
+        assert result.history[1]["answer"] == ""
+        assert result.history[1]["approved"] is False
+        assert result.final_answer == "cited draft"
+        assert result.rounds == 3
+
+    def test_unknown_mode_raises(self):
+        with pytest.raises(ValueError):
+            run_reflection_loop("q", context="ctx", mode="parallel")
+
+
+# ---------------------------------------------------------------------------
+# arun_reflection_loop / run_reflection_batch (async client mocked)
+# ---------------------------------------------------------------------------
+
+
+class TestAsyncReflectionLoop:
+    def test_revises_then_approves(self):
+        mock_client = MagicMock()
+        mock_client.chat.completions.create = AsyncMock(
+            side_effect=[
+                _make_chat_response("first draft"),
+                _rejected_response("Cite the policy."),
+                _make_chat_response("revised draft"),
+                _approved_response(),
+            ]
+        )
+
+        result = asyncio.run(arun_reflection_loop("q", context="ctx", client=mock_client))
+
+        assert result.rounds == 2
+        assert result.final_answer == "revised draft"
+        assert [h["approved"] for h in result.history] == [False, True]
+        revise_messages = mock_client.chat.completions.create.call_args_list[2].kwargs["messages"]
+        assert "Cite the policy." in revise_messages[-1]["content"]
+
+    def test_unparseable_reviews_become_a_rejected_round(self):
+        mock_client = MagicMock()
+        mock_client.chat.completions.create = AsyncMock(
+            side_effect=[
+                _make_chat_response("first draft"),
+                _make_chat_response("not json"),
+                _make_chat_response("still not json"),
+                _make_chat_response("second draft"),
+                _approved_response(),
+            ]
+        )
+
+        result = asyncio.run(arun_reflection_loop("q", context="ctx", client=mock_client))
+
+        assert result.rounds == 2
+        assert result.final_answer == "second draft"
+        assert [h["approved"] for h in result.history] == [False, True]
+
+    def test_loop_closes_only_clients_it_creates(self):
+        with patch("rag_tutorials.reflection.AsyncOpenAI") as mock_async_cls:
+            own_client = MagicMock()
+            mock_async_cls.return_value = own_client
+            own_client.chat.completions.create = AsyncMock(
+                side_effect=[_make_chat_response("draft"), _approved_response()]
+            )
+            own_client.close = AsyncMock()
+            asyncio.run(arun_reflection_loop("q", context="ctx"))
+        assert mock_async_cls.call_count == 1
+        own_client.close.assert_awaited_once()
+
+        shared_client = MagicMock()
+        shared_client.chat.completions.create = AsyncMock(
+            side_effect=[_make_chat_response("draft"), _approved_response()]
+        )
+        shared_client.close = AsyncMock()
+        asyncio.run(arun_reflection_loop("q", context="ctx", client=shared_client))
+        shared_client.close.assert_not_awaited()
+
+    def test_batch_keeps_input_order_and_shares_client(self):
+        async def fake_create(model, messages, **kwargs):
+            if messages[1]["content"].startswith("You are a strict"):
+                return _approved_response()
+            return _make_chat_response("answer to " + messages[-1]["content"])
+
+        with patch("rag_tutorials.reflection.AsyncOpenAI") as mock_async_cls:
+            mock_client = MagicMock()
+            mock_async_cls.return_value = mock_client
+            mock_client.chat.completions.create = AsyncMock(side_effect=fake_create)
+            mock_client.close = AsyncMock()
+            results = asyncio.run(
+                run_reflection_batch(["q1", "q2", "q3"], ["c1", "c2", "c3"], max_concurrency=2)
+            )
+
+        assert mock_async_cls.call_count == 1
+        mock_client.close.assert_awaited_once()
+        assert [r.final_answer for r in results] == [
+            "answer to Question: q1",
+            "answer to Question: q2",
+            "answer to Question: q3",
+        ]
+
+    def test_worker_stream_yields_deltas(self):
+        def _delta(content):
+            chunk = MagicMock()
+            chunk.choices = [MagicMock()]
+            chunk.choices[0].delta.content = content
+            return chunk
+
+        async def _stream():
+            for content in ("The policy ", None, "allows 14 days."):
+                yield _delta(content)
+
+        client = MagicMock()
+        client.chat.completions.create = AsyncMock(return_value=_stream())
+
+        async def _collect():
+            return [delta async for delta in aworker_stream("q", "ctx", client=client)]
+
+        deltas = asyncio.run(_collect())
+        assert deltas == ["The policy ", "allows 14 days."]
+        assert client.chat.completions.create.call_args[1]["stream"] is True
@@ -89,10 +89,39 @@ class TestLocalCrossEncoderReranker:
         reranker._mock_model.predict.return_value = np.array([0.5, 0.6])
         reranker.rerank("my query", results)
         pairs_sent = reranker._mock_model.predict.call_args[0][0]
-        assert pairs_sent == [["my query", "alpha text"], ["my query", "beta text"]]
+        # Pairs are sent shortest chunk first to minimize padding per batch.
+        assert pairs_sent == [["my query", "beta text"], ["my query", "alpha text"]]
+
+    def test_rerank_maps_length_sorted_scores_back(self, reranker):
+        results = [
+            _make_result("C-long", "a much longer chunk of text"),
+            _make_result("C-short", "short"),
+        ]
+        # Scores arrive in length order: short first, then long.
+        reranker._mock_model.predict.return_value = np.array([0.1, 0.9])
+        output = reranker.rerank("query", results, top_k=2)
+        assert [r.chunk_id for r in output] == ["C-long", "C-short"]
+        assert [r.score for r in output] == pytest.approx([0.9, 0.1])
+
+    def test_rerank_passes_batch_size(self, reranker):
+        reranker._mock_model.predict.return_value = np.array([0.5])
+        reranker.rerank("query", [_make_result("C-1", "text")])
+        assert reranker._mock_model.predict.call_args.kwargs["batch_size"] == 64
 
     def test_constructor_uses_provided_model_name(self):
         with patch("rag_tutorials.reranking.CrossEncoder") as mock_cls:
             mock_cls.return_value = MagicMock()
             LocalCrossEncoderReranker(model_name="cross-encoder/custom-model")
             mock_cls.assert_called_once_with("cross-encoder/custom-model")
+
+    def test_constructor_loads_onnx_backend_when_requested(self):
+        with patch("rag_tutorials.reranking.CrossEncoder") as mock_cls:
+            mock_cls.return_value = MagicMock()
+            LocalCrossEncoderReranker(
+                model_name="artifacts/reranker-onnx", onnx_file="onnx/model_qint8_avx512_vnni.onnx"
+            )
+            mock_cls.assert_called_once_with(
+                "artifacts/reranker-onnx",
+                backend="onnx",
+                model_kwargs={"file_name": "onnx/model_qint8_avx512_vnni.onnx"},
+            )
@@ -1,9 +1,18 @@
 """Tests for retrieval.py — BM25 index/search and Reciprocal Rank Fusion."""
 from __future__ import annotations
 
+import numpy as np
 import pytest
 
-from rag_tutorials.retrieval import bm25_search, build_bm25, reciprocal_rank_fusion
+from rag_tutorials.retrieval import (
+    SparseBM25,
+    _query_tokens,
+    bm25_search,
+    bm25_search_batch,
+    build_bm25,
+    build_or_load_bm25,
+    reciprocal_rank_fusion,
+)
 from rag_tutorials.schema import Chunk, RetrievalResult
 
 
@@ -34,6 +43,10 @@ class TestBuildBm25:
         assert len(corpus) == len(sample_chunks)
         assert len(chunk_ids) == len(sample_chunks)
 
+    def test_index_keeps_tokenized_corpus(self, sample_chunks):
+        index, corpus, _ = build_bm25(sample_chunks)
+        assert index.tokenized_corpus == [text.lower().split() for text in corpus]
+
     def test_accepts_single_chunk(self):
         chunks = [_make_chunk("C-1", "remote work policy")]
         index, corpus, ids = build_bm25(chunks)
@@ -41,6 +54,41 @@ class TestBuildBm25:
         assert ids == ["C-1"]
 
 
+# ---------------------------------------------------------------------------
+# build_or_load_bm25
+# ---------------------------------------------------------------------------
+
+class TestBuildOrLoadBm25:
+    def test_second_call_loads_cached_index(self, sample_chunks, tmp_path, monkeypatch):
+        index, corpus, chunk_ids = build_or_load_bm25(sample_chunks, cache_dir=str(tmp_path))
+        assert len(list(tmp_path.glob("bm25-*.pkl"))) == 1
+
+        def fail(*args, **kwargs):
+            raise AssertionError("index should be loaded from cache")
+
+        monkeypatch.setattr("rag_tutorials.retrieval.build_bm25", fail)
+        cached_index, cached_corpus, cached_ids = build_or_load_bm25(sample_chunks, cache_dir=str(tmp_path))
+        assert cached_corpus == corpus
+        assert cached_ids == chunk_ids
+        assert np.allclose(cached_index.get_scores(["remote"]), index.get_scores(["remote"]))
+
+    def test_changed_corpus_builds_new_index(self, sample_chunks, tmp_path):
+        build_or_load_bm25(sample_chunks, cache_dir=str(tmp_path))
+        build_or_load_bm25(sample_chunks[:-1], cache_dir=str(tmp_path))
+        assert len(list(tmp_path.glob("bm25-*.pkl"))) == 2
+
+    def test_changed_parameters_build_new_index(self, sample_chunks, tmp_path):
+        build_or_load_bm25(sample_chunks, cache_dir=str(tmp_path))
+        build_or_load_bm25(sample_chunks, cache_dir=str(tmp_path), k1=1.2)
+        assert len(list(tmp_path.glob("bm25-*.pkl"))) == 2
+
+    def test_cache_format_bump_builds_new_index(self, sample_chunks, tmp_path, monkeypatch):
+        build_or_load_bm25(sample_chunks, cache_dir=str(tmp_path))
+        monkeypatch.setattr("rag_tutorials.retrieval._BM25_CACHE_FORMAT", 2)
+        build_or_load_bm25(sample_chunks, cache_dir=str(tmp_path))
+        assert len(list(tmp_path.glob("bm25-*.pkl"))) == 2
+
+
 # ---------------------------------------------------------------------------
 # bm25_search
 # ---------------------------------------------------------------------------
@@ -82,6 +130,22 @@ class TestBm25Search:
         results = bm25_search(index, "work", corpus, chunk_ids)
         assert all(r.score >= 0.0 for r in results)
 
+    def test_query_tokenization_is_cached(self, index_and_corpus):
+        index, corpus, chunk_ids = index_and_corpus
+        _query_tokens.cache_clear()
+        bm25_search(index, "Remote Work", corpus, chunk_ids)
+        bm25_search(index, "Remote Work", corpus, chunk_ids)
+        info = _query_tokens.cache_info()
+        assert (info.hits, info.misses) == (1, 1)
+        assert _query_tokens("Remote Work") == ("remote", "work")
+
+    def test_ties_keep_corpus_order(self):
+        chunks = [_make_chunk(f"C-{i}", f"filler text number {i}") for i in range(6)]
+        chunks.append(_make_chunk("C-hit", "expense report deadline"))
+        index, corpus, chunk_ids = build_bm25(chunks)
+        results = bm25_search(index, "expense", corpus, chunk_ids, top_k=3)
+        assert [r.chunk_id for r in results] == ["C-hit", "C-0", "C-1"]
+
     def test_results_sorted_descending(self, index_and_corpus):
         index, corpus, chunk_ids = index_and_corpus
         results = bm25_search(index, "work remote", corpus, chunk_ids, top_k=3)
@@ -152,3 +216,42 @@ class TestReciprocalRankFusion:
         dense = [_make_result("C-1")]
         results = reciprocal_rank_fusion(dense, [])
         assert len(results) == 1
+
+    def test_top_k_matches_sliced_full_ranking(self):
+        dense = [_make_result(f"C-{i}") for i in range(8)]
+        keyword = [_make_result(f"C-{i}") for i in (7, 3, 9, 1)]
+        full = reciprocal_rank_fusion(dense, keyword)
+        capped = reciprocal_rank_fusion(dense, keyword, top_k=3)
+        assert [(r.chunk_id, r.score) for r in capped] == [(r.chunk_id, r.score) for r in full[:3]]
+
+
+# ---------------------------------------------------------------------------
+# SparseBM25
+# ---------------------------------------------------------------------------
+
+class TestSparseBm25:
+    def test_scores_match_rank_bm25(self, sample_chunks):
+        from rank_bm25 import BM25Okapi
+
+        tokenized = [c.text.lower().split() for c in sample_chunks]
+        query = "remote work policy days days unknownterm".split()
+        expected = BM25Okapi(tokenized).get_scores(query)
+        assert np.allclose(SparseBM25(tokenized).get_scores(query), expected)
+
+    def test_unknown_query_terms_score_zero(self, sample_chunks):
+        index = SparseBM25([c.text.lower().split() for c in sample_chunks])
+        scores = index.get_scores(["zzzz"])
+        assert scores.shape == (len(sample_chunks),)
+        assert not scores.any()
+
+
+# ---------------------------------------------------------------------------
+# bm25_search_batch
+# ---------------------------------------------------------------------------
+
+class TestBm25SearchBatch:
+    def test_batch_matches_list_results(self, sample_chunks):
+        index, corpus, chunk_ids = build_bm25(sample_chunks)
+        batch = bm25_search_batch(index, "remote work", corpus, chunk_ids, top_k=3)
+        assert batch.to_list() == bm25_search(index, "remote work", corpus, chunk_ids, top_k=3)
+        assert list(batch.scores) == sorted(batch.scores, reverse=True)
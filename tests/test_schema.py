@@ -1,9 +1,12 @@
 """Tests for schema dataclasses."""
 from __future__ import annotations
 
+from dataclasses import FrozenInstanceError, asdict
+
+import numpy as np
 import pytest
 
-from rag_tutorials.schema import Chunk, Document, QueryExample, RetrievalResult
+from rag_tutorials.schema import Chunk, ChunkBatch, Document, QueryExample, RetrievalBatch, RetrievalResult
 
 
 class TestDocument:
@@ -19,6 +22,9 @@ class TestDocument:
         with pytest.raises(AttributeError):
             doc.unexpected_field = "oops"  # type: ignore[attr-defined]
 
+    def test_to_dict_matches_asdict(self, sample_document):
+        assert sample_document.to_dict() == asdict(sample_document)
+
 
 class TestChunk:
     def test_instantiation(self):
@@ -33,6 +39,27 @@ class TestChunk:
         with pytest.raises(AttributeError):
             chunk.unexpected_field = "oops"  # type: ignore[attr-defined]
 
+    def test_to_dict_matches_asdict(self, sample_chunk):
+        assert sample_chunk.to_dict() == asdict(sample_chunk)
+
+
+class TestChunkBatch:
+    def test_empty_by_default(self):
+        batch = ChunkBatch()
+        assert len(batch) == 0
+        assert list(batch) == []
+
+    def test_iterates_as_chunks(self):
+        batch = ChunkBatch(ids=["C-1", "C-2"], doc_ids=["D-1", "D-1"], sections=["S", "S"], texts=["a", "b"])
+        chunks = list(batch)
+        assert len(batch) == 2
+        assert chunks[1] == Chunk(chunk_id="C-2", doc_id="D-1", section="S", text="b")
+
+    def test_misaligned_columns_raise(self):
+        batch = ChunkBatch(ids=["C-1"], doc_ids=[], sections=[], texts=[])
+        with pytest.raises(ValueError):
+            list(batch)
+
 
 class TestQueryExample:
     def test_instantiation(self):
@@ -62,6 +89,11 @@ class TestQueryExample:
         )
         assert q.relevant_chunk_ids == []
 
+    def test_to_dict_matches_asdict(self, sample_query):
+        data = sample_query.to_dict()
+        assert data == asdict(sample_query)
+        assert list(data) == list(asdict(sample_query))
+
 
 class TestRetrievalResult:
     def test_instantiation(self):
@@ -75,3 +107,31 @@ class TestRetrievalResult:
         r = RetrievalResult(chunk_id="C-1", score=1, source="dense", text="t")
         # score stored as-is; confirm it can be numeric
         assert r.score == 1
+
+    def test_frozen_and_hashable(self):
+        r = RetrievalResult(chunk_id="C-1", score=0.9, source="dense", text="t")
+        with pytest.raises(FrozenInstanceError):
+            r.score = 0.1
+        assert len({r, RetrievalResult(chunk_id="C-1", score=0.9, source="dense", text="t")}) == 1
+
+
+class TestRetrievalBatch:
+    def test_empty_by_default(self):
+        batch = RetrievalBatch()
+        assert len(batch) == 0
+        assert batch.to_list() == []
+
+    def test_round_trips_results(self):
+        results = [
+            RetrievalResult(chunk_id="C-1", score=0.75, source="keyword", text="a"),
+            RetrievalResult(chunk_id="C-2", score=0.25, source="dense", text="b"),
+        ]
+        batch = RetrievalBatch.from_results(results)
+        assert batch.scores.dtype == np.float64
+        assert batch.to_list() == results
+        assert all(type(r.score) is float for r in batch)
+
+    def test_misaligned_columns_raise(self):
+        batch = RetrievalBatch(chunk_ids=["C-1"], scores=np.array([1.0]), sources=[], texts=["a"])
+        with pytest.raises(ValueError):
+            batch.to_list()
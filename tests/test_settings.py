@@ -1,9 +1,18 @@
 """Tests for settings.py — load_settings defaults and env overrides."""
 from __future__ import annotations
 
+from unittest.mock import patch
+
 import pytest
 
-from rag_tutorials.settings import OpenAISettings, Paths, load_settings
+from rag_tutorials.settings import OpenAISettings, Paths, _load_env_file, load_settings, reload_settings
+
+
+@pytest.fixture(autouse=True)
+def _fresh_env_file():
+    _load_env_file.cache_clear()
+    yield
+    _load_env_file.cache_clear()
 
 
 class TestOpenAISettings:
@@ -52,3 +61,20 @@ class TestLoadSettings:
         settings, _ = load_settings()
         assert settings.embedding_model == "text-embedding-3-large"
         assert settings.chat_model == "gpt-4o"
+
+    def test_env_file_parsed_once(self):
+        with patch("rag_tutorials.settings.load_dotenv") as mock_load:
+            load_settings()
+            load_settings()
+        mock_load.assert_called_once()
+
+    def test_returns_fresh_objects_each_call(self):
+        first, _ = load_settings()
+        second, _ = load_settings()
+        assert first is not second
+
+    def test_reload_settings_reparses_env_file(self):
+        with patch("rag_tutorials.settings.load_dotenv") as mock_load:
+            load_settings()
+            reload_settings()
+        assert mock_load.call_count == 2
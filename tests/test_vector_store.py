@@ -6,10 +6,18 @@ to keep tests fast and deterministic.
 """
 from __future__ import annotations
 
+import shutil
+
+import numpy as np
 import pytest
 
 from rag_tutorials.schema import Chunk, RetrievalResult
-from rag_tutorials.vector_store import build_chroma_collection, dense_search
+from rag_tutorials.vector_store import (
+    _get_client,
+    auto_hnsw_params,
+    build_chroma_collection,
+    dense_search,
+)
 
 
 # ---------------------------------------------------------------------------
@@ -81,6 +89,79 @@ class TestBuildChromaCollection:
         assert col2.count() == 2
 
 
+    def test_accepts_float32_matrix(self, tmp_path):
+        chunks = [_make_chunk("C-x", "x axis"), _make_chunk("C-y", "y axis")]
+        col = build_chroma_collection(
+            chunks=chunks,
+            embeddings=np.eye(2, dtype=np.float32),
+            collection_name="ndarray_build",
+            persist_dir=str(tmp_path),
+        )
+        results = dense_search(col, np.array([0.1, 1.0], dtype=np.float32), top_k=1)
+        assert results[0].chunk_id == "C-y"
+
+    def test_reuses_client_per_persist_dir(self, tmp_path):
+        chunks = [_make_chunk("C-1", "text")]
+        _get_client.cache_clear()
+        for name in ("first_build", "second_build"):
+            build_chroma_collection(
+                chunks=chunks, embeddings=[[1.0, 0.0]], collection_name=name, persist_dir=str(tmp_path)
+            )
+        info = _get_client.cache_info()
+        assert (info.misses, info.hits) == (1, 1)
+
+    def test_relative_persist_dir_follows_chdir(self, tmp_path, monkeypatch):
+        _get_client.cache_clear()
+        chunks = [_make_chunk("C-1", "text")]
+        for name in ("first", "second"):
+            (tmp_path / name).mkdir()
+            monkeypatch.chdir(tmp_path / name)
+            build_chroma_collection(
+                chunks=chunks, embeddings=[[1.0, 0.0]], collection_name="rerun", persist_dir="chroma"
+            )
+        assert (tmp_path / "first" / "chroma" / "chroma.sqlite3").exists()
+        assert (tmp_path / "second" / "chroma" / "chroma.sqlite3").exists()
+
+    def test_deleted_persist_dir_gets_fresh_client(self, tmp_path):
+        persist_dir = tmp_path / "chroma"
+        chunks = [_make_chunk("C-1", "text")]
+        build_chroma_collection(
+            chunks=chunks, embeddings=[[1.0, 0.0]], collection_name="rerun", persist_dir=str(persist_dir)
+        )
+        shutil.rmtree(persist_dir)
+        col = build_chroma_collection(
+            chunks=chunks, embeddings=[[1.0, 0.0]], collection_name="rerun", persist_dir=str(persist_dir)
+        )
+        assert col.count() == 1
+        assert (persist_dir / "chroma.sqlite3").exists()
+
+    def test_applies_hnsw_parameters(self, tmp_path):
+        col = build_chroma_collection(
+            chunks=[_make_chunk("C-1", "text")],
+            embeddings=[[1.0, 0.0]],
+            collection_name="hnsw_params",
+            persist_dir=str(tmp_path),
+            **auto_hnsw_params(250_000),
+        )
+        hnsw = col.configuration["hnsw"]
+        assert (hnsw["max_neighbors"], hnsw["ef_construction"], hnsw["ef_search"]) == (32, 256, 200)
+        assert hnsw["space"] == "l2"
+
+    def test_adds_in_batches_with_progress(self, tmp_path):
+        chunks = [_make_chunk(f"C-{i}", f"text {i}") for i in range(5)]
+        progress = []
+        col = build_chroma_collection(
+            chunks=chunks,
+            embeddings=[[float(i), 1.0] for i in range(5)],
+            collection_name="batched",
+            persist_dir=str(tmp_path),
+            batch_size=2,
+            progress_callback=lambda added, total: progress.append((added, total)),
+        )
+        assert col.count() == 5
+        assert progress == [(2, 5), (4, 5), (5, 5)]
+
+
 # ---------------------------------------------------------------------------
 # dense_search
 # ---------------------------------------------------------------------------
@@ -121,3 +202,17 @@ class TestDenseSearch:
     def test_chunk_id_field_present(self, collection):
         results = dense_search(collection, EMBS["C-international"], top_k=1)
         assert results[0].chunk_id == "C-international"
+
+    def test_ef_search_applies_to_one_query_only(self, collection):
+        before = collection.configuration["hnsw"]["ef_search"]
+        seen = []
+        original_query = collection.query
+
+        def spy_query(**kwargs):
+            seen.append(collection.configuration["hnsw"]["ef_search"])
+            return original_query(**kwargs)
+
+        collection.query = spy_query
+        dense_search(collection, [1.0, 0.0, 0.0], top_k=1, ef_search=64)
+        assert seen == [64]
+        assert collection.configuration["hnsw"]["ef_search"] == before